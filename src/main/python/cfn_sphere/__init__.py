@@ -4,60 +4,80 @@ from cfn_sphere.stack_configuration.parameter_resolver import ParameterResolver
 from cfn_sphere.aws.cfn import CloudFormation
 from cfn_sphere.file_loader import FileLoader
 from cfn_sphere.aws.cfn import CloudFormationStack
+from cfn_sphere.stack_executor import StackExecutor
+from cfn_sphere.cache import DiskCache
 from cfn_sphere.util import get_logger
 
 __version__ = '${version}'
 
 
 class StackActionHandler(object):
-    def __init__(self, config):
+    def __init__(self, config, parallelism=1, cache_ttl=0):
         self.logger = get_logger(root=True)
         self.config = config
-        self.cfn = CloudFormation(region=self.config.region)
-        self.parameter_resolver = ParameterResolver(region=self.config.region)
+        self.parallelism = parallelism
+        self.cache = DiskCache(cache_ttl) if cache_ttl else None
+        self.cfn = CloudFormation(region=self.config.region, use_stack_snapshot=True,
+                                  use_stack_watcher=parallelism > 1)
+        self.parameter_resolver = ParameterResolver(region=self.config.region, cfn=self.cfn, cache=self.cache)
         self.cli_parameters = config.cli_params
         self.cli_tags = config.cli_tags
 
     def create_or_update_stacks(self):
         desired_stacks = self.config.stacks
         stack_processing_order = DependencyResolver().get_stack_order(desired_stacks)
+        self.parameter_resolver.prefetch(desired_stacks)
+
+        if self.parallelism > 1:
+            self.logger.info("Will process stacks with a parallelism of {0}".format(self.parallelism))
+            graph = DependencyResolver().create_stacks_directed_graph(desired_stacks)
+            result = StackExecutor(graph, self.parallelism).run(stack_processing_order, self.create_or_update_stack)
+            result.raise_on_failure("sync")
+            return
 
         if len(stack_processing_order) > 1:
             self.logger.info(
                 "Will process stacks in the following order: {0}".format(", ".join(stack_processing_order)))
 
         for stack_name in stack_processing_order:
-            stack_config = self.config.stacks.get(stack_name)
-
-            if stack_config.stack_policy_url:
-                self.logger.info("Using stack policy from {0}".format(stack_config.stack_policy_url))
-                stack_policy = FileLoader.get_yaml_or_json_file(stack_config.stack_policy_url, stack_config.working_dir)
-            else:
-                stack_policy = None
-
-            template = TemplateHandler.get_template(stack_config.template_url, stack_config.working_dir)
-            parameters = self.parameter_resolver.resolve_parameter_values(stack_name, stack_config, self.cli_parameters)
-
-            full_tags = {}
-            full_tags.update(stack_config.tags)
-            full_tags.update(self.config.cli_tags)
-
-            stack = CloudFormationStack(template=template,
-                                        parameters=parameters,
-                                        tags=full_tags,
-                                        name=stack_name,
-                                        region=self.config.region,
-                                        timeout=stack_config.timeout,
-                                        service_role=stack_config.service_role,
-                                        stack_policy=stack_policy,
-                                        failure_action=stack_config.failure_action,
-                                        termination_protection=stack_config.termination_protection)
-
-            if self.cfn.stack_exists(stack_name):
-                self.cfn.validate_stack_is_ready_for_action(stack)
-                self.cfn.update_stack(stack)
-            else:
-                self.cfn.create_stack(stack)
+            self.create_or_update_stack(stack_name)
+
+    def create_or_update_stack(self, stack_name):
+        stack_config = self.config.stacks.get(stack_name)
+
+        if stack_config.stack_policy_url:
+            self.logger.info("Using stack policy from {0}".format(stack_config.stack_policy_url))
+            stack_policy = FileLoader.get_yaml_or_json_file(stack_config.stack_policy_url, stack_config.working_dir)
+        else:
+            stack_policy = None
+
+        template = TemplateHandler.get_template(stack_config.template_url, stack_config.working_dir)
+        stack_state = self.cfn.describe_stack_state(stack_name)
+        parameters = self.parameter_resolver.resolve_parameter_values(stack_name, stack_config, self.cli_parameters,
+                                                                      stack_state=stack_state)
+
+        full_tags = {}
+        full_tags.update(stack_config.tags)
+        full_tags.update(self.config.cli_tags)
+
+        stack = CloudFormationStack(template=template,
+                                    parameters=parameters,
+                                    tags=full_tags,
+                                    name=stack_name,
+                                    region=self.config.region,
+                                    timeout=stack_config.timeout,
+                                    service_role=stack_config.service_role,
+                                    stack_policy=stack_policy,
+                                    failure_action=stack_config.failure_action,
+                                    termination_protection=stack_config.termination_protection,
+                                    expected_duration=stack_config.expected_duration,
+                                    artifact_bucket=stack_config.artifact_bucket)
+
+        if stack_state.exists:
+            self.cfn.validate_stack_is_ready_for_action(stack, stack_state)
+            self.cfn.update_stack(stack)
+        else:
+            self.cfn.create_stack(stack)
 
     def delete_stacks(self):
         existing_stacks = self.cfn.get_stack_names()
@@ -66,20 +86,59 @@ class StackActionHandler(object):
         stack_processing_order = DependencyResolver().get_stack_order(stacks)
         stack_processing_order.reverse()
 
+        if self.parallelism > 1:
+            self.logger.info("Will delete stacks with a parallelism of {0}".format(self.parallelism))
+            graph = DependencyResolver().create_stacks_directed_graph(stacks).reverse()
+            result = StackExecutor(graph, self.parallelism).run(stack_processing_order,
+                                                                lambda name: self.delete_stack(name, existing_stacks),
+                                                                fail_fast=False)
+            self.log_delete_summary(result)
+            result.raise_on_failure("delete")
+            return
+
         self.logger.info("Will delete stacks in the following order: {0}".format(", ".join(stack_processing_order)))
 
         for stack_name in stack_processing_order:
-            stack_config = self.config.stacks.get(stack_name)
-
-            if stack_name in existing_stacks:
-                stack = CloudFormationStack(template=None,
-                                            parameters=None,
-                                            name=stack_name,
-                                            region=self.config.region,
-                                            timeout=stack_config.timeout,
-                                            service_role=stack_config.service_role)
-
-                self.cfn.validate_stack_is_ready_for_action(stack)
-                self.cfn.delete_stack(stack)
-            else:
-                self.logger.info("Stack {0} is already deleted".format(stack_name))
+            self.delete_stack(stack_name, existing_stacks)
+
+    def delete_stack(self, stack_name, existing_stacks):
+        """
+        Delete a stack if it exists
+        :param stack_name: str
+        :param existing_stacks: list(str)
+        :return: bool: True if the stack got deleted, False if it did not exist
+        """
+        stack_config = self.config.stacks.get(stack_name)
+
+        if stack_name in existing_stacks:
+            stack = CloudFormationStack(template=None,
+                                        parameters=None,
+                                        name=stack_name,
+                                        region=self.config.region,
+                                        timeout=stack_config.timeout,
+                                        service_role=stack_config.service_role,
+                                        expected_duration=stack_config.expected_duration)
+
+            self.cfn.validate_stack_is_ready_for_action(stack)
+            self.cfn.delete_stack(stack)
+            return True
+        else:
+            self.logger.info("Stack {0} is already deleted".format(stack_name))
+            return False
+
+    def log_delete_summary(self, result):
+        deleted = [name for name, was_deleted in result.succeeded.items() if was_deleted]
+        absent = [name for name, was_deleted in result.succeeded.items() if not was_deleted]
+
+        lines = ["Delete summary:"]
+        for title, stack_names in [("Deleted", deleted),
+                                   ("Already deleted", absent),
+                                   ("Failed", list(result.failed.keys())),
+                                   ("Skipped, still referenced by failed stacks", result.skipped)]:
+            if stack_names:
+                lines.append("  {0}: {1}".format(title, ", ".join(sorted(stack_names))))
+
+        if result.failed or result.skipped:
+            self.logger.error("\n".join(lines))
+        else:
+            self.logger.info("\n".join(lines))
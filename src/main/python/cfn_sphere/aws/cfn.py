@@ -1,21 +1,36 @@
 import time
 import json
-import boto3
+import hashlib
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
 from botocore.exceptions import BotoCoreError, ClientError
 
+from cfn_sphere.aws.s3 import S3
+from cfn_sphere.aws.client_registry import get_client, get_resource
 from cfn_sphere.exceptions import CfnStackActionFailedException
 from cfn_sphere.util import with_boto_retry, get_logger, timed, get_pretty_stack_outputs, \
-    get_pretty_parameters_string, get_cfn_api_server_time
+    get_pretty_parameters_string, get_cfn_api_server_time, record_server_clock_offset
 from cfn_sphere.exceptions import CfnSphereBotoError
 
 logging.getLogger('boto').setLevel(logging.FATAL)
 
+MAX_TARGETED_STACK_DESCRIPTIONS = 20
+MAX_CONCURRENT_STACK_DESCRIPTIONS = 10
+MAX_TEMPLATE_BODY_SIZE = 51200
+MAX_CONSECUTIVE_STATUS_CHECK_FAILURES = 3
+IN_PROGRESS_STACK_STATUSES = ["CREATE_IN_PROGRESS", "ROLLBACK_IN_PROGRESS", "DELETE_IN_PROGRESS",
+                              "UPDATE_IN_PROGRESS", "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+                              "UPDATE_ROLLBACK_IN_PROGRESS", "UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS",
+                              "REVIEW_IN_PROGRESS", "IMPORT_IN_PROGRESS", "IMPORT_ROLLBACK_IN_PROGRESS"]
+
 
 class CloudFormationStack(object):
     def __init__(self, template, parameters, name, region, timeout=600, tags=None, service_role=None,
-                 stack_policy=None, failure_action=None, disable_rollback=False, termination_protection=False):
+                 stack_policy=None, failure_action=None, disable_rollback=False, termination_protection=False,
+                 expected_duration=None, artifact_bucket=None):
         self.template = template
         self.parameters = parameters
         self.tags = {} if tags is None else tags
@@ -27,6 +42,8 @@ class CloudFormationStack(object):
         self.failure_action = failure_action
         self.disable_rollback = disable_rollback
         self.termination_protection = termination_protection
+        self.expected_duration = expected_duration
+        self.artifact_bucket = artifact_bucket
 
     def __str__(self):
         return str(vars(self))
@@ -38,12 +55,504 @@ class CloudFormationStack(object):
         return [{"Key": key, "Value": value} for key, value in self.tags.items()]
 
 
+class StackState(object):
+    """
+    Existence, status, parameters and outputs of a stack taken from a single stack description
+    """
+
+    def __init__(self, name, description=None):
+        """
+        :param name: str
+        :param description: dict or None if the stack does not exist
+        """
+        description = description or {}
+
+        self.name = name
+        self.exists = bool(description)
+        self.status = description.get("StackStatus")
+        self.parameters = {p["ParameterKey"]: p.get("ParameterValue") for p in description.get("Parameters", [])}
+        self.outputs = description.get("Outputs", [])
+
+    def __str__(self):
+        return str(vars(self))
+
+
+class ExponentialPollInterval(object):
+    """
+    Poll interval policy starting with fast polls, growing exponentially up to a cap while nothing happens
+    and snapping back to fast polling as soon as new events appear.
+    """
+
+    def __init__(self, expected_duration=None, minimum=2, maximum=30, factor=1.5):
+        """
+        :param expected_duration: int: expected duration of the stack action in seconds, lowers the cap for short ones
+        :param minimum: int: seconds
+        :param maximum: int: seconds
+        :param factor: float: growth per poll without new events
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self._current = None
+
+        if expected_duration:
+            self.maximum = max(minimum, min(maximum, expected_duration / 10.0))
+
+    def next_interval(self, new_events_seen):
+        """
+        Get the time to sleep until the next poll
+        :param new_events_seen: bool: whether the last poll returned new events
+        :return: float: seconds
+        """
+        if self._current is None or new_events_seen:
+            self._current = self.minimum
+        else:
+            self._current = min(self.maximum, self._current * self.factor)
+
+        return self._current
+
+
+class StackEventStream(object):
+    """
+    Incrementally streams new events of a stack. Each poll only pages through describe_stack_events
+    until the last event seen before is reached.
+    """
+
+    def __init__(self, client, stack_name, not_before=None, max_seen_event_ids=1000):
+        """
+        :param client: boto3 cloudformation client
+        :param stack_name: str
+        :param not_before: timestamp: stop paging at events not newer than this
+        :param max_seen_event_ids: int: number of event ids remembered to skip duplicates
+        """
+        self.client = client
+        self.stack_name = stack_name
+        self.not_before = not_before
+        self.last_event_id = None
+        self._seen_event_ids = set()
+        self._seen_event_ids_order = deque()
+        self._max_seen_event_ids = max_seen_event_ids
+
+    @with_boto_retry()
+    def _get_new_events(self):
+        """
+        Get events newer than the last seen one
+        :return: list(dict) newest first
+        :raise CfnSphereBotoError:
+        """
+        events = []
+        try:
+            paginator = self.client.get_paginator('describe_stack_events')
+            for page in paginator.paginate(StackName=self.stack_name):
+                for event in page["StackEvents"]:
+                    if event["EventId"] == self.last_event_id:
+                        return events
+                    if self.not_before and event["Timestamp"] <= self.not_before:
+                        return events
+
+                    events.append(event)
+            return events
+        except (BotoCoreError, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+    def _remember(self, event_id):
+        self._seen_event_ids.add(event_id)
+        self._seen_event_ids_order.append(event_id)
+
+        if len(self._seen_event_ids_order) > self._max_seen_event_ids:
+            self._seen_event_ids.discard(self._seen_event_ids_order.popleft())
+
+    def poll(self):
+        """
+        Yield events not seen before, oldest first
+        :return: generator(dict)
+        :raise CfnSphereBotoError:
+        """
+        for event in reversed(self._get_new_events()):
+            self.last_event_id = event["EventId"]
+
+            if event["EventId"] in self._seen_event_ids:
+                continue
+
+            self._remember(event["EventId"])
+            yield event
+
+
+class StackDescriptionSnapshot(object):
+    """
+    Run scoped snapshot of stack descriptions of a region. Descriptions are fetched once, either for all stacks
+    or only for the stacks asked for, and are afterwards only updated for stacks modified within the run.
+    """
+
+    def __init__(self, loader, targeted_loader):
+        """
+        :param loader: callable returning a list of all stack descriptions
+        :param targeted_loader: callable returning a list of descriptions for the given existing stack names
+        """
+        self._loader = loader
+        self._targeted_loader = targeted_loader
+        self._descriptions = {}
+        self._complete = False
+        self._lock = threading.Lock()
+
+    def get_descriptions(self):
+        """
+        Get all stack descriptions
+        :return: list(dict)
+        """
+        with self._lock:
+            if not self._complete:
+                self._descriptions = {description["StackName"]: description for description in self._loader()}
+                self._complete = True
+            return [description for description in self._descriptions.values() if description]
+
+    def get_descriptions_for(self, stack_names):
+        """
+        Get descriptions of the given stacks, fetching only those not known yet
+        :param stack_names: iterable(str)
+        :return: list(dict) for the existing stacks
+        """
+        stack_names = set(stack_names)
+
+        with self._lock:
+            unknown_stack_names = [] if self._complete else [n for n in stack_names if n not in self._descriptions]
+
+        if unknown_stack_names:
+            fetched = {description["StackName"]: description for description in
+                       self._targeted_loader(unknown_stack_names)}
+
+            with self._lock:
+                for stack_name in unknown_stack_names:
+                    self._descriptions.setdefault(stack_name, fetched.get(stack_name))
+
+        with self._lock:
+            return [self._descriptions[n] for n in stack_names if self._descriptions.get(n)]
+
+    def get_description(self, stack_name):
+        """
+        Get a stacks description
+        :param stack_name: str
+        :return: dict or None if the stack does not exist
+        """
+        descriptions = self.get_descriptions_for([stack_name])
+        return descriptions[0] if descriptions else None
+
+    def update(self, stack_name, description):
+        """
+        Replace a stacks description after it has been modified
+        :param stack_name: str
+        :param description: dict or None if the stack does not exist anymore
+        """
+        with self._lock:
+            self._descriptions[stack_name] = description
+
+
+class StackWatch(object):
+    """
+    A single stack action waited for by a StackWatcher. Consumes the stacks events in order,
+    first looking for the start of the action, then for its completion.
+    """
+
+    def __init__(self, stack_name, action, timeout, not_before, event_stream, poll_interval, start_timeout=120):
+        """
+        :param stack_name: str
+        :param action: str: one of create, update, delete
+        :param timeout: int: seconds to wait for completion once the action started
+        :param not_before: timestamp: ignore events not newer than this
+        :param event_stream: StackEventStream
+        :param poll_interval: poll interval policy
+        :param start_timeout: int: seconds to wait for the action to start
+        """
+        self.stack_name = stack_name
+        self.action = action
+        self.timeout = timeout
+        self.valid_from_timestamp = not_before
+        self.event_stream = event_stream
+        self.poll_interval = poll_interval
+        self.expected_event_status = action.upper() + "_IN_PROGRESS"
+        self.deadline = datetime.now() + timedelta(seconds=int(start_timeout))
+        self.start_event = None
+        self.end_event = None
+        self.error = None
+        self.last_status = None
+        self.done = threading.Event()
+
+    def is_status_changed(self, status):
+        """
+        Remember the stacks latest status and tell if it changed since the last check
+        :param status: tuple(str, timestamp) or None if the stack does not exist
+        :return: bool
+        """
+        changed = self.last_status is None or status != self.last_status
+        self.last_status = status
+        return changed
+
+    def is_at_rest(self):
+        return self.last_status is None or not self.last_status[0].endswith("_IN_PROGRESS")
+
+    def started(self, event):
+        self.start_event = event
+        self.valid_from_timestamp = event["Timestamp"]
+        self.expected_event_status = self.action.upper() + "_COMPLETE"
+        self.deadline = datetime.now() + timedelta(seconds=int(self.timeout))
+
+    def finish(self, end_event=None, error=None):
+        self.end_event = end_event
+        self.error = error
+        self.done.set()
+
+
+class StackWatcher(object):
+    """
+    Watches all in-progress stack actions of a region with a single poller. Stack statuses are checked in one
+    batch per poll, events are only fetched for stacks whose action has not started yet or whose status changed,
+    completion or failure is dispatched to the waiting callers. A failing status check is only dispatched to all
+    watches once it failed several polls in a row.
+    """
+
+    def __init__(self, cfn, max_status_check_failures=MAX_CONSECUTIVE_STATUS_CHECK_FAILURES):
+        """
+        :param cfn: CloudFormation
+        :param max_status_check_failures: int: consecutive failed status checks before the waits fail
+        """
+        self.logger = get_logger()
+        self.cfn = cfn
+        self.max_status_check_failures = max_status_check_failures
+        self._status_check_failures = 0
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wait(self, stack_name, action, timeout, not_before, poll_interval):
+        """
+        Block until the stack action completed
+        :param stack_name: str
+        :param action: str: one of create, update, delete
+        :param timeout: int: seconds
+        :param not_before: timestamp: ignore events not newer than this
+        :param poll_interval: poll interval policy
+        :return: tuple(start event, end event)
+        :raise CfnStackActionFailedException:
+        :raise CfnSphereBotoError:
+        """
+        event_stream = StackEventStream(self.cfn.client, stack_name, not_before=not_before)
+        watch = StackWatch(stack_name, action, timeout, not_before, event_stream, poll_interval)
+
+        with self._lock:
+            self._watches[stack_name] = watch
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cfn-sphere-stack-watcher")
+                self._thread.daemon = True
+                self._thread.start()
+
+        self._wakeup.set()
+        watch.done.wait()
+
+        if watch.error:
+            raise watch.error
+
+        return watch.start_event, watch.end_event
+
+    def _run(self):
+        while True:
+            with self._lock:
+                watches = list(self._watches.values())
+                if not watches:
+                    self._thread = None
+                    return
+
+            self._wakeup.clear()
+            self._wakeup.wait(self.poll(watches))
+
+    def get_stack_statuses(self, stack_names):
+        """
+        Get the status of the given stacks, a single stack is described directly. Several stacks are
+        taken from one list_stacks call filtered to in-progress stacks, so a watched stack missing from
+        the result has left progress (or does not exist) and its events are due to be fetched.
+        :param stack_names: list(str)
+        :return: dict(str, tuple(str, timestamp)) for the existing (in-progress) stacks
+        :raise CfnSphereBotoError:
+        """
+        if len(stack_names) == 1:
+            description = self.cfn.get_stack_description_if_exists(stack_names[0])
+            descriptions = [description] if description else []
+        else:
+            descriptions = [d for d in self.cfn.get_in_progress_stack_summaries() if d["StackName"] in stack_names]
+
+        return {d["StackName"]: (d["StackStatus"], d.get("LastUpdatedTime", d.get("CreationTime")))
+                for d in descriptions}
+
+    def poll(self, watches):
+        """
+        Check all watched stacks once and dispatch finished ones
+        :param watches: list(StackWatch)
+        :return: float: seconds to sleep until the next poll
+        """
+        try:
+            statuses = self.get_stack_statuses([watch.stack_name for watch in watches])
+        except Exception as e:
+            return self.handle_status_check_failure(watches, e)
+
+        self._status_check_failures = 0
+
+        intervals = []
+        for watch in watches:
+            new_events_seen = False
+            try:
+                status_changed = watch.is_status_changed(statuses.get(watch.stack_name))
+                if watch.start_event is None or status_changed or watch.is_at_rest():
+                    new_events_seen = self.handle_events(watch)
+
+                if not watch.done.is_set() and datetime.now() >= watch.deadline:
+                    raise CfnStackActionFailedException(
+                        "Timeout occurred waiting for '{0}' on stack {1}".format(watch.expected_event_status,
+                                                                                 watch.stack_name))
+            except Exception as e:
+                self._finish(watch, error=e)
+                continue
+
+            if watch.done.is_set():
+                self._finish(watch)
+            else:
+                intervals.append(watch.poll_interval.next_interval(new_events_seen))
+
+        return min(intervals) if intervals else 0
+
+    def handle_status_check_failure(self, watches, error):
+        """
+        Dispatch a failed status check to the watches past their deadline, or to all watches
+        if the status check failed several polls in a row
+        :param watches: list(StackWatch)
+        :param error: Exception
+        :return: float: seconds to sleep until the next poll
+        """
+        self._status_check_failures += 1
+
+        if self._status_check_failures >= self.max_status_check_failures:
+            for watch in watches:
+                self._finish(watch, error=error)
+            return 0
+
+        self.logger.warning("Could not check stack statuses ({0} of {1} attempts): {2}".format(
+            self._status_check_failures, self.max_status_check_failures, error))
+
+        intervals = []
+        for watch in watches:
+            if datetime.now() >= watch.deadline:
+                self._finish(watch, error=error)
+            else:
+                intervals.append(watch.poll_interval.next_interval(False))
+
+        return min(intervals) if intervals else 0
+
+    def handle_events(self, watch):
+        """
+        Handle new events of a watched stack
+        :param watch: StackWatch
+        :return: bool: whether new events have been seen
+        :raise CfnStackActionFailedException:
+        :raise CfnSphereBotoError:
+        """
+        new_events_seen = False
+
+        for event in watch.event_stream.poll():
+            new_events_seen = True
+            event = self.cfn.handle_stack_event(event, watch.valid_from_timestamp, watch.expected_event_status,
+                                                watch.stack_name)
+            if not event:
+                continue
+
+            if watch.start_event is None:
+                self.logger.info("Stack {0} started for {1}".format(watch.action, watch.stack_name))
+                watch.started(event)
+            else:
+                watch.finish(end_event=event)
+                break
+
+        return new_events_seen
+
+    def _finish(self, watch, error=None):
+        with self._lock:
+            if self._watches.get(watch.stack_name) is watch:
+                del self._watches[watch.stack_name]
+
+        if not watch.done.is_set():
+            watch.finish(error=error)
+
+
 class CloudFormation(object):
     @with_boto_retry()
-    def __init__(self, region="eu-west-1"):
+    def __init__(self, region="eu-west-1", use_stack_snapshot=False, poll_interval_factory=ExponentialPollInterval,
+                 use_stack_watcher=False):
+        """
+        :param region: str
+        :param use_stack_snapshot: bool: answer stack lookups from a snapshot fetched once per instance
+        :param use_stack_watcher: bool: wait for stack actions through a single poller shared by concurrent waits
+        :param poll_interval_factory: callable(expected_duration) returning a poll interval policy for stack waits
+        """
         self.logger = get_logger()
-        self.client = boto3.client('cloudformation', region_name=region)
-        self.resource = boto3.resource('cloudformation', region_name=region)
+        self.region = region
+        self.poll_interval_factory = poll_interval_factory
+        self.client = get_client('cloudformation', region)
+        self.client.meta.events.register('after-call.cloudformation', record_server_clock_offset,
+                                         unique_id='cfn-sphere-server-clock-offset')
+        self.resource = get_resource('cloudformation', region)
+        self.stack_snapshot = None
+
+        if use_stack_snapshot:
+            self.stack_snapshot = StackDescriptionSnapshot(self.get_stack_descriptions,
+                                                           self.get_stack_descriptions_by_name)
+
+        self.stack_watcher = StackWatcher(self) if use_stack_watcher else None
+        self._s3 = None
+        self._s3_lock = threading.Lock()
+        self._exports = None
+        self._exports_lock = threading.Lock()
+
+    @property
+    def s3(self):
+        """
+        S3 client of the stacks region used to stage templates, created on first use and shared by all stacks
+        :return: cfn_sphere.aws.s3.S3
+        """
+        with self._s3_lock:
+            if self._s3 is None:
+                self._s3 = S3(region=self.region)
+            return self._s3
+
+    def stage_template(self, template_body, bucket_name):
+        """
+        Upload a template body to S3 under a content hash key, skipping the upload if it is already there
+        :param template_body: str
+        :param bucket_name: str
+        :return: str: template url
+        :raise CfnSphereBotoError:
+        """
+        key_name = "cfn-sphere/templates/{0}.json".format(hashlib.sha256(template_body.encode('utf-8')).hexdigest())
+
+        if self.s3.object_exists(bucket_name, key_name):
+            self.logger.debug("Template already staged as s3://{0}/{1}".format(bucket_name, key_name))
+        else:
+            self.logger.info("Staging template as s3://{0}/{1}".format(bucket_name, key_name))
+            self.s3.put_object(bucket_name, key_name, template_body)
+
+        return self.s3.get_object_url(bucket_name, key_name)
+
+    def get_template_kwargs(self, template, artifact_bucket=None):
+        """
+        Get the template argument for CloudFormation API calls. Templates exceeding the TemplateBody size limit
+        are staged in the artifact bucket and passed by TemplateURL.
+        :param template: CloudFormationTemplate
+        :param artifact_bucket: str or None
+        :return: dict
+        """
+        template_body = template.get_template_json()
+
+        if artifact_bucket and len(template_body.encode('utf-8')) > MAX_TEMPLATE_BODY_SIZE:
+            return {"TemplateURL": self.stage_template(template_body, artifact_bucket)}
+
+        return {"TemplateBody": template_body}
 
     def get_stack(self, stack_name):
         """
@@ -98,39 +607,128 @@ class CloudFormation(object):
         except (BotoCoreError, ClientError) as e:
             raise CfnSphereBotoError(e)
 
+    @timed
     @with_boto_retry()
-    def stack_exists(self, stack_name):
+    def get_in_progress_stack_summaries(self):
         """
-        Check if a stack exists for given stack_name
-
-        :param stack_name: str
-        :return: bool
+        Get the summaries of all stacks with an action in progress
+        :return List(dict)
+        :raise CfnSphereBotoError:
         """
         try:
-            if self.get_stack(stack_name).stack_status:
-                return True
-            else:
-                return False
+            stacks = []
+            paginator = self.client.get_paginator('list_stacks')
+            for page in paginator.paginate(StackStatusFilter=IN_PROGRESS_STACK_STATUSES):
+                stacks += page["StackSummaries"]
+            return stacks
         except (BotoCoreError, ClientError) as e:
-            if self.is_boto_stack_does_not_exist_exception(e):
-                return False
-            else:
-                raise CfnSphereBotoError(e)
+            raise CfnSphereBotoError(e)
 
+    @timed
     @with_boto_retry()
-    def get_stack_events(self, stack_name):
+    def list_exports(self):
         """
-        Get recent stack events for a given stack_name
-        :param stack_name: str
-        :return: list(dict)
+        Get all exports of the region
+        :return: dict(str: str): export values by export name
+        :raise CfnSphereBotoError:
         """
         try:
-            paginator = self.client.get_paginator('describe_stack_events')
-            pages = paginator.paginate(StackName=stack_name, PaginationConfig={'MaxItems': 100})
-            return next(iter(pages))["StackEvents"]
+            exports = {}
+            for page in self.client.get_paginator('list_exports').paginate():
+                exports.update((export["Name"], export["Value"]) for export in page["Exports"])
+            return exports
         except (BotoCoreError, ClientError) as e:
             raise CfnSphereBotoError(e)
 
+    def get_exports(self):
+        """
+        Get all exports of the region, listed once and again only after a stack action finished
+        :return: dict(str: str): export values by export name
+        :raise CfnSphereBotoError:
+        """
+        with self._exports_lock:
+            if self._exports is None:
+                self._exports = self.list_exports()
+            return self._exports
+
+    def invalidate_exports(self):
+        """
+        Forget the listed exports, e.g. after a stack action that may have changed them
+        """
+        with self._exports_lock:
+            self._exports = None
+
+    def get_stack_description_if_exists(self, stack_name):
+        """
+        Get a stacks description
+        :param stack_name: string
+        :return dict or None if the stack does not exist
+        :raise CfnSphereBotoError:
+        """
+        try:
+            return self.get_stack_description(stack_name)
+        except CfnSphereBotoError as e:
+            if self.is_boto_stack_does_not_exist_exception(e.boto_exception):
+                return None
+            raise
+
+    @timed
+    def get_stack_descriptions_by_name(self, stack_names):
+        """
+        Get descriptions for the given stacks only. Small sets of stacks are described concurrently by name,
+        larger ones are filtered from a describe_stacks pagination over all stacks.
+        :param stack_names: iterable(str)
+        :return list(dict) for the existing stacks
+        :raise CfnSphereBotoError:
+        """
+        stack_names = set(stack_names)
+
+        if not stack_names:
+            return []
+
+        if len(stack_names) > MAX_TARGETED_STACK_DESCRIPTIONS:
+            return [d for d in self.get_stack_descriptions() if d["StackName"] in stack_names]
+
+        with ThreadPoolExecutor(max_workers=min(len(stack_names), MAX_CONCURRENT_STACK_DESCRIPTIONS)) as pool:
+            descriptions = list(pool.map(self.get_stack_description_if_exists, stack_names))
+
+        return [description for description in descriptions if description]
+
+    def get_stack_descriptions_for(self, stack_names):
+        """
+        Get descriptions for the given stacks, served from the stack snapshot if enabled
+        :param stack_names: iterable(str)
+        :return: list(dict) for the existing stacks
+        """
+        if self.stack_snapshot:
+            return self.stack_snapshot.get_descriptions_for(stack_names)
+
+        return self.get_stack_descriptions_by_name(stack_names)
+
+    def describe_stack_state(self, stack_name):
+        """
+        Get existence, status, parameters and outputs of a stack with a single describe call,
+        served from the stack snapshot if enabled
+        :param stack_name: str
+        :return: StackState
+        :raise CfnSphereBotoError:
+        """
+        if self.stack_snapshot:
+            description = self.stack_snapshot.get_description(stack_name)
+        else:
+            description = self.get_stack_description_if_exists(stack_name)
+
+        return StackState(stack_name, description)
+
+    def stack_exists(self, stack_name):
+        """
+        Check if a stack exists for given stack_name
+
+        :param stack_name: str
+        :return: bool
+        """
+        return self.describe_stack_state(stack_name).exists
+
     @timed
     @with_boto_retry()
     def get_stack_names(self):
@@ -138,8 +736,21 @@ class CloudFormation(object):
         Get a list of stack names
         :return: list(str)
         """
+        if self.stack_snapshot:
+            return [description["StackName"] for description in self.stack_snapshot.get_descriptions()]
+
         return [stack.stack_name for stack in self.get_stacks()]
 
+    def get_current_stack_descriptions(self):
+        """
+        Get all stack descriptions, served from the stack snapshot if enabled
+        :return: list(dict)
+        """
+        if self.stack_snapshot:
+            return self.stack_snapshot.get_descriptions()
+
+        return self.get_stack_descriptions()
+
     @timed
     def get_stacks_dict(self):
         """
@@ -147,7 +758,7 @@ class CloudFormation(object):
         :return: dict
         """
         stacks_dict = {}
-        for stack in self.get_stack_descriptions():
+        for stack in self.get_current_stack_descriptions():
             stacks_dict[stack["StackName"]] = {"parameters": stack.get("Parameters", []),
                                                "outputs": stack.get("Outputs", [])}
         return stacks_dict
@@ -160,13 +771,18 @@ class CloudFormation(object):
         """
         return self.get_stack_description(stack.name).get("Outputs", [])
 
-    def get_stacks_outputs(self):
+    def get_stacks_outputs(self, stack_names=None):
         """
         Get a dict of all available stack outputs
+        :param stack_names: iterable(str): only get outputs of these stacks if set
         :return: dict(dict(output-key, output-value))
         """
         stack_outputs = {}
-        stack_descriptions = self.get_stack_descriptions()
+
+        if stack_names is None:
+            stack_descriptions = self.get_current_stack_descriptions()
+        else:
+            stack_descriptions = self.get_stack_descriptions_for(stack_names)
 
         for stack_description in stack_descriptions:
 
@@ -183,23 +799,23 @@ class CloudFormation(object):
 
         return stack_outputs
 
-    @with_boto_retry()
-    def validate_stack_is_ready_for_action(self, stack):
+    def validate_stack_is_ready_for_action(self, stack, stack_state=None):
         """
         Check if a stack is in a state capable for modification actions
 
         :param stack: cfn_sphere.aws.cfn.CloudFormationStack
+        :param stack_state: StackState: already known state of the stack, described if not set
         :raise CfnStackActionFailedException: if the stack is in an invalid state
         """
-        cfn_stack = self.get_stack(stack.name)
+        if stack_state is None:
+            stack_state = self.describe_stack_state(stack.name)
 
         valid_states = ["CREATE_COMPLETE", "UPDATE_COMPLETE", "IMPORT_COMPLETE", "ROLLBACK_COMPLETE", "UPDATE_ROLLBACK_COMPLETE"]
 
-        if cfn_stack.stack_status not in valid_states:
+        if stack_state.status not in valid_states:
             raise CfnStackActionFailedException(
-                "Stack {0} is in '{1}' state.".format(cfn_stack.stack_name, cfn_stack.stack_status))
+                "Stack {0} is in '{1}' state.".format(stack.name, stack_state.status))
 
-    @with_boto_retry()
     def get_stack_state(self, stack_name):
         """
         Get stack status
@@ -207,22 +823,29 @@ class CloudFormation(object):
         :return: str: stack status
         :raise CfnSphereBotoError:
         """
-        return self.get_stack(stack_name).stack_status
+        return self.describe_stack_state(stack_name).status
 
-    @with_boto_retry()
     def get_stack_parameters_dict(self, stack_name):
         """
         Get a stacks parameters
         :param stack_name: str
         :return: dict
         """
-        parameters = {}
-        stack = self.get_stack(stack_name)
+        return dict(self.describe_stack_state(stack_name).parameters)
 
-        for parameter in stack.parameters:
-            parameters[parameter["ParameterKey"]] = parameter["ParameterValue"]
+    def refresh_stack_snapshot(self, stack_name):
+        """
+        Fetch the current description of a stack and update the stack snapshot with it
+        :param stack_name: str
+        :return: StackState
+        :raise CfnSphereBotoError:
+        """
+        description = self.get_stack_description_if_exists(stack_name)
+
+        if self.stack_snapshot:
+            self.stack_snapshot.update(stack_name, description)
 
-        return parameters
+        return StackState(stack_name, description)
 
     @staticmethod
     def is_boto_no_update_required_exception(exception):
@@ -276,7 +899,6 @@ class CloudFormation(object):
         """
         kwargs = {
             "StackName": stack.name,
-            "TemplateBody": stack.template.get_template_json(),
             "Parameters": stack.get_parameters_list(),
             "Capabilities": [
                 'CAPABILITY_IAM',
@@ -284,6 +906,7 @@ class CloudFormation(object):
             ],
             "Tags": stack.get_tags_list()
         }
+        kwargs.update(self.get_template_kwargs(stack.template, stack.artifact_bucket))
 
         if stack.service_role:
             kwargs["RoleARN"] = stack.service_role
@@ -306,7 +929,6 @@ class CloudFormation(object):
         """
         kwargs = {
             "StackName": stack.name,
-            "TemplateBody": stack.template.get_template_json(),
             "Parameters": stack.get_parameters_list(),
             "Capabilities": [
                 'CAPABILITY_IAM',
@@ -314,6 +936,7 @@ class CloudFormation(object):
             ],
             "Tags": stack.get_tags_list()
         }
+        kwargs.update(self.get_template_kwargs(stack.template, stack.artifact_bucket))
 
         if stack.service_role:
             kwargs["RoleARN"] = stack.service_role
@@ -352,9 +975,10 @@ class CloudFormation(object):
                                                                         stack_parameters_string))
             self._create_stack(stack)
 
-            self.wait_for_stack_action_to_complete(stack.name, "create", stack.timeout)
+            self.wait_for_stack_action_to_complete(stack.name, "create", stack.timeout, stack.expected_duration)
+            self.invalidate_exports()
 
-            stack_outputs = get_pretty_stack_outputs(self.get_stack_outputs(stack))
+            stack_outputs = get_pretty_stack_outputs(self.refresh_stack_snapshot(stack.name).outputs)
             if stack_outputs:
                 self.logger.info("Create completed for {0} with outputs: \n{1}".format(stack.name, stack_outputs))
             else:
@@ -388,9 +1012,10 @@ class CloudFormation(object):
                                                                         stack.template.name,
                                                                         stack_parameters_string))
 
-            self.wait_for_stack_action_to_complete(stack.name, "update", stack.timeout)
+            self.wait_for_stack_action_to_complete(stack.name, "update", stack.timeout, stack.expected_duration)
+            self.invalidate_exports()
 
-            stack_outputs = get_pretty_stack_outputs(self.get_stack_outputs(stack))
+            stack_outputs = get_pretty_stack_outputs(self.refresh_stack_snapshot(stack.name).outputs)
             if stack_outputs:
                 self.logger.info("Update completed for {0} with outputs: \n{1}".format(stack.name, stack_outputs))
             else:
@@ -407,29 +1032,61 @@ class CloudFormation(object):
             self._delete_stack(stack)
 
             try:
-                self.wait_for_stack_action_to_complete(stack.name, "delete", stack.timeout)
+                self.wait_for_stack_action_to_complete(stack.name, "delete", stack.timeout,
+                                                       stack.expected_duration)
             except CfnSphereBotoError as e:
                 if self.is_boto_stack_does_not_exist_exception(e.boto_exception):
                     pass
                 else:
                     raise
 
+            if self.stack_snapshot:
+                self.stack_snapshot.update(stack.name, None)
+            self.invalidate_exports()
+
             self.logger.info("Deletion completed for {0}".format(stack.name))
         except (BotoCoreError, ClientError, CfnSphereBotoError) as e:
             raise CfnStackActionFailedException("Could not delete {0}: {1}".format(stack.name, e))
 
-    def wait_for_stack_action_to_complete(self, stack_name, action, timeout):
+    def wait_for_stack_action_to_complete(self, stack_name, action, timeout, expected_duration=None):
         allowed_actions = ["create", "update", "delete"]
         assert action.lower() in allowed_actions, "action argument must be one of {0}".format(allowed_actions)
 
         time_jitter_window = timedelta(seconds=10)
         minimum_event_timestamp = get_cfn_api_server_time() - time_jitter_window
+        poll_interval = self.poll_interval_factory(expected_duration)
+
+        if self.stack_watcher:
+            start_event, end_event = self.stack_watcher.wait(stack_name, action, timeout, minimum_event_timestamp,
+                                                             poll_interval)
+        else:
+            start_event, end_event = self.wait_for_stack_start_and_end_events(stack_name, action, timeout,
+                                                                              minimum_event_timestamp, poll_interval)
+
+        elapsed = end_event["Timestamp"] - start_event["Timestamp"]
+        self.logger.info("Stack {0} completed after {1}s".format(action, elapsed.seconds))
+
+    def wait_for_stack_start_and_end_events(self, stack_name, action, timeout, minimum_event_timestamp,
+                                            poll_interval):
+        """
+        Wait for a stack action to start and to complete, polling the stacks events
+        :param stack_name: str
+        :param action: str: one of create, update, delete
+        :param timeout: int
+        :param minimum_event_timestamp: timestamp
+        :param poll_interval: poll interval policy
+        :return: tuple(start event, end event)
+        :raise CfnStackActionFailedException:
+        """
         expected_start_event_state = action.upper() + "_IN_PROGRESS"
+        event_stream = StackEventStream(self.client, stack_name, not_before=minimum_event_timestamp)
 
         start_event = self.wait_for_stack_event(stack_name,
                                                 expected_start_event_state,
                                                 minimum_event_timestamp,
-                                                timeout=120)
+                                                timeout=120,
+                                                event_stream=event_stream,
+                                                poll_interval=poll_interval)
 
         self.logger.info("Stack {0} started".format(action))
 
@@ -439,40 +1096,46 @@ class CloudFormation(object):
         end_event = self.wait_for_stack_event(stack_name,
                                               expected_complete_event_state,
                                               minimum_event_timestamp,
-                                              timeout)
+                                              timeout,
+                                              event_stream=event_stream,
+                                              poll_interval=poll_interval)
 
-        elapsed = end_event["Timestamp"] - start_event["Timestamp"]
-        self.logger.info("Stack {0} completed after {1}s".format(action, elapsed.seconds))
+        return start_event, end_event
 
-    def wait_for_stack_event(self, stack_name, expected_event_status, valid_from_timestamp, timeout):
+    def wait_for_stack_event(self, stack_name, expected_event_status, valid_from_timestamp, timeout,
+                             event_stream=None, poll_interval=None):
         """
         Wait for a new stack event. Return it if it has the expected status
         :param stack_name: str
         :param expected_event_status: str
         :param valid_from_timestamp: timestamp
         :param timeout: int
+        :param event_stream: StackEventStream to continue reading from, a new one is created if not set
+        :param poll_interval: poll interval policy, a new one is created if not set
         :return: boto3 stack event
         :raise CfnStackActionFailedException:
         """
         self.logger.debug("Waiting for {0} events, newer than {1}".format(expected_event_status,
                                                                           valid_from_timestamp))
 
-        seen_event_ids = []
-        start = datetime.now()
-        while datetime.now() < (start + timedelta(seconds=int(timeout))):
+        if event_stream is None:
+            event_stream = StackEventStream(self.client, stack_name, not_before=valid_from_timestamp)
+        if poll_interval is None:
+            poll_interval = self.poll_interval_factory(None)
 
-            events = self.get_stack_events(stack_name)
-            events.reverse()
+        end = datetime.now() + timedelta(seconds=int(timeout))
+        while datetime.now() < end:
 
-            for event in events:
-                if event["EventId"] not in seen_event_ids:
-                    seen_event_ids.append(event["EventId"])
-                    event = self.handle_stack_event(event, valid_from_timestamp, expected_event_status, stack_name)
+            new_events_seen = False
+            for event in event_stream.poll():
+                new_events_seen = True
+                event = self.handle_stack_event(event, valid_from_timestamp, expected_event_status, stack_name)
 
-                    if event:
-                        return event
+                if event:
+                    return event
 
-            time.sleep(10)
+            remaining_seconds = (end - datetime.now()).total_seconds()
+            time.sleep(max(0, min(poll_interval.next_interval(new_events_seen), remaining_seconds)))
         raise CfnStackActionFailedException(
             "Timeout occurred waiting for '{0}' on stack {1}".format(expected_event_status, stack_name))
 
@@ -519,14 +1182,15 @@ class CloudFormation(object):
                     self.logger.info(event_string)
                     return None
 
-    def validate_template(self, template):
+    def validate_template(self, template, artifact_bucket=None):
         """
         Validate template
         :param template: CloudFormationTemplate
+        :param artifact_bucket: str: bucket to stage templates exceeding the TemplateBody size limit in
         :return: boolean (true if valid)
         """
         try:
-            self.client.validate_template(TemplateBody=template.get_template_json())
+            self.client.validate_template(**self.get_template_kwargs(template, artifact_bucket))
             return True
         except (BotoCoreError, ClientError) as e:
             raise CfnSphereBotoError(e)
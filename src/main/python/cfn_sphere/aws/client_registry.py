@@ -0,0 +1,75 @@
+import threading
+
+import boto3
+from botocore.config import Config
+
+from cfn_sphere.aws.throttling import register_rate_limiter
+
+MAX_POOL_CONNECTIONS = 50
+
+
+class ClientRegistry(object):
+    """
+    Process wide registry of boto3 clients and resources per service and region. All of them are created lazily
+    from boto3's default session, share its loaded service models and are routed through the rate limiter.
+    """
+
+    def __init__(self, max_pool_connections=MAX_POOL_CONNECTIONS):
+        """
+        :param max_pool_connections: int: http connections kept per client
+        """
+        self.config = Config(max_pool_connections=max_pool_connections)
+        self._clients = {}
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, service_name, region=None):
+        """
+        Get the client of a service in a region, creating it on first use
+        :param service_name: str
+        :param region: str or None for the default region
+        :return: boto3 client
+        """
+        key = (service_name, region)
+
+        with self._lock:
+            if key not in self._clients:
+                client = boto3.client(service_name, region_name=region, config=self.config)
+                self._clients[key] = register_rate_limiter(client)
+            return self._clients[key]
+
+    def get_resource(self, service_name, region=None):
+        """
+        Get the resource of a service in a region, creating it on first use
+        :param service_name: str
+        :param region: str or None for the default region
+        :return: boto3 service resource
+        """
+        key = (service_name, region)
+
+        with self._lock:
+            if key not in self._resources:
+                resource = boto3.resource(service_name, region_name=region, config=self.config)
+                register_rate_limiter(resource.meta.client)
+                self._resources[key] = resource
+            return self._resources[key]
+
+    def reset(self):
+        with self._lock:
+            self._clients = {}
+            self._resources = {}
+
+
+CLIENT_REGISTRY = ClientRegistry()
+
+
+def get_client(service_name, region=None):
+    return CLIENT_REGISTRY.get_client(service_name, region)
+
+
+def get_resource(service_name, region=None):
+    return CLIENT_REGISTRY.get_resource(service_name, region)
+
+
+def reset_clients():
+    CLIENT_REGISTRY.reset()
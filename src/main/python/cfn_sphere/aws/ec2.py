@@ -1,14 +1,27 @@
-import boto3
+import threading
+
 from botocore.exceptions import ClientError, BotoCoreError
 
+from cfn_sphere.aws.client_registry import get_client
 from cfn_sphere.exceptions import CfnSphereBotoError
 from cfn_sphere.exceptions import CfnSphereException
 from cfn_sphere.util import with_boto_retry
 
+TAUPAGE_AMI_NAME_PATTERN = 'Taupage-AMI-*'
+CACHE_NAMESPACE = "ami"
+
 
 class Ec2Api(object):
-    def __init__(self, region="eu-west-1"):
-        self.client = boto3.client('ec2', region_name=region)
+    def __init__(self, region="eu-west-1", cache=None):
+        """
+        :param region: str
+        :param cache: cfn_sphere.cache.DiskCache to persist latest image ids across runs, optional
+        """
+        self.region = region
+        self.client = get_client('ec2', region)
+        self.cache = cache
+        self._latest_image_ids = {}
+        self._lock = threading.Lock()
 
     @with_boto_retry()
     def get_images(self, name_pattern):
@@ -32,7 +45,7 @@ class Ec2Api(object):
             raise CfnSphereBotoError(e)
 
         if not response['Images']:
-            raise CfnSphereException("Could not find any private and available Taupage AMI")
+            raise CfnSphereException("Could not find any private and available AMI matching {0}".format(name_pattern))
 
         return response['Images']
 
@@ -43,20 +56,41 @@ class Ec2Api(object):
         :param images_list: list(dict)
         :return str: image id
         """
-        images = {image['CreationDate']: image['ImageId'] for image in images_list}
-        creation_dates = list(images.keys())
-        creation_dates.sort(reverse=True)
-        return images[creation_dates[0]]
+        return max(images_list, key=lambda image: image['CreationDate'])['ImageId']
+
+    def get_latest_image_id_by_name(self, name_pattern):
+        """
+        Return the image id of the most recent private AMI matching the given name pattern.
+        The result is memoized for the lifetime of this instance and kept in the disk cache if configured.
+
+        :param name_pattern: str: AMI name pattern
+        :return: str: image id
+        :raise CfnSphereException:
+        """
+        with self._lock:
+            if name_pattern in self._latest_image_ids:
+                return self._latest_image_ids[name_pattern]
+
+        cache_key = "{0}\n{1}".format(self.region, name_pattern)
+        image_id = self.cache.get(CACHE_NAMESPACE, cache_key) if self.cache else None
+
+        if image_id is None:
+            image_id = self.get_latest_image_id(self.get_images(name_pattern))
+            if self.cache:
+                self.cache.set(CACHE_NAMESPACE, cache_key, image_id)
+
+        with self._lock:
+            self._latest_image_ids[name_pattern] = image_id
+
+        return image_id
 
-    @with_boto_retry()
     def get_latest_taupage_image_id(self):
         """
         Return the image id of the most recent private AMI matching the name pattern 'Taupage-AMI-*'
 
         :return: str: image id
         """
-        taupage_images = self.get_images(name_pattern='Taupage-AMI-*')
-        return self.get_latest_image_id(taupage_images)
+        return self.get_latest_image_id_by_name(TAUPAGE_AMI_NAME_PATTERN)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,77 @@
 import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 from boto3.exceptions import Boto3Error
 from botocore.exceptions import ClientError
 
+from cfn_sphere.aws.client_registry import get_client
 from cfn_sphere.exceptions import CfnSphereBotoError, CfnSphereException
+from cfn_sphere.util import with_boto_retry
+
+MAX_CONCURRENT_REQUESTS = 5
+CACHE_NAMESPACE = "kms"
 
 
 class KMS(object):
-    def __init__(self, region="eu-west-1"):
-        self.client = boto3.client('kms', region_name=region)
+    def __init__(self, region="eu-west-1", cache=None):
+        """
+        :param region: str
+        :param cache: cfn_sphere.cache.DiskCache to persist decrypted values across runs, optional
+        """
+        self.client = get_client('kms', region)
+        self.cache = cache
+        self._decrypted_values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_memo_key(encrypted_value, encryption_context):
+        return encrypted_value, tuple(sorted((encryption_context or {}).items()))
 
     def decrypt(self, encrypted_value, encryption_context=None):
+        """
+        Decrypt a value, memoized by ciphertext and encryption context
+        :param encrypted_value: str: base64 encoded ciphertext
+        :param encryption_context: dict
+        :return: str
+        """
+        memo_key = self._get_memo_key(encrypted_value, encryption_context)
+
+        with self._lock:
+            if memo_key in self._decrypted_values:
+                return self._decrypted_values[memo_key]
+
+        cache_key = json.dumps(memo_key)
+        value = self.cache.get(CACHE_NAMESPACE, cache_key) if self.cache else None
+
+        if value is None:
+            value = self._decrypt(encrypted_value, encryption_context)
+            if self.cache:
+                self.cache.set(CACHE_NAMESPACE, cache_key, value)
+
+        with self._lock:
+            self._decrypted_values[memo_key] = value
+
+        return value
+
+    def decrypt_many(self, values):
+        """
+        Decrypt distinct values concurrently, filling the memo
+        :param values: iterable(tuple(str, dict)): ciphertext and encryption context
+        :return: list(str) in order of the given values
+        """
+        values = list(values)
+        distinct_values = list({self._get_memo_key(*value): value for value in values}.values())
+
+        if distinct_values:
+            with ThreadPoolExecutor(max_workers=min(len(distinct_values), MAX_CONCURRENT_REQUESTS)) as pool:
+                list(pool.map(lambda value: self.decrypt(*value), distinct_values))
+
+        return [self.decrypt(*value) for value in values]
+
+    @with_boto_retry()
+    def _decrypt(self, encrypted_value, encryption_context=None):
         if encryption_context is None:
             encryption_context = {}
 
@@ -22,8 +82,12 @@ class KMS(object):
         except Boto3Error as e:
             raise CfnSphereBotoError(e)
         except ClientError as e:
+            boto_error = CfnSphereBotoError(e)
+            if boto_error.is_throttling_exception:
+                raise boto_error
             raise CfnSphereException(e)
 
+    @with_boto_retry()
     def encrypt(self, key_id, cleartext_string, encryption_context=None):
         if encryption_context is None:
             encryption_context = {}
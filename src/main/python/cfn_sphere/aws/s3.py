@@ -1,15 +1,19 @@
-import boto3
 from boto3.exceptions import Boto3Error
 from botocore.exceptions import BotoCoreError, ClientError
-from six.moves.urllib.parse import urlparse
+from six.moves.urllib.parse import urlparse, quote
 
+from cfn_sphere.aws.client_registry import get_resource
 from cfn_sphere.exceptions import CfnSphereBotoError
 from cfn_sphere.util import with_boto_retry
 
 
 class S3(object):
-    def __init__(self):
-        self.s3 = boto3.resource('s3')
+    def __init__(self, region=None):
+        """
+        :param region: str or None for the default region
+        """
+        self.s3 = get_resource('s3', region)
+        self.client = self.s3.meta.client
 
     @staticmethod
     def _parse_url(url):
@@ -27,3 +31,32 @@ class S3(object):
             return s3_object.get(ResponseContentEncoding='utf-8')["Body"].read().decode('utf-8')
         except (Boto3Error, BotoCoreError, ClientError) as e:
             raise CfnSphereBotoError(e)
+
+    @with_boto_retry()
+    def object_exists(self, bucket_name, key_name):
+        try:
+            self.client.head_object(Bucket=bucket_name, Key=key_name)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ["404", "NoSuchKey", "NotFound"]:
+                return False
+            raise CfnSphereBotoError(e)
+        except BotoCoreError as e:
+            raise CfnSphereBotoError(e)
+
+    @with_boto_retry()
+    def put_object(self, bucket_name, key_name, body):
+        try:
+            self.client.put_object(Bucket=bucket_name, Key=key_name, Body=body.encode('utf-8'))
+        except (BotoCoreError, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+    def get_object_url(self, bucket_name, key_name):
+        """
+        Get the path-style https url of an object on the clients regional endpoint. Unlike virtual-hosted
+        urls it is valid for dotted bucket names and in all partitions.
+        :param bucket_name: str
+        :param key_name: str
+        :return: str
+        """
+        return "{0}/{1}/{2}".format(self.client.meta.endpoint_url.rstrip('/'), bucket_name, quote(key_name))
@@ -0,0 +1,96 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.exceptions import Boto3Error
+from botocore.exceptions import ClientError
+
+from cfn_sphere.aws.client_registry import get_client
+from cfn_sphere.exceptions import CfnSphereBotoError
+from cfn_sphere.util import get_logger, with_boto_retry
+
+MAX_SECRETS_PER_REQUEST = 20
+MAX_CONCURRENT_REQUESTS = 5
+
+
+class SecretsManager(object):
+    def __init__(self, region="eu-west-1"):
+        self.logger = get_logger()
+        self.client = get_client('secretsmanager', region)
+
+    @staticmethod
+    def _get_value(secret):
+        if 'SecretString' in secret:
+            return secret['SecretString']
+        return base64.b64encode(secret['SecretBinary']).decode('utf-8')
+
+    @with_boto_retry()
+    def get_secret_value(self, secret_id):
+        """
+        Get the current value of a secret. Binary secrets are returned base64 encoded.
+        :param secret_id: str: name or arn of the secret
+        :return: str
+        :raise CfnSphereBotoError:
+        """
+        try:
+            return self._get_value(self.client.get_secret_value(SecretId=secret_id))
+        except (Boto3Error, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+    @with_boto_retry()
+    def _batch_get_secret_values(self, secret_ids):
+        """
+        Get up to 20 secrets with BatchGetSecretValue
+        :param secret_ids: list(str): names or arns
+        :return: dict(str, str) for the secrets found, by the given id
+        :raise CfnSphereBotoError:
+        """
+        try:
+            secrets = []
+            kwargs = {'SecretIdList': secret_ids}
+            while True:
+                response = self.client.batch_get_secret_value(**kwargs)
+                secrets.extend(response['SecretValues'])
+                if not response.get('NextToken'):
+                    break
+                kwargs['NextToken'] = response['NextToken']
+        except (Boto3Error, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+        values = {}
+        for secret in secrets:
+            for secret_id in (secret.get('Name'), secret.get('ARN')):
+                if secret_id in secret_ids:
+                    values[secret_id] = self._get_value(secret)
+        return values
+
+    def get_secret_values(self, secret_ids):
+        """
+        Get the values of many secrets with BatchGetSecretValue in chunks of 20, issued concurrently.
+        Secrets not returned by a batch, or all secrets if batches are not permitted or not supported
+        by the installed botocore, are fetched with concurrent GetSecretValue calls.
+        :param secret_ids: iterable(str): names or arns
+        :return: dict(str, str) by the given id
+        :raise CfnSphereBotoError: if a secret could not be fetched
+        """
+        secret_ids = sorted(set(secret_ids))
+        if not secret_ids:
+            return {}
+
+        batches = [secret_ids[i:i + MAX_SECRETS_PER_REQUEST]
+                   for i in range(0, len(secret_ids), MAX_SECRETS_PER_REQUEST)]
+
+        values = {}
+        if hasattr(self.client, 'batch_get_secret_value'):
+            try:
+                with ThreadPoolExecutor(max_workers=min(len(batches), MAX_CONCURRENT_REQUESTS)) as pool:
+                    for batch_values in pool.map(self._batch_get_secret_values, batches):
+                        values.update(batch_values)
+            except CfnSphereBotoError as e:
+                self.logger.warning("Could not get secrets in batches, will get them one by one: {0}".format(e))
+
+        missing_ids = [secret_id for secret_id in secret_ids if secret_id not in values]
+        if missing_ids:
+            with ThreadPoolExecutor(max_workers=min(len(missing_ids), MAX_CONCURRENT_REQUESTS)) as pool:
+                values.update(zip(missing_ids, pool.map(self.get_secret_value, missing_ids)))
+
+        return values
@@ -1,19 +1,82 @@
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+
 from boto3.exceptions import Boto3Error
 from botocore.exceptions import ClientError
+from cfn_sphere.aws.client_registry import get_client
 from cfn_sphere.exceptions import CfnSphereBotoError, CfnSphereException
+from cfn_sphere.util import with_boto_retry
+
+MAX_PARAMETERS_PER_REQUEST = 10
+MAX_CONCURRENT_REQUESTS = 5
+
 
 class SSM(object):
     
     def __init__(self, region='eu-west-1'):
-        self.client = boto3.client('ssm', region_name=region)
+        self.client = get_client('ssm', region)
 
+    @with_boto_retry()
     def get_parameter(self, name, with_decryption=True):
         try:
             return self.client.get_parameter(Name=name, WithDecryption=with_decryption)['Parameter']['Value']
         except (Boto3Error, ClientError) as e:
             raise CfnSphereBotoError(e)
 
+    @with_boto_retry()
+    def _get_parameters(self, names, with_decryption=True):
+        """
+        Get up to 10 parameters with a single GetParameters call
+        :param names: list(str)
+        :param with_decryption: bool
+        :return: dict(str, str) for the parameters found
+        :raise CfnSphereBotoError:
+        """
+        try:
+            response = self.client.get_parameters(Names=names, WithDecryption=with_decryption)
+            return {p['Name'] + p.get('Selector', ''): p['Value'] for p in response['Parameters']}
+        except (Boto3Error, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+    def get_parameters(self, names, with_decryption=True):
+        """
+        Get parameters in batches of 10, issued concurrently
+        :param names: iterable(str)
+        :param with_decryption: bool
+        :return: dict(str, str) for the parameters found
+        :raise CfnSphereBotoError:
+        """
+        names = sorted(set(names))
+        batches = [names[i:i + MAX_PARAMETERS_PER_REQUEST] for i in range(0, len(names), MAX_PARAMETERS_PER_REQUEST)]
+
+        if not batches:
+            return {}
+
+        values = {}
+        with ThreadPoolExecutor(max_workers=min(len(batches), MAX_CONCURRENT_REQUESTS)) as pool:
+            for batch_values in pool.map(lambda batch: self._get_parameters(batch, with_decryption), batches):
+                values.update(batch_values)
+
+        return values
+
+    @with_boto_retry()
+    def get_parameters_by_path(self, path, with_decryption=True):
+        """
+        Get all parameters below a path, recursively
+        :param path: str
+        :param with_decryption: bool
+        :return: dict(str, str)
+        :raise CfnSphereBotoError:
+        """
+        try:
+            values = {}
+            paginator = self.client.get_paginator('get_parameters_by_path')
+            for page in paginator.paginate(Path=path, Recursive=True, WithDecryption=with_decryption):
+                values.update({p['Name']: p['Value'] for p in page['Parameters']})
+            return values
+        except (Boto3Error, ClientError) as e:
+            raise CfnSphereBotoError(e)
+
+
 if __name__ == "__main__":
     ssm_client = SSM()
     a = ssm_client.get_parameter('/tuv-blk/config.edn/database/blk-tuv-db-auroradbcluster/blk_master_cdc', True)
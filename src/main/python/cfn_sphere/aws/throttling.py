@@ -0,0 +1,148 @@
+import threading
+import time
+
+from cfn_sphere.exceptions import THROTTLING_ERROR_CODES
+from cfn_sphere.util import get_logger
+
+DEFAULT_RATE = 20.0
+MINIMUM_RATE = 0.5
+RATE_DECREASE_FACTOR = 0.5
+RATE_RECOVERY_STEP = 0.5
+
+
+class AdaptiveTokenBucket(object):
+    """
+    Token bucket whose refill rate shrinks multiplicatively on throttling and recovers additively on success
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, minimum_rate=MINIMUM_RATE, maximum_rate=DEFAULT_RATE,
+                 decrease_factor=RATE_DECREASE_FACTOR, recovery_step=RATE_RECOVERY_STEP):
+        """
+        :param rate: float: initial tokens per second
+        :param minimum_rate: float: tokens per second
+        :param maximum_rate: float: tokens per second
+        :param decrease_factor: float: rate multiplier applied on throttling
+        :param recovery_step: float: tokens per second added on success
+        """
+        self.rate = float(rate)
+        self.minimum_rate = float(minimum_rate)
+        self.maximum_rate = float(maximum_rate)
+        self.decrease_factor = decrease_factor
+        self.recovery_step = recovery_step
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return max(1.0, self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+        self.timestamp = now
+
+    def acquire(self):
+        """
+        Take a token, blocking until one is available
+        :return: float: seconds waited
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait_time = 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        return wait_time
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.minimum_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.maximum_rate:
+                self._refill()
+                self.rate = min(self.maximum_rate, self.rate + self.recovery_step)
+
+
+class RateLimiter(object):
+    """
+    Process wide client side rate limiter keeping one AdaptiveTokenBucket per AWS service and operation.
+    Hooks into botocore clients through their before-send and needs-retry events, which fire once per
+    http attempt, so the attempts of botocore's own retries are rate limited and shrink the rate as well.
+    """
+
+    def __init__(self, bucket_factory=AdaptiveTokenBucket):
+        """
+        :param bucket_factory: callable returning a new token bucket
+        """
+        self.logger = get_logger()
+        self.bucket_factory = bucket_factory
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, service_name, operation_name):
+        """
+        Get the token bucket of an operation, creating it on first use
+        :param service_name: str
+        :param operation_name: str
+        :return: AdaptiveTokenBucket
+        """
+        key = (service_name, operation_name)
+
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = self.bucket_factory()
+            return self._buckets[key]
+
+    def _get_bucket_for_event(self, event_name):
+        _, service_name, operation_name = event_name.split('.', 2)
+        return self.get_bucket(service_name, operation_name)
+
+    def before_send(self, event_name=None, **kwargs):
+        wait_time = self._get_bucket_for_event(event_name).acquire()
+        if wait_time:
+            self.logger.debug("Delayed {0} request by {1:.2f}s".format(event_name, wait_time))
+
+    def needs_retry(self, event_name=None, response=None, **kwargs):
+        if response is None:
+            return
+
+        bucket = self._get_bucket_for_event(event_name)
+        error_code = (response[1] or {}).get("Error", {}).get("Code")
+
+        if error_code in THROTTLING_ERROR_CODES:
+            bucket.on_throttle()
+            self.logger.debug("{0} request throttled, lowered rate to {1}/s".format(event_name, bucket.rate))
+        else:
+            bucket.on_success()
+
+    def register(self, client):
+        """
+        Route all http requests of a boto3 client through the rate limiter
+        :param client: boto3 client
+        """
+        client.meta.events.register('before-send', self.before_send)
+        client.meta.events.register('needs-retry', self.needs_retry)
+
+    def reset(self):
+        with self._lock:
+            self._buckets = {}
+
+
+RATE_LIMITER = RateLimiter()
+
+
+def register_rate_limiter(client):
+    """
+    Route all calls of a boto3 client through the process wide rate limiter
+    :param client: boto3 client
+    :return: the client
+    """
+    RATE_LIMITER.register(client)
+    return client
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = None
+
+from cfn_sphere.exceptions import CfnSphereException
+from cfn_sphere.util import get_logger
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cfn-sphere")
+KEY_FILE_NAME = "cache.key"
+
+
+class DiskCache(object):
+    """
+    Key value cache persisted across runs. Entries are stored as files below a directory, encrypted with a
+    local key (created on first use, readable by the current user only) and expire after a ttl.
+    Requires the optional 'cryptography' package.
+    """
+
+    def __init__(self, ttl, directory=DEFAULT_CACHE_DIR):
+        """
+        :param ttl: int: seconds an entry is valid
+        :param directory: str
+        :raise CfnSphereException: if the cryptography package is not installed
+        """
+        if Fernet is None:
+            raise CfnSphereException("The disk cache requires the 'cryptography' package, please install it")
+
+        self.logger = get_logger()
+        self.ttl = int(ttl)
+        self.directory = directory
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+
+        self._fernet = Fernet(self._load_or_create_key())
+
+    def _load_or_create_key(self):
+        key_file = os.path.join(self.directory, KEY_FILE_NAME)
+
+        try:
+            fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except OSError:
+            with open(key_file, "rb") as f:
+                return f.read()
+
+        key = Fernet.generate_key()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _get_path(self, namespace, key):
+        digest = hashlib.sha256("{0}\n{1}".format(namespace, key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "{0}-{1}".format(namespace, digest))
+
+    def get(self, namespace, key):
+        """
+        Get a cached value
+        :param namespace: str
+        :param key: str
+        :return: the value or None if not cached, expired or unreadable
+        """
+        try:
+            with open(self._get_path(namespace, key), "rb") as f:
+                token = f.read()
+        except (IOError, OSError):
+            return None
+
+        try:
+            return json.loads(self._fernet.decrypt(token, ttl=self.ttl).decode("utf-8"))
+        except (InvalidToken, ValueError):
+            return None
+
+    def set(self, namespace, key, value):
+        """
+        Cache a json serializable value
+        :param namespace: str
+        :param key: str
+        :param value: json serializable value
+        """
+        token = self._fernet.encrypt(json.dumps(value).encode("utf-8"))
+
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.replace(temp_path, self._get_path(namespace, key))
+        except (IOError, OSError) as e:
+            self.logger.warning("Could not write cache entry: {0}".format(e))
@@ -68,7 +68,12 @@ def cli(name=None):
 @click.option('--yes', '-y', is_flag=True, default=False, envvar='CFN_SPHERE_CONFIRM',
               help="Override user confirm dialog with yes (alias for -c/--confirm")
 @click.option('--tags', default=None, envvar='CFN_SPHERE_STACK_TAGS', type=click.STRING)
-def sync(config, parameter, suffix, debug, confirm, yes, tags):
+@click.option('--parallelism', '-P', default=1, envvar='CFN_SPHERE_PARALLELISM', type=click.IntRange(min=1),
+              help="Number of stacks to process concurrently once their dependencies are satisfied")
+@click.option('--cache-ttl', default=0, envvar='CFN_SPHERE_CACHE_TTL', type=click.IntRange(min=0),
+              help="Cache decrypted kms values and latest AMI ids encrypted on local disk for the given seconds "
+                   "(requires 'cryptography')")
+def sync(config, parameter, suffix, debug, confirm, yes, tags, parallelism, cache_ttl):
     confirm = confirm or yes
     if debug:
         LOGGER.setLevel(logging.DEBUG)
@@ -87,7 +92,7 @@ def sync(config, parameter, suffix, debug, confirm, yes, tags):
 
     try:
         config = Config(config_file=config, cli_params=parameter, cli_tags=tags, stack_name_suffix=suffix)
-        StackActionHandler(config).create_or_update_stacks()
+        StackActionHandler(config, parallelism=parallelism, cache_ttl=cache_ttl).create_or_update_stacks()
     except CfnSphereException as e:
         LOGGER.error(e)
         if debug:
@@ -109,7 +114,9 @@ def sync(config, parameter, suffix, debug, confirm, yes, tags):
               help="Override user confirm dialog with yes")
 @click.option('--yes', '-y', is_flag=True, default=False, envvar='CFN_SPHERE_CONFIRM',
               help="Override user confirm dialog with yes (alias for -c/--confirm")
-def delete(config, suffix, debug, confirm, yes):
+@click.option('--parallelism', '-P', default=1, envvar='CFN_SPHERE_PARALLELISM', type=click.IntRange(min=1),
+              help="Number of stacks to delete concurrently once all stacks referencing them are gone")
+def delete(config, suffix, debug, confirm, yes, parallelism):
     confirm = confirm or yes
     if debug:
         LOGGER.setLevel(logging.DEBUG)
@@ -124,7 +131,7 @@ def delete(config, suffix, debug, confirm, yes):
     try:
 
         config = Config(config, stack_name_suffix=suffix)
-        StackActionHandler(config).delete_stacks()
+        StackActionHandler(config, parallelism=parallelism).delete_stacks()
     except CfnSphereException as e:
         LOGGER.error(e)
         if debug:
@@ -183,7 +190,9 @@ def render_template(template_file, confirm, yes):
               help="Override user confirm dialog with yes")
 @click.option('--yes', '-y', is_flag=True, default=False, envvar='CFN_SPHERE_CONFIRM',
               help="Override user confirm dialog with yes (alias for -c/--confirm")
-def validate_template(template_file, confirm, yes):
+@click.option('--artifact-bucket', default=None, envvar='CFN_SPHERE_ARTIFACT_BUCKET',
+              help="S3 bucket to stage templates exceeding the CloudFormation template body size limit in")
+def validate_template(template_file, confirm, yes, artifact_bucket):
     confirm = confirm or yes
     if not confirm:
         check_update_available()
@@ -192,7 +201,7 @@ def validate_template(template_file, confirm, yes):
         loader = FileLoader()
         template = loader.get_cloudformation_template(template_file, None)
         template = CloudFormationTemplateTransformer.transform_template(template)
-        CloudFormation().validate_template(template)
+        CloudFormation().validate_template(template, artifact_bucket=artifact_bucket)
         click.echo("Template is valid")
     except CfnSphereException as e:
         LOGGER.error(e)
@@ -1,5 +1,8 @@
 from botocore.exceptions import ClientError
 
+THROTTLING_ERROR_CODES = ["Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+                          "RequestLimitExceeded", "TooManyRequestsException", "SlowDown"]
+
 
 class CfnSphereException(Exception):
     def __init__(self, message="", boto_exception=None):
@@ -58,7 +61,7 @@ class CfnSphereBotoError(CfnSphereException):
 
         self.pretty_string = "{0}: {1}".format(code, message)
 
-        if code == "Throttling":
+        if code in THROTTLING_ERROR_CODES:
             self.is_throttling_exception = True
 
     def __str__(self):
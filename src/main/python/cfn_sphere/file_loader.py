@@ -4,11 +4,24 @@ import os
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as BaseYamlLoader
+except ImportError:
+    from yaml import SafeLoader as BaseYamlLoader
+
 from cfn_sphere.aws.s3 import S3
 from cfn_sphere.exceptions import TemplateErrorException, CfnSphereException
 from cfn_sphere.template import CloudFormationTemplate
 
 
+class CfnYamlLoader(BaseYamlLoader):
+    """
+    Safe yaml loader handling cfn intrinsic functions specified as yaml tags. Based on the libyaml
+    C implementation if available, on the pure python implementation otherwise.
+    """
+    pass
+
+
 class FileLoader(object):
     @classmethod
     def get_cloudformation_template(cls, url, working_dir):
@@ -82,12 +95,7 @@ class FileLoader(object):
             elif url.lower().endswith(".template"):
                 return json.loads(file_content)
             elif url.lower().endswith(".yml") or url.lower().endswith(".yaml"):
-                if hasattr(yaml, 'FullLoader'):
-                    loader = yaml.FullLoader
-                else:
-                    loader = yaml.Loader
-                yaml.add_multi_constructor(u"", cls.handle_yaml_constructors, Loader=loader)
-                return yaml.load(file_content, Loader=loader)
+                return yaml.load(file_content, Loader=CfnYamlLoader)
             else:
                 raise CfnSphereException(
                     "Invalid suffix, use [json|template|yml|yaml]")
@@ -108,14 +116,25 @@ class FileLoader(object):
             return cls._fs_get_file(url, working_dir)
 
     @staticmethod
-    def _fs_get_file(url, working_dir):
+    def get_file_path(url, working_dir):
+        """
+        Resolve the path of a file on the filesystem
+        :param url: str: absolute path or path relative to the working dir
+        :param working_dir: str
+        :return: str
+        """
+        if not os.path.isabs(url) and working_dir:
+            return os.path.join(working_dir, url)
+        return url
+
+    @classmethod
+    def _fs_get_file(cls, url, working_dir):
         """
         Load file from filesystem
         :param url: str template path
         :return: str(utf-8)
         """
-        if not os.path.isabs(url) and working_dir:
-            url = os.path.join(working_dir, url)
+        url = cls.get_file_path(url, working_dir)
 
         try:
             with codecs.open(url, 'r', encoding='utf-8') as f:
@@ -136,3 +155,6 @@ class FileLoader(object):
         except Exception as e:
             raise CfnSphereException(
                 "Could not load file from {0}: {1}".format(url, e))
+
+
+CfnYamlLoader.add_multi_constructor(u"", FileLoader.handle_yaml_constructors)
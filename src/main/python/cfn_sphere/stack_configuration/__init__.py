@@ -8,7 +8,7 @@ from cfn_sphere.util import get_logger
 from cfn_sphere.stack_configuration.dependency_resolver import DependencyResolver
 
 ALLOWED_CONFIG_KEYS = ["region", "stacks", "service-role", "stack-policy-url", "timeout", "tags", "on_failure",
-                       "disable_rollback"]
+                       "disable_rollback", "artifact-bucket"]
 
 
 class Config(object):
@@ -42,6 +42,7 @@ class Config(object):
         self.default_failure_action = config_dict.get("on_failure", "ROLLBACK")
         self.default_disable_rollback = config_dict.get("disable_rollback", False)
         self.default_termination_protection = config_dict.get("termination_protection", False)
+        self.default_artifact_bucket = config_dict.get("artifact-bucket")
 
         stacks = self._parse_stack_configs(config_dict)
         self.stacks = self._apply_stack_name_suffix_to_stacks(stacks, stack_name_suffix)
@@ -93,6 +94,7 @@ class Config(object):
                     and self.default_timeout == other.default_timeout
                     and self.default_disable_rollback == other.default_disable_rollback
                     and self.default_termination_protection == other.default_termination_protection
+                    and self.default_artifact_bucket == other.default_artifact_bucket
                     and stacks_equal):
                 return True
         except AttributeError:
@@ -133,7 +135,8 @@ class Config(object):
                                                default_stack_policy_url=self.default_stack_policy_url,
                                                default_failure_action=self.default_failure_action,
                                                default_disable_rollback=self.default_disable_rollback,
-                                               default_termination_protection=self.default_termination_protection)
+                                               default_termination_protection=self.default_termination_protection,
+                                               default_artifact_bucket=self.default_artifact_bucket)
 
             except InvalidConfigException as e:
                 raise InvalidConfigException("Invalid config for stack {0}: {1}".format(key, e))
@@ -220,11 +223,11 @@ class Config(object):
 
 
 class StackConfig(object):
-    STACK_CONFIG_ALLOWED_CONFIG_KEYS = ALLOWED_CONFIG_KEYS + ["parameters", "template-url"]
+    STACK_CONFIG_ALLOWED_CONFIG_KEYS = ALLOWED_CONFIG_KEYS + ["parameters", "template-url", "expected-duration"]
 
     def __init__(self, stack_config_dict, working_dir=None, default_tags=None, default_timeout=600,
                  default_service_role=None, default_stack_policy_url=None, default_failure_action="ROLLBACK",
-                 default_disable_rollback=False, default_termination_protection=False):
+                 default_disable_rollback=False, default_termination_protection=False, default_artifact_bucket=None):
 
         if not stack_config_dict or not isinstance(stack_config_dict, dict):
             raise InvalidConfigException("Stack configuration must not be empty")
@@ -244,6 +247,8 @@ class StackConfig(object):
         self.failure_action = stack_config_dict.get("on_failure", default_failure_action)
         self.disable_rollback = stack_config_dict.get("disable_rollback", default_disable_rollback)
         self.termination_protection = stack_config_dict.get("termination_protection", default_termination_protection)
+        self.expected_duration = stack_config_dict.get("expected-duration")
+        self.artifact_bucket = stack_config_dict.get("artifact-bucket", default_artifact_bucket)
 
         self.working_dir = working_dir
         self._stack_config_dict = stack_config_dict
@@ -280,6 +285,14 @@ class StackConfig(object):
                 assert str(self.failure_action).lower() in ['do_nothing', 'rollback', 'delete'], \
                     "on_failure property value must be one of 'DO_NOTHING'|'ROLLBACK'|'DELETE'"
 
+            if self.expected_duration:
+                assert isinstance(self.expected_duration, int), \
+                    "expected-duration must be of type int, not {0}".format(type(self.expected_duration))
+
+            if self.artifact_bucket:
+                assert isinstance(self.artifact_bucket, string_types), \
+                    "artifact-bucket must be of type str, not {0}".format(type(self.artifact_bucket))
+
             if self.disable_rollback:
                 assert isinstance(self.disable_rollback, bool), "disable_rollback property value must be a boolean"
 
@@ -295,7 +308,8 @@ class StackConfig(object):
                     and self.service_role == other.service_role
                     and self.stack_policy_url == other.stack_policy_url
                     and self.template_url == other.template_url
-                    and self.failure_action == other.failure_action):
+                    and self.failure_action == other.failure_action
+                    and self.artifact_bucket == other.artifact_bucket):
                 return True
         except AttributeError:
             return False
@@ -7,35 +7,65 @@ from cfn_sphere.exceptions import CfnSphereException, InvalidDependencyGraphExce
 
 class DependencyResolver(object):
     @staticmethod
-    def parse_stack_reference_value(value):
+    def parse_stack_reference(value):
+        """
+        Parse a stack output reference like |ref|stack.output or |ref|region:stack.output
+        :param value: str
+        :return: tuple(str, str, str): stack name, output name and region or None if not region qualified
+        :raise CfnSphereException: if the reference has an invalid format
+        """
         if not value:
-            return None, None
+            return None, None, None
 
         if value.lower().startswith('|ref|'):
             components = value.split('|')
             if len(components) != 3:
-                raise CfnSphereException("Stack output reference must be like '|ref|stack.output'")
+                raise CfnSphereException("Stack output reference must be like '|ref|[region:]stack.output'")
 
             reference = components[2]
 
+            region = None
+            if ':' in reference:
+                region, reference = reference.split(':', 1)
+                if not region:
+                    raise CfnSphereException("Stack output reference must be like '|ref|[region:]stack.output'")
+
             reference_components = reference.split('.')
             if len(reference_components) != 2:
-                raise CfnSphereException("Stack output reference must be like '|ref|stack.output'")
+                raise CfnSphereException("Stack output reference must be like '|ref|[region:]stack.output'")
 
             stack_name = reference_components[0]
             output_name = reference_components[1]
 
-            return stack_name, output_name
+            return stack_name, output_name, region
         else:
-            return None, None
+            return None, None, None
+
+    @classmethod
+    def parse_stack_reference_value(cls, value):
+        stack_name, output_name, _ = cls.parse_stack_reference(value)
+        return stack_name, output_name
 
     @staticmethod
-    def is_parameter_reference(value):
+    def is_cross_region_reference(value):
+        if not isinstance(value, string_types):
+            return False
+
+        return value.lower().startswith("|ref|") and ':' in value.split('|', 2)[2]
+
+    @classmethod
+    def is_parameter_reference(cls, value):
+        """
+        Check if a value references an output of a stack in the same region, i.e. a potential dependency.
+        Region qualified references are not, as all stacks of a config live in one region.
+        :param value: parameter value
+        :return: bool
+        """
         if not isinstance(value, string_types):
             return False
 
         if value.lower().startswith("|ref|"):
-            return True
+            return not cls.is_cross_region_reference(value)
         else:
             return False
 
@@ -0,0 +1,354 @@
+import json
+import os
+import threading
+
+import jmespath
+from jmespath.exceptions import JMESPathError
+from six import string_types
+
+from cfn_sphere.exceptions import CfnSphereException
+from cfn_sphere.file_loader import FileLoader
+from cfn_sphere.stack_configuration.resolution_plan import Macro
+from cfn_sphere.util import get_logger
+
+
+class MacroResolver(object):
+    """
+    Resolves the macros of one or more kinds. Implementations fetch the values of many distinct macros
+    in bulk and memoize them, so resolving a macro again does not hit the backend twice. Implementations are
+    used by the stack executor's workers concurrently and guard their memos with a lock.
+    """
+
+    def resolve_many(self, macros):
+        """
+        Resolve the values of many macros
+        :param macros: list(Macro): macros with distinct keys
+        :return: dict(tuple: value): values by macro key
+        :raise CfnSphereException: if a value could not be resolved
+        """
+        raise NotImplementedError()
+
+    def resolve(self, macro):
+        """
+        Resolve the value of a single macro
+        :param macro: Macro
+        :return: value
+        """
+        return self.resolve_many([macro])[macro.key]
+
+
+class SsmResolver(MacroResolver):
+    """
+    Resolves |ssm| parameters and |ssmpath| paths. Paths are fetched first, so parameters below
+    a fetched path are answered locally, the remaining parameters are fetched with batched GetParameters calls.
+    Names with a :<version> or :<label> selector are never answered from a path, as paths only contain
+    the current versions.
+    """
+
+    def __init__(self, backends):
+        """
+        :param backends: object providing the lazily created ssm backend, e.g. the ParameterResolver
+        """
+        self.logger = get_logger()
+        self.backends = backends
+        self._values = {}
+        self._paths = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize_path(path):
+        return path.rstrip('/') + '/'
+
+    def is_below_fetched_path(self, name):
+        with self._lock:
+            return any(name.startswith(path) for path in self._paths)
+
+    def is_answered_by_fetched_path(self, name):
+        return ':' not in name and self.is_below_fetched_path(name)
+
+    def fetch_path(self, path):
+        """
+        Fetch all parameters below a path once per run, unless it is below an already fetched path
+        :param path: str
+        """
+        path = self._normalize_path(path)
+        if self.is_below_fetched_path(path):
+            return
+
+        self.logger.debug("Fetching ssm parameters below {0}".format(path))
+        values = self.backends.ssm.get_parameters_by_path(path)
+
+        with self._lock:
+            self._values.update(values)
+            self._paths.add(path)
+
+    def get_value(self, name):
+        with self._lock:
+            if name in self._values:
+                return str(self._values[name])
+
+        if self.is_answered_by_fetched_path(name):
+            raise CfnSphereException("SSM parameter {0} does not exist".format(name))
+        value = self.backends.ssm.get_parameter(name)
+
+        with self._lock:
+            self._values[name] = value
+        return str(value)
+
+    def get_path_value(self, path):
+        """
+        Get the comma separated values of all parameters below a path, ordered by name
+        :param path: str
+        :return: str
+        """
+        self.fetch_path(path)
+        path = self._normalize_path(path)
+
+        with self._lock:
+            return ",".join(str(self._values[name]) for name in sorted(self._values)
+                            if name.startswith(path) and ':' not in name)
+
+    def resolve_many(self, macros):
+        for path, in sorted(macro.args for macro in macros if macro.kind == Macro.SSM_PATH):
+            self.fetch_path(path)
+
+        names = set(macro.args[0] for macro in macros if macro.kind == Macro.SSM)
+        with self._lock:
+            names -= set(self._values)
+        missing_names = set(name for name in names if not self.is_answered_by_fetched_path(name))
+
+        if len(missing_names) > 1:
+            self.logger.debug("Fetching {0} ssm parameters".format(len(missing_names)))
+            try:
+                values = self.backends.ssm.get_parameters(missing_names)
+                with self._lock:
+                    self._values.update(values)
+            except CfnSphereException as e:
+                self.logger.warning("Could not fetch ssm parameters in batches, will get them one by one: {0}"
+                                    .format(e))
+
+        values = {}
+        for macro in macros:
+            if macro.kind == Macro.SSM_PATH:
+                values[macro.key] = self.get_path_value(macro.args[0])
+            else:
+                values[macro.key] = self.get_value(macro.args[0])
+        return values
+
+
+class KmsResolver(MacroResolver):
+    """
+    Resolves |kms| values, decrypting many distinct values concurrently
+    """
+
+    def __init__(self, backends):
+        """
+        :param backends: object providing the lazily created kms backend, e.g. the ParameterResolver
+        """
+        self.backends = backends
+
+    def decrypt(self, ciphertext, encryption_context=None):
+        """
+        :param ciphertext: str
+        :param encryption_context: tuple: sorted encryption context items or None
+        :return: str
+        """
+        if encryption_context is None:
+            return str(self.backends.kms.decrypt(ciphertext))
+        else:
+            return str(self.backends.kms.decrypt(ciphertext, encryption_context=dict(encryption_context)))
+
+    def resolve_many(self, macros):
+        if len(macros) > 1:
+            self.backends.kms.decrypt_many((ciphertext, dict(context or ()))
+                                           for ciphertext, context in (macro.args for macro in macros))
+
+        return dict((macro.key, self.decrypt(*macro.args)) for macro in macros)
+
+
+class ImageResolver(MacroResolver):
+    """
+    Resolves |latestami| and |latesttaupageami| values to the id of the latest matching AMI
+    """
+
+    def __init__(self, backends):
+        """
+        :param backends: object providing the lazily created ec2 backend, e.g. the ParameterResolver
+        """
+        self.backends = backends
+
+    def resolve_many(self, macros):
+        values = {}
+        for macro in macros:
+            if macro.kind == Macro.TAUPAGE_AMI:
+                values[macro.key] = str(self.backends.ec2.get_latest_taupage_image_id())
+            else:
+                values[macro.key] = str(self.backends.ec2.get_latest_image_id_by_name(macro.args[0]))
+        return values
+
+
+class ImportResolver(MacroResolver):
+    """
+    Resolves |import| values to the value of a CloudFormation export. All exports of the region are listed
+    at once and kept by the CloudFormation backend until a stack action of the run finishes.
+    """
+
+    def __init__(self, backends):
+        """
+        :param backends: object providing the cfn backend, e.g. the ParameterResolver
+        """
+        self.backends = backends
+
+    def resolve_many(self, macros):
+        exports = self.backends.cfn.get_exports()
+
+        values = {}
+        for macro in macros:
+            export_name = macro.args[0]
+            if export_name not in exports:
+                raise CfnSphereException("Export {0} does not exist".format(export_name))
+            values[macro.key] = exports[export_name]
+        return values
+
+
+class SecretResolver(MacroResolver):
+    """
+    Resolves |secret| values to the value of a Secrets Manager secret, or a key of its json value
+    """
+
+    def __init__(self, backends):
+        """
+        :param backends: object providing the lazily created secretsmanager backend, e.g. the ParameterResolver
+        """
+        self.backends = backends
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def select_key(secret_id, secret_value, key):
+        """
+        :param secret_id: str
+        :param secret_value: str: json object
+        :param key: str
+        :return: str
+        :raise CfnSphereException: if the value is no json object or does not contain the key
+        """
+        try:
+            value = json.loads(secret_value)[key]
+        except (ValueError, TypeError, KeyError):
+            raise CfnSphereException("Secret {0} is no json object containing the key {1}".format(secret_id, key))
+
+        return value if isinstance(value, string_types) else json.dumps(value)
+
+    def resolve_many(self, macros):
+        with self._lock:
+            secret_ids = set(macro.args[0] for macro in macros) - set(self._values)
+
+        if len(secret_ids) > 1:
+            secret_values = self.backends.secretsmanager.get_secret_values(secret_ids)
+        elif secret_ids:
+            secret_id = secret_ids.pop()
+            secret_values = {secret_id: self.backends.secretsmanager.get_secret_value(secret_id)}
+        else:
+            secret_values = {}
+
+        with self._lock:
+            self._values.update(secret_values)
+            secret_values = dict((macro.args[0], self._values[macro.args[0]]) for macro in macros)
+
+        values = {}
+        for macro in macros:
+            secret_id = macro.args[0]
+            if len(macro.args) == 1:
+                values[macro.key] = secret_values[secret_id]
+            else:
+                values[macro.key] = self.select_key(secret_id, secret_values[secret_id], macro.args[1])
+        return values
+
+
+class FileResolver(MacroResolver):
+    """
+    Resolves |file| values to the content of a file or the result of a jmespath pattern applied to it.
+    Each file is read and parsed once as long as it is not modified and each pattern is compiled once,
+    so many patterns applied to the same file do not parse it again.
+    """
+
+    def __init__(self):
+        self._documents = {}
+        self._expressions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_file_key(url, working_dir):
+        """
+        Identify the current version of a file
+        :param url: str
+        :param working_dir: str
+        :return: tuple(str, float): resolved path and modification time, None for s3 urls and missing files
+        """
+        if url.lower().startswith("s3://"):
+            return url, None
+
+        path = FileLoader.get_file_path(url, working_dir)
+        try:
+            return path, os.path.getmtime(path)
+        except OSError:
+            return path, None
+
+    def get_document(self, url, working_dir, parse):
+        """
+        Get the content of a file, cached by its resolved path and modification time
+        :param url: str
+        :param working_dir: str
+        :param parse: bool: parse the content as yaml or json
+        :return: str or parsed document
+        :raise CfnSphereException:
+        """
+        loader = FileLoader.get_yaml_or_json_file if parse else FileLoader.get_file
+
+        cache_key = (parse,) + self.get_file_key(url, working_dir)
+        with self._lock:
+            if cache_key in self._documents:
+                return self._documents[cache_key]
+
+        document = loader(url, working_dir)
+
+        with self._lock:
+            self._documents[cache_key] = document
+        return document
+
+    def get_expression(self, pattern):
+        """
+        :param pattern: str: jmespath expression
+        :return: compiled expression, compiled once per pattern
+        :raise JMESPathError: if the pattern is invalid
+        """
+        with self._lock:
+            if pattern in self._expressions:
+                return self._expressions[pattern]
+
+        expression = jmespath.compile(pattern)
+
+        with self._lock:
+            self._expressions[pattern] = expression
+        return expression
+
+    def load(self, working_dir, url, pattern=None):
+        """
+        :param working_dir: str: directory the url is relative to
+        :param url: str
+        :param pattern: str: jmespath pattern to apply to the yaml or json file content, optional
+        :return: file content or the result of the pattern
+        :raise CfnSphereException:
+        """
+        if pattern is None:
+            return self.get_document(url, working_dir, parse=False)
+
+        document = self.get_document(url, working_dir, parse=True)
+        try:
+            return self.get_expression(pattern).search(document)
+        except JMESPathError as e:
+            raise CfnSphereException(e)
+
+    def resolve_many(self, macros):
+        return dict((macro.key, self.load(*macro.args)) for macro in macros)
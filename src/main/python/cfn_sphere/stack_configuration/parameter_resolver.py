@@ -1,15 +1,20 @@
-import jmespath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from six import string_types
-from jmespath.exceptions import JMESPathError
 
-from cfn_sphere.file_loader import FileLoader
 from cfn_sphere.aws.cfn import CloudFormation
 from cfn_sphere.aws.ec2 import Ec2Api
 from cfn_sphere.aws.kms import KMS
+from cfn_sphere.aws.secretsmanager import SecretsManager
 from cfn_sphere.aws.ssm import SSM
 from cfn_sphere.exceptions import CfnSphereException
-from cfn_sphere.stack_configuration.dependency_resolver import DependencyResolver
-from cfn_sphere.util import get_logger, kv_list_string_to_dict
+from cfn_sphere.stack_configuration.macro_resolvers import SsmResolver, KmsResolver, ImageResolver, FileResolver, \
+    SecretResolver, ImportResolver
+from cfn_sphere.stack_configuration.resolution_plan import Macro, ResolutionPlan
+from cfn_sphere.util import get_logger
+
+MAX_CONCURRENT_RESOLVERS = 8
 
 
 class ParameterResolver(object):
@@ -17,12 +22,105 @@ class ParameterResolver(object):
     Resolves a given artifact identifier to the value of a stacks output.
     """
 
-    def __init__(self, region="eu-west-1"):
+    def __init__(self, region="eu-west-1", cfn=None, cache=None):
+        """
+        :param region: str
+        :param cfn: CloudFormation instance to share, e.g. to use its stack snapshot
+        :param cache: cfn_sphere.cache.DiskCache to persist resolved values across runs, optional
+        """
         self.logger = get_logger()
-        self.cfn = CloudFormation(region)
-        self.ec2 = Ec2Api(region)
-        self.kms = KMS(region)
-        self.ssm = SSM(region)
+        self.region = region
+        self.cache = cache
+        self._backends = {}
+        self._backends_lock = threading.Lock()
+        self._plan = None
+        self._regional_cfn = {}
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_RESOLVERS)
+
+        self.resolvers = {}
+        ssm_resolver = SsmResolver(self)
+        image_resolver = ImageResolver(self)
+        self.register_resolver(Macro.SSM, ssm_resolver)
+        self.register_resolver(Macro.SSM_PATH, ssm_resolver)
+        self.register_resolver(Macro.KMS, KmsResolver(self))
+        self.register_resolver(Macro.LATEST_AMI, image_resolver)
+        self.register_resolver(Macro.TAUPAGE_AMI, image_resolver)
+        self.register_resolver(Macro.FILE, FileResolver())
+        self.register_resolver(Macro.SECRET, SecretResolver(self))
+        self.register_resolver(Macro.IMPORT, ImportResolver(self))
+
+        if cfn:
+            self._backends[CloudFormation] = cfn
+
+    def _get_backend(self, backend_class, **kwargs):
+        """
+        Get the instance of an AWS backend, creating it on first use
+        :param backend_class: class taking the region as argument
+        :param kwargs: further arguments to create the backend with
+        :return: backend instance
+        """
+        with self._backends_lock:
+            if backend_class not in self._backends:
+                self._backends[backend_class] = backend_class(self.region, **kwargs)
+            return self._backends[backend_class]
+
+    @property
+    def cfn(self):
+        return self._get_backend(CloudFormation)
+
+    def get_cfn(self, region=None):
+        """
+        Get the CloudFormation backend of a region. Other regions than the resolvers one get their own instance
+        with a stack snapshot, created on first use and shared by all stacks of the run.
+        :param region: str: None for the resolvers region
+        :return: CloudFormation
+        """
+        if region is None or region == self.region:
+            return self.cfn
+
+        with self._backends_lock:
+            if region not in self._regional_cfn:
+                self._regional_cfn[region] = CloudFormation(region=region, use_stack_snapshot=True)
+            return self._regional_cfn[region]
+
+    def get_cross_region_stacks_outputs(self, region, stack_names):
+        """
+        Get the outputs of stacks of another region, served from that regions stack snapshot
+        :param region: str
+        :param stack_names: iterable(str)
+        :return: dict(dict(output-key, output-value))
+        """
+        return self.get_cfn(region).get_stacks_outputs(stack_names)
+
+    @staticmethod
+    def get_cross_region_references(plan, stack_name=None):
+        """
+        Get the names of the stacks referenced by region qualified |ref| values, by region
+        :param plan: ResolutionPlan
+        :param stack_name: str: only references of this stack, all stacks if None
+        :return: dict(str: set(str))
+        """
+        stack_names_by_region = {}
+        for referenced_stack, _, region in plan.get_arguments(Macro.REF, stack_name):
+            if region:
+                stack_names_by_region.setdefault(region, set()).add(referenced_stack)
+        return stack_names_by_region
+
+    @property
+    def ec2(self):
+        return self._get_backend(Ec2Api, cache=self.cache)
+
+    @property
+    def kms(self):
+        return self._get_backend(KMS, cache=self.cache)
+
+    @property
+    def ssm(self):
+        return self._get_backend(SSM)
+
+    @property
+    def secretsmanager(self):
+        return self._get_backend(SecretsManager)
 
     @staticmethod
     def convert_list_to_string(value):
@@ -50,35 +148,25 @@ class ParameterResolver(object):
         except KeyError:
             raise CfnSphereException("Could not get a valid value for {0}.".format(output_key))
 
-    @staticmethod
-    def is_keep_value(value):
-        return value.lower().startswith('|keeporuse|')
-
-    @staticmethod
-    def is_taupage_ami_reference(value):
-        return value.lower() == '|latesttaupageami|'
-
-    @staticmethod
-    def is_kms(value):
-        return value.lower().startswith('|kms|')
-
-    @staticmethod
-    def is_ssm(value):
-        return value.lower().startswith('|ssm|')
-
     @staticmethod
     def get_default_from_keep_value(value):
         return value.split('|', 2)[2]
 
-    @staticmethod
-    def is_file(value):
-        return value.lower().startswith('|file|')
-
-    def get_latest_value(self, key, value, stack_name):
+    def get_latest_value(self, key, value, stack_name, stack_state=None):
+        """
+        Get the stacks current value of a parameter or the default of a |keeporuse| value
+        :param key: str: parameter name
+        :param value: str: |keeporuse| value
+        :param stack_name: str
+        :param stack_state: cfn_sphere.aws.cfn.StackState of the stack, described if not given
+        :return: str
+        """
         try:
-            if self.cfn.stack_exists(stack_name):
-                latest_stack_parameters = self.cfn.get_stack_parameters_dict(stack_name)
-                latest_value = latest_stack_parameters.get(key, None)
+            if stack_state is None:
+                stack_state = self.cfn.describe_stack_state(stack_name)
+
+            if stack_state.exists:
+                latest_value = stack_state.parameters.get(key, None)
                 if latest_value:
                     self.logger.info("Will keep '{0}' as latest value for {1}".format(latest_value, key))
                     return latest_value
@@ -89,50 +177,121 @@ class ParameterResolver(object):
         except Exception as e:
             raise CfnSphereException("Could not get latest value for {0}: {1}".format(key, e))
 
-    def resolve_parameter_values(self, stack_name, stack_config, cli_parameters=None):
+    def register_resolver(self, kind, resolver):
+        """
+        Resolve the macros of a kind, i.e. values starting with |<kind>|, with the given resolver.
+        Macro kinds not built in are parsed with the rest of the value as only argument.
+        :param kind: str: macro name, case insensitive
+        :param resolver: MacroResolver
+        """
+        self.resolvers[kind.lower()] = resolver
+
+    def compile_plan(self, stack_configs):
+        """
+        :param stack_configs: dict(str: StackConfig): stack configs by stack name
+        :return: ResolutionPlan
+        :raise CfnSphereException: if a parameter value has an invalid macro format
+        """
+        return ResolutionPlan(stack_configs, kinds=self.resolvers.keys())
+
+    def prefetch(self, stack_configs):
+        """
+        Compile the parameter values of all given stacks into a resolution plan and resolve the distinct macros
+        of each registered resolver in bulk, with the resolvers running concurrently on a shared executor.
+        Stack outputs and |keeporuse| values depend on the stacks processed in the run and are resolved per stack.
+        Values that could not be prefetched are resolved one by one on substitution.
+        :param stack_configs: dict(str: StackConfig): stack configs by stack name
+        :raise CfnSphereException: if a parameter value has an invalid macro format
+        """
+        plan = self.compile_plan(stack_configs)
+        self._plan = plan
+
+        macros_by_resolver = {}
+        for kind, resolver in self.resolvers.items():
+            macros = plan.get_distinct_macros(kind)
+            if macros:
+                macros_by_resolver.setdefault(resolver, []).extend(macros)
+
+        futures = [self.executor.submit(self._prefetch_macros, resolver, macros)
+                   for resolver, macros in macros_by_resolver.items()]
+        futures.extend(self.executor.submit(self._prefetch_cross_region_stacks_outputs, region, stack_names)
+                       for region, stack_names in self.get_cross_region_references(plan).items())
+        for future in futures:
+            future.result()
+
+    def _prefetch_cross_region_stacks_outputs(self, region, stack_names):
+        try:
+            self.get_cross_region_stacks_outputs(region, stack_names)
+        except CfnSphereException as e:
+            self.logger.warning("Could not get stack outputs of region {0} in advance: {1}".format(region, e))
+
+    def _prefetch_macros(self, resolver, macros):
+        try:
+            resolver.resolve_many(macros)
+        except CfnSphereException as e:
+            self.logger.warning("Could not resolve {0} values in advance, will resolve them one by one: {1}"
+                                .format(len(macros), e))
+
+    def get_plan(self, stack_name, stack_config):
+        """
+        Get the prefetched resolution plan if it contains the stack, a plan for the stack alone otherwise
+        :param stack_name: str
+        :param stack_config: StackConfig
+        :return: ResolutionPlan
+        """
+        if self._plan and self._plan.contains(stack_name, stack_config):
+            return self._plan
+        return self.compile_plan({stack_name: stack_config})
+
+    def resolve_parameter_values(self, stack_name, stack_config, cli_parameters=None, stack_state=None):
+        plan = self.get_plan(stack_name, stack_config)
         resolved_parameters = {}
-        stack_outputs = self.cfn.get_stacks_outputs()
 
-        for key, value in stack_config.parameters.items():
-            resolved_parameters[key] = self.resolve_parameter_value(key, value, stack_name, stack_config, stack_outputs)
+        if stack_state is None and plan.get_arguments(Macro.KEEP, stack_name):
+            stack_state = self.cfn.describe_stack_state(stack_name)
+
+        referenced_stack_names = set(stack for stack, _, region in plan.get_arguments(Macro.REF, stack_name)
+                                     if not region)
+        if referenced_stack_names:
+            stack_outputs = self.cfn.get_stacks_outputs(referenced_stack_names)
+        else:
+            stack_outputs = {}
+
+        for key, compiled_value in plan.parameters[stack_name].items():
+            resolved_parameters[key] = self.resolve_compiled_value(key, compiled_value, stack_name, stack_outputs,
+                                                                   stack_state)
 
         if cli_parameters:
             return self.update_parameters_with_cli_parameters(resolved_parameters, cli_parameters, stack_name)
         else:
             return resolved_parameters
 
-    def resolve_parameter_value(self, key, value, stack_name, stack_config, stack_outputs):
-        if isinstance(value, list):
+    def resolve_compiled_value(self, key, compiled_value, stack_name, stack_outputs, stack_state=None):
+        if isinstance(compiled_value, list):
             self.logger.debug("List parameter found for {0}".format(key))
-            for i, item in enumerate(value):
-                value[i] = self.resolve_parameter_value(key, item, stack_name, stack_config, stack_outputs)
-
-            return self.convert_list_to_string(value)
-
-        elif isinstance(value, string_types):
+            return self.convert_list_to_string(
+                [self.resolve_macro(key, macro, stack_name, stack_outputs, stack_state) for macro in compiled_value])
 
-            if DependencyResolver.is_parameter_reference(value):
-                referenced_stack, output_name = DependencyResolver.parse_stack_reference_value(value)
-                return str(self.get_output_value(stack_outputs, referenced_stack, output_name))
+        return self.resolve_macro(key, compiled_value, stack_name, stack_outputs, stack_state)
 
-            elif self.is_keep_value(value):
-                return str(self.get_latest_value(key, value, stack_name))
+    def resolve_macro(self, key, macro, stack_name, stack_outputs, stack_state=None):
+        kind = macro.kind
 
-            elif self.is_taupage_ami_reference(value):
-                return str(self.ec2.get_latest_taupage_image_id())
+        if kind == Macro.REF:
+            referenced_stack, output_name, region = macro.args
+            if region:
+                stack_outputs = self.get_cross_region_stacks_outputs(region, [referenced_stack])
+            return str(self.get_output_value(stack_outputs, referenced_stack, output_name))
 
-            elif self.is_kms(value):
-                return self.handle_kms_value(value)
+        elif kind == Macro.KEEP:
+            return str(self.get_latest_value(key, macro.value, stack_name, stack_state))
 
-            elif self.is_ssm(value):
-                return self.handle_ssm_value(value)
-
-            elif self.is_file(value):
-                return self.handle_file_value(value, stack_config.working_dir)
-
-            else:
-                return value
+        elif kind in self.resolvers:
+            return self.resolvers[kind].resolve(macro)
 
+        value = macro.value
+        if isinstance(value, string_types):
+            return value
         elif isinstance(value, bool):
             return str(value).lower()
         elif isinstance(value, (int, float)):
@@ -142,43 +301,6 @@ class ParameterResolver(object):
         else:
             raise NotImplementedError("Cannot handle {0} type for key: {1}".format(type(value), key))
 
-    def handle_ssm_value(self, value):
-        parts = value.split('|')
-        if len(parts) == 3:
-            return str(self.ssm.get_parameter(parts[2]))
-        
-        raise CfnSphereException(
-                "Invalid format for |ssm| macro, it must be |ssm|/path/to/parameter")
-
-    def handle_kms_value(self, value):
-        parts = value.split('|')
-
-        if len(parts) == 3:
-            return str(self.kms.decrypt(parts[2]))
-        elif len(parts) == 4:
-            return str(self.kms.decrypt(parts[3], encryption_context=kv_list_string_to_dict(parts[2])))
-        else:
-            raise CfnSphereException(
-                "Invalid format for |Kms| macro, it must be |Kms[|<encryption_context>]|<ciphertext>")
-
-    @staticmethod
-    def handle_file_value(value, working_dir):
-        components = value.split('|', 3)
-
-        if len(components) == 3:
-            url = components[2]
-            return FileLoader.get_file(url, working_dir)
-        elif len(components) == 4:
-            url = components[2]
-            pattern = components[3]
-            file_content = FileLoader.get_yaml_or_json_file(url, working_dir)
-            try:
-                return jmespath.search(pattern, file_content)
-            except JMESPathError as e:
-                raise CfnSphereException(e)
-        else:
-            raise CfnSphereException("Invalid format for |File| macro, it must be |File|<path>[|<pattern>]")
-
     @staticmethod
     def update_parameters_with_cli_parameters(parameters, cli_parameters, stack_name):
         """
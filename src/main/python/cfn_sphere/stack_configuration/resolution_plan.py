@@ -0,0 +1,216 @@
+from six import string_types
+
+from cfn_sphere.exceptions import CfnSphereException
+from cfn_sphere.stack_configuration.dependency_resolver import DependencyResolver
+from cfn_sphere.util import kv_list_string_to_dict
+
+
+class Macro(object):
+    """
+    A parameter value parsed once into its macro kind and arguments
+    """
+
+    LITERAL = "literal"
+    REF = "ref"
+    KEEP = "keeporuse"
+    TAUPAGE_AMI = "latesttaupageami"
+    LATEST_AMI = "latestami"
+    KMS = "kms"
+    SSM = "ssm"
+    SSM_PATH = "ssmpath"
+    FILE = "file"
+    SECRET = "secret"
+    IMPORT = "import"
+
+    def __init__(self, kind, args=(), value=None):
+        """
+        :param kind: str: one of the kinds defined above
+        :param args: tuple: parsed arguments of the macro
+        :param value: the raw parameter value
+        """
+        self.kind = kind
+        self.args = args
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Macro) and (self.kind, self.args, self.value) == (other.kind, other.args, other.value)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "Macro({0}, {1})".format(self.kind, self.args)
+
+    @property
+    def key(self):
+        """
+        Identifies the value a macro resolves to, e.g. |ssm|/a and |SSM|/a share a key
+        :return: tuple(str, tuple)
+        """
+        return self.kind, self.args
+
+    @classmethod
+    def parse(cls, value, working_dir=None, kinds=()):
+        """
+        Parse a single parameter value. Values not starting with a known |<macro>| prefix are literals.
+        :param value: parameter value of any type
+        :param working_dir: str: directory |file| paths are relative to
+        :param kinds: iterable(str): further known macro kinds, parsed with the rest of the value as only argument
+        :return: Macro
+        :raise CfnSphereException: if the value has a known prefix but an invalid format
+        """
+        if not isinstance(value, string_types) or not value.startswith('|'):
+            return cls(cls.LITERAL, value=value)
+
+        parts = value.split('|', 2)
+        if len(parts) != 3:
+            return cls(cls.LITERAL, value=value)
+
+        kind = parts[1].lower()
+        argument = parts[2]
+
+        if kind == cls.REF:
+            return cls(kind, DependencyResolver.parse_stack_reference(value), value)
+
+        elif kind == cls.KEEP:
+            return cls(kind, (argument,), value)
+
+        elif kind == cls.TAUPAGE_AMI and not argument:
+            return cls(kind, (), value)
+
+        elif kind == cls.LATEST_AMI:
+            if not argument:
+                raise CfnSphereException(
+                    "Invalid format for |latestami| macro, it must be |latestami|<name pattern>")
+            return cls(kind, (argument,), value)
+
+        elif kind == cls.KMS:
+            return cls(kind, cls.parse_kms_arguments(argument), value)
+
+        elif kind == cls.SSM:
+            if '|' in argument:
+                raise CfnSphereException("Invalid format for |ssm| macro, it must be |ssm|/path/to/parameter")
+            return cls(kind, (argument,), value)
+
+        elif kind == cls.SSM_PATH:
+            if '|' in argument:
+                raise CfnSphereException(
+                    "Invalid format for |ssmpath| macro, it must be |ssmpath|/path/to/parameters")
+            return cls(kind, (argument,), value)
+
+        elif kind == cls.IMPORT:
+            if not argument or '|' in argument:
+                raise CfnSphereException("Invalid format for |import| macro, it must be |import|<export name>")
+            return cls(kind, (argument,), value)
+
+        elif kind == cls.SECRET:
+            arguments = tuple(argument.split('|', 1))
+            if not all(arguments):
+                raise CfnSphereException(
+                    "Invalid format for |secret| macro, it must be |secret|<secret id>[|<json key>]")
+            return cls(kind, arguments, value)
+
+        elif kind == cls.FILE:
+            return cls(kind, (working_dir,) + tuple(argument.split('|', 1)), value)
+
+        elif kind in kinds:
+            return cls(kind, (argument,), value)
+
+        else:
+            return cls(cls.LITERAL, value=value)
+
+    @staticmethod
+    def parse_kms_arguments(argument):
+        """
+        Parse the arguments of a |kms| value
+        :param argument: str: [<encryption_context>|]<ciphertext>
+        :return: tuple(str, tuple or None): ciphertext and sorted encryption context items
+        :raise CfnSphereException:
+        """
+        parts = argument.split('|')
+
+        if len(parts) == 1:
+            return parts[0], None
+        elif len(parts) == 2:
+            return parts[1], tuple(sorted(kv_list_string_to_dict(parts[0]).items()))
+        else:
+            raise CfnSphereException(
+                "Invalid format for |Kms| macro, it must be |Kms[|<encryption_context>]|<ciphertext>")
+
+
+class ResolutionPlan(object):
+    """
+    The parameter values of a set of stacks, compiled into macros once, so that the distinct macros
+    of each backend can be fetched in bulk before the values get substituted stack by stack.
+    """
+
+    def __init__(self, stack_configs, kinds=()):
+        """
+        :param stack_configs: dict(str: StackConfig): stack configs by stack name
+        :param kinds: iterable(str): further known macro kinds
+        :raise CfnSphereException: if a parameter value has an invalid macro format
+        """
+        self.stack_configs = stack_configs
+        self.parameters = dict(
+            (stack_name, self.compile_parameters(stack_config.parameters, stack_config.working_dir, kinds))
+            for stack_name, stack_config in stack_configs.items())
+
+    @classmethod
+    def compile_parameters(cls, parameters, working_dir=None, kinds=()):
+        """
+        :param parameters: dict: parameter values by key
+        :param working_dir: str: directory |file| paths are relative to
+        :param kinds: iterable(str): further known macro kinds
+        :return: dict: Macro or list(Macro) by key
+        """
+        return dict((key, cls.compile_value(value, working_dir, kinds)) for key, value in parameters.items())
+
+    @staticmethod
+    def compile_value(value, working_dir=None, kinds=()):
+        """
+        :param value: parameter value, list items are compiled one by one
+        :param working_dir: str: directory |file| paths are relative to
+        :param kinds: iterable(str): further known macro kinds
+        :return: Macro or list(Macro)
+        """
+        if isinstance(value, list):
+            return [Macro.parse(item, working_dir, kinds) for item in value]
+        return Macro.parse(value, working_dir, kinds)
+
+    def contains(self, stack_name, stack_config):
+        return self.stack_configs.get(stack_name) is stack_config
+
+    def get_macros(self, kind, stack_name=None):
+        """
+        Get the macros of a kind
+        :param kind: str
+        :param stack_name: str: only macros of this stack, all stacks if None
+        :return: generator(tuple(str, Macro)): stack name and macro
+        """
+        stack_names = [stack_name] if stack_name else self.parameters.keys()
+
+        for name in stack_names:
+            for value in self.parameters[name].values():
+                for macro in value if isinstance(value, list) else [value]:
+                    if macro.kind == kind:
+                        yield name, macro
+
+    def get_arguments(self, kind, stack_name=None):
+        """
+        Get the distinct arguments of all macros of a kind
+        :param kind: str
+        :param stack_name: str: only macros of this stack, all stacks if None
+        :return: set(tuple)
+        """
+        return set(macro.args for _, macro in self.get_macros(kind, stack_name))
+
+    def get_distinct_macros(self, kind):
+        """
+        Get one macro per distinct key of a kind over all stacks
+        :param kind: str
+        :return: list(Macro)
+        """
+        return list(dict((macro.key, macro) for _, macro in self.get_macros(kind)).values())
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from cfn_sphere.exceptions import CfnStackActionFailedException
+from cfn_sphere.util import get_logger
+
+
+class StackExecutionResult(object):
+    def __init__(self):
+        self.succeeded = {}
+        self.failed = {}
+        self.skipped = []
+
+    def raise_on_failure(self, action_name):
+        """
+        Raise the original exception for a single failed stack or a summarizing one for several
+        :param action_name: str
+        :raise CfnSphereException:
+        """
+        if len(self.failed) == 1:
+            raise list(self.failed.values())[0]
+
+        if self.failed:
+            failures = ", ".join("{0} ({1})".format(name, e) for name, e in sorted(self.failed.items()))
+            raise CfnStackActionFailedException("Could not {0} stacks: {1}".format(action_name, failures))
+
+
+class StackExecutor(object):
+    """
+    Executes an action for a set of stacks concurrently. A stack is started as soon as all of its
+    predecessors within the given dependency graph have been processed successfully.
+    """
+
+    def __init__(self, graph, max_workers):
+        self.logger = get_logger()
+        self.graph = graph
+        self.max_workers = max(1, int(max_workers))
+
+    def get_predecessors(self, stack_names):
+        """
+        Get the predecessors of each stack, limited to the stacks given
+        :param stack_names: list(str)
+        :return: dict(str, set(str))
+        """
+        return {name: set(p for p in self.graph.predecessors(name) if p in stack_names) for name in stack_names}
+
+    def run(self, stack_names, action, fail_fast=True):
+        """
+        Run action(stack_name) for all given stacks
+        :param stack_names: list(str) in topological order of the graph
+        :param action: callable taking a stack name
+        :param fail_fast: do not start any new stack after the first failure. In-flight stacks are finished anyway.
+        :return: StackExecutionResult
+        """
+        result = StackExecutionResult()
+        predecessors = self.get_predecessors(stack_names)
+        pending = list(stack_names)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                if not (fail_fast and result.failed):
+                    for stack_name in list(pending):
+                        if len(running) >= self.max_workers:
+                            break
+
+                        if predecessors[stack_name].issubset(result.succeeded):
+                            pending.remove(stack_name)
+                            running[pool.submit(action, stack_name)] = stack_name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stack_name = running.pop(future)
+                    try:
+                        result.succeeded[stack_name] = future.result()
+                    except Exception as e:
+                        self.logger.error("Processing stack {0} failed: {1}".format(stack_name, e))
+                        result.failed[stack_name] = e
+
+        result.skipped = pending
+        if result.skipped:
+            self.logger.warning("Skipped stacks: {0}".format(", ".join(result.skipped)))
+
+        return result
@@ -1,11 +1,15 @@
 import json
 import logging
 import os
+import random
+import threading
 import time
+from datetime import datetime, timedelta
 from functools import wraps
 
 import yaml
 from dateutil import parser
+from dateutil.tz import tzutc
 from git import Repo, InvalidGitRepositoryError
 from prettytable import PrettyTable
 from six.moves.urllib import request as urllib2
@@ -125,14 +129,51 @@ def convert_dict_to_json_string(data):
     return json.dumps(data, indent=2)
 
 
-def get_cfn_api_server_time():
-    url = "https://aws.amazon.com"
+_server_clock_offset = None
+_server_clock_offset_lock = threading.Lock()
+
+
+def record_server_clock_offset(parsed=None, **kwargs):
+    """
+    botocore after-call event handler deriving the offset between the local clock and the
+    AWS server clock from the Date header of an API response. The offset is computed once per process.
+    :param parsed: dict: parsed API response
+    """
+    global _server_clock_offset
+
+    if _server_clock_offset is not None:
+        return
 
     try:
-        header_date = urllib2.urlopen(url).info().get('Date')
-        return parser.parse(header_date)
-    except Exception as e:
-        raise CfnSphereException("Could not get AWS server time from {0}. Error: {1}".format(url, e))
+        header_date = parsed["ResponseMetadata"]["HTTPHeaders"]["date"]
+        offset = parser.parse(header_date) - datetime.now(tzutc())
+    except Exception:
+        return
+
+    with _server_clock_offset_lock:
+        if _server_clock_offset is None:
+            _server_clock_offset = offset
+
+
+def reset_server_clock_offset():
+    global _server_clock_offset
+
+    with _server_clock_offset_lock:
+        _server_clock_offset = None
+
+
+def get_cfn_api_server_time():
+    """
+    Get the current AWS server time, derived from the local clock and the offset
+    recorded from previous API responses. Falls back to the local clock if no response has been seen yet.
+    :return: datetime
+    """
+    offset = _server_clock_offset
+    if offset is None:
+        get_logger().debug("No AWS server time seen yet, using local clock")
+        offset = timedelta(0)
+
+    return datetime.now(tzutc()) + offset
 
 
 def get_latest_version():
@@ -150,12 +191,13 @@ def get_pypi_package_description():
     return json.load(response)
 
 
-def with_boto_retry(max_retries=3, pause_time_multiplier=5):
+def with_boto_retry(max_retries=5, pause_time_multiplier=2, max_pause_time=60):
     """
     Annotation retrying a wrapped function call if it raises a CfnSphereBotoError
-    with is_throttling_exception=True
+    with is_throttling_exception=True. Retries back off exponentially with full jitter.
     :param max_retries:
     :param pause_time_multiplier:
+    :param max_pause_time: upper bound of a single pause in seconds
     :return: :raise e:
     """
     logger = get_logger()
@@ -172,9 +214,10 @@ def with_boto_retry(max_retries=3, pause_time_multiplier=5):
                     if not e.is_throttling_exception or retries >= max_retries:
                         raise e
 
-                    sleep_time = pause_time_multiplier * (2 ** retries)
-                    logger.warn(
-                        "{0} call failed with: '{1}' (Will retry in {2}s)".format(function.__name__, e, sleep_time))
+                    sleep_time = random.uniform(0, min(max_pause_time, pause_time_multiplier * (2 ** retries)))
+                    logger.warning(
+                        "{0} call failed with: '{1}' (Will retry in {2:.1f}s)".format(function.__name__, e,
+                                                                                      sleep_time))
                     time.sleep(sleep_time)
                     retries += 1
 
@@ -6,35 +6,51 @@ except ImportError:
     from mock import Mock, patch
 
 import datetime
+import hashlib
 
+import mock
+import six
 from botocore.exceptions import ClientError
 from dateutil.tz import tzutc
 
 from cfn_sphere.aws.cfn import CloudFormation
 from cfn_sphere.aws.cfn import CloudFormationStack
+from cfn_sphere.aws.cfn import StackDescriptionSnapshot
+from cfn_sphere.aws.cfn import StackEventStream
+from cfn_sphere.aws.cfn import ExponentialPollInterval
+from cfn_sphere.util import record_server_clock_offset
+from cfn_sphere.aws.cfn import StackState
+from cfn_sphere.aws.cfn import StackWatch
+from cfn_sphere.aws.cfn import StackWatcher
 from cfn_sphere.exceptions import CfnStackActionFailedException, CfnSphereBotoError
 from cfn_sphere.template import CloudFormationTemplate
+from cfn_sphere.aws.client_registry import reset_clients
 
 
 class CloudFormationApiTests(TestCase):
-    @patch('cfn_sphere.aws.cfn.boto3.resource')
+    def setUp(self):
+        reset_clients()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
     def test_get_stack_properly_calls_boto(self, boto_mock):
         CloudFormation().get_stack("Foo")
         boto_mock.return_value.Stack.assert_called_once_with("Foo")
 
-    @patch('cfn_sphere.aws.cfn.boto3.resource')
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
     def test_get_stacks_properly_calls_boto(self, boto_mock):
         CloudFormation().get_stacks()
         boto_mock.return_value.stacks.all.assert_called_once_with()
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_stack_exists_returns_true_for_existing_stack(self, get_stack_mock):
-        get_stack_mock.return_value = Mock()
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_stack_exists_returns_true_for_existing_stack(self, get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "stack1", "StackStatus": "CREATE_COMPLETE"}
         self.assertTrue(CloudFormation().stack_exists("stack1"))
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_stack_exists_returns_false_for_non_existing_stack(self, get_stack_mock):
-        get_stack_mock.side_effect = ClientError({"Error": {"Message": "Stack with id stack3 does not exist"}}, "Foo")
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_stack_exists_returns_false_for_non_existing_stack(self, get_stack_description_mock):
+        get_stack_description_mock.side_effect = CfnSphereBotoError(
+            ClientError({"Error": {"Code": "ValidationError", "Message": "Stack with id stack3 does not exist"}},
+                        "Foo"))
         self.assertFalse(CloudFormation().stack_exists("stack3"))
 
     @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_descriptions')
@@ -52,7 +68,7 @@ class CloudFormationApiTests(TestCase):
         get_stack_descriptions_mock.return_value = [{"StackName": "Foo"}]
         self.assertEqual({'Foo': {'outputs': [], 'parameters': []}}, CloudFormation().get_stacks_dict())
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_expected_event(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:cloudformation:eu-west-1:1234567890:stack/my-stack/my-stack-id',
@@ -70,7 +86,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertDictEqual(event, result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_none_if_event_appears_to_early(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:cloudformation:eu-west-1:1234567890:stack/my-stack/my-stack-id',
@@ -88,7 +104,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertIsNone(result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_none_if_event_has_not_expected_state(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:cloudformation:eu-west-1:1234567890:stack/my-stack/my-stack-id',
@@ -106,7 +122,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertIsNone(result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_none_if_event_is_no_stack_event(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:sns:eu-west-1:1234567890:my-topic',
@@ -124,7 +140,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertIsNone(result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_raises_exception_on_error_event(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:sns:eu-west-1:1234567890:my-topic',
@@ -142,7 +158,7 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_none_on_rollback_in_progress_state(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:sns:eu-west-1:1234567890:my-topic',
@@ -161,7 +177,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertIsNone(result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_raises_exception_on_rollback_complete(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:sns:eu-west-1:1234567890:my-topic',
@@ -179,7 +195,7 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_handle_stack_event_returns_none_for_nested_stack_events(self, _):
         event = {
             'PhysicalResourceId': 'arn:aws:sns:eu-west-1:1234567890:my-topic',
@@ -197,7 +213,7 @@ class CloudFormationApiTests(TestCase):
         result = cfn.handle_stack_event(event, valid_from_timestamp, "CREATE_COMPLETE", "my-stack")
         self.assertIsNone(result)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_set_stack_policy_calls_cloudformation_api_properly(self, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
         stack.name = "stack-name"
@@ -212,6 +228,8 @@ class CloudFormationApiTests(TestCase):
         stack.failure_action = None
         stack.disable_rollback = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn._set_stack_policy(stack)
@@ -221,7 +239,7 @@ class CloudFormationApiTests(TestCase):
             StackPolicyBody='"{\\"Statement\\":[{\\"Effect\\":\\"Allow\\"}]}"'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_cloudformation_api_properly(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -238,6 +256,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = False
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
@@ -250,7 +270,7 @@ class CloudFormationApiTests(TestCase):
             TemplateBody={'key': 'value'}
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_cloudformation_api_properly_with_service_role(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -267,6 +287,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = False
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
@@ -280,7 +302,7 @@ class CloudFormationApiTests(TestCase):
             RoleARN="arn:aws:iam::1234567890:role/my-role"
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_cloudformation_api_properly_with_stack_policy(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -297,6 +319,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = False
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
@@ -310,7 +334,7 @@ class CloudFormationApiTests(TestCase):
             StackPolicyBody='"{foo:baa}"'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_cloudformation_api_properly_with_defined_failure_action(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -327,6 +351,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = False
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
@@ -341,7 +367,7 @@ class CloudFormationApiTests(TestCase):
             StackPolicyBody='"{foo:baa}"'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_cloudformation_api_properly_with_disable_rollback_true(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -358,6 +384,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = "True"
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
@@ -373,7 +401,7 @@ class CloudFormationApiTests(TestCase):
             StackPolicyBody='"{foo:baa}"'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation._create_stack')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_wait_properly(self, wait_mock, _a, _b):
@@ -385,13 +413,70 @@ class CloudFormationApiTests(TestCase):
         stack.template.name = "template-name"
 
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.create_stack(stack)
 
-        wait_mock.assert_called_once_with(stack.name, 'create', stack.timeout)
+        wait_mock.assert_called_once_with(stack.name, 'create', stack.timeout, None)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_in_progress_stack_summaries_lists_in_progress_stacks_only(self, client_mock):
+        client_mock.return_value.get_paginator.return_value.paginate.return_value = [
+            {"StackSummaries": [{"StackName": "a", "StackStatus": "CREATE_IN_PROGRESS"}]},
+            {"StackSummaries": [{"StackName": "b", "StackStatus": "UPDATE_ROLLBACK_IN_PROGRESS"}]}]
+
+        result = CloudFormation().get_in_progress_stack_summaries()
+
+        self.assertEqual(["a", "b"], [summary["StackName"] for summary in result])
+        client_mock.return_value.get_paginator.assert_called_once_with('list_stacks')
+        status_filter = client_mock.return_value.get_paginator.return_value.paginate.call_args[1]["StackStatusFilter"]
+        self.assertTrue(all(status.endswith("_IN_PROGRESS") for status in status_filter))
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_exports_lists_exports_of_all_pages_once(self, client_mock):
+        client_mock.return_value.get_paginator.return_value.paginate.return_value = [
+            {"Exports": [{"Name": "a", "Value": "1", "ExportingStackId": "x"}]},
+            {"Exports": [{"Name": "b", "Value": "2", "ExportingStackId": "y"}]}]
+
+        cfn = CloudFormation()
+
+        self.assertEqual({"a": "1", "b": "2"}, cfn.get_exports())
+        self.assertEqual({"a": "1", "b": "2"}, cfn.get_exports())
+        client_mock.return_value.get_paginator.assert_called_once_with('list_exports')
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_exports_lists_exports_again_after_invalidation(self, client_mock):
+        client_mock.return_value.get_paginator.return_value.paginate.side_effect = [
+            [{"Exports": [{"Name": "a", "Value": "1"}]}],
+            [{"Exports": [{"Name": "a", "Value": "2"}]}]]
+
+        cfn = CloudFormation()
+        cfn.get_exports()
+        cfn.invalidate_exports()
+
+        self.assertEqual({"a": "2"}, cfn.get_exports())
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    @patch('cfn_sphere.aws.cfn.CloudFormation._create_stack')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.invalidate_exports')
+    def test_create_stack_invalidates_exports_once_finished(self, invalidate_exports_mock, _a, _b, _c):
+        stack = Mock(spec=CloudFormationStack)
+        stack.name = "stack-name"
+        stack.get_parameters_list.return_value = []
+        stack.parameters = {}
+        stack.template = Mock(spec=CloudFormationTemplate)
+        stack.template.name = "template-name"
+        stack.timeout = 42
+        stack.expected_duration = None
+
+        CloudFormation().create_stack(stack)
+
+        invalidate_exports_mock.assert_called_once_with()
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_update_stack_calls_cloudformation_api_properly(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -407,6 +492,8 @@ class CloudFormationApiTests(TestCase):
         stack.disable_rollback = False
         stack.termination_protection = False
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.update_stack(stack)
@@ -419,7 +506,7 @@ class CloudFormationApiTests(TestCase):
             TemplateBody={'key': 'value'}
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_update_stack_calls_cloudformation_api_properly_with_service_role(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -433,6 +520,8 @@ class CloudFormationApiTests(TestCase):
         stack.service_role = "arn:aws:iam::1234567890:role/my-role"
         stack.stack_policy = None
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.update_stack(stack)
@@ -446,7 +535,7 @@ class CloudFormationApiTests(TestCase):
             RoleARN='arn:aws:iam::1234567890:role/my-role'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_update_stack_calls_cloudformation_api_properly_with_stack_policy(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -460,6 +549,8 @@ class CloudFormationApiTests(TestCase):
         stack.service_role = None
         stack.stack_policy = "{foo:baa}"
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.update_stack(stack)
@@ -474,7 +565,7 @@ class CloudFormationApiTests(TestCase):
             StackPolicyDuringUpdateBody='"{foo:baa}"'
         )
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation._update_stack')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_create_stack_calls_wait_properly(self, wait_mock, _a, _b):
@@ -486,13 +577,15 @@ class CloudFormationApiTests(TestCase):
         stack.template.name = "template-name"
 
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.update_stack(stack)
 
-        wait_mock.assert_called_once_with(stack.name, 'update', stack.timeout)
+        wait_mock.assert_called_once_with(stack.name, 'update', stack.timeout, None)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_delete_stack_calls_cloudformation_api_properly(self, _, cloudformation_mock):
         stack = Mock(spec=CloudFormationStack)
@@ -506,13 +599,15 @@ class CloudFormationApiTests(TestCase):
         stack.service_role = None
         stack.stack_policy = "{foo:baa}"
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.delete_stack(stack)
 
         cloudformation_mock.return_value.delete_stack.assert_called_once_with(StackName=stack.name)
 
-    @patch('cfn_sphere.aws.cfn.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     @patch('cfn_sphere.aws.cfn.CloudFormation._delete_stack')
     @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
     def test_delete_stack_calls_wait_properly(self, wait_mock, _a, _b):
@@ -524,18 +619,18 @@ class CloudFormationApiTests(TestCase):
         stack.template.name = "template-name"
 
         stack.timeout = 42
+        stack.expected_duration = None
+        stack.artifact_bucket = None
 
         cfn = CloudFormation()
         cfn.delete_stack(stack)
 
-        wait_mock.assert_called_once_with(stack.name, 'delete', stack.timeout)
+        wait_mock.assert_called_once_with(stack.name, 'delete', stack.timeout, None)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_raises_exception_on_unknown_stack_state(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "FOO"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_raises_exception_on_unknown_stack_state(self,
+                                                                                        get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "FOO"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
@@ -543,12 +638,10 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_raises_exception_on_update_in_progress(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "UPDATE_IN_PROGRESS"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_raises_exception_on_update_in_progress(self,
+                                                                                       get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "UPDATE_IN_PROGRESS"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
@@ -556,12 +649,10 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_raises_exception_on_delete_in_progress(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "DELETE_IN_PROGRESS"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_raises_exception_on_delete_in_progress(self,
+                                                                                       get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "DELETE_IN_PROGRESS"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
@@ -569,12 +660,10 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_raises_exception_on_create_in_progress(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "CREATE_IN_PROGRESS"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_raises_exception_on_create_in_progress(self,
+                                                                                       get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "CREATE_IN_PROGRESS"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
@@ -582,14 +671,9 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnStackActionFailedException):
             cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_raises_proper_exception_on_boto_error(self, get_stack_mock):
-        get_stack_mock.side_effect = CfnSphereBotoError(None)
-
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "UPDATE_COMPLETE"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_raises_proper_exception_on_boto_error(self, get_stack_description_mock):
+        get_stack_description_mock.side_effect = CfnSphereBotoError(None)
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
@@ -597,76 +681,66 @@ class CloudFormationApiTests(TestCase):
         with self.assertRaises(CfnSphereBotoError):
             cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_update_complete_state(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "UPDATE_COMPLETE"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_update_complete_state(self,
+                                                                                            get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "UPDATE_COMPLETE"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
         cfn = CloudFormation()
         cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_create_complete_state(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "CREATE_COMPLETE"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_create_complete_state(self,
+                                                                                            get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "CREATE_COMPLETE"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
         cfn = CloudFormation()
         cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_import_complete_state(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "IMPORT_COMPLETE"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_import_complete_state(self,
+                                                                                            get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "my-stack", "StackStatus": "IMPORT_COMPLETE"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
         cfn = CloudFormation()
         cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_rollback_complete_state(self, get_stack_mock):
-        stack_mock = Mock()
-        stack_mock.stack_name = "my-stack"
-        stack_mock.stack_status = "ROLLBACK_COMPLETE"
-        get_stack_mock.return_value = stack_mock
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    def test_validate_stack_is_ready_for_action_passes_if_stack_is_in_rollback_complete_state(self, describe_mock):
+        describe_mock.return_value = {"StackName": "my-stack", "StackStatus": "ROLLBACK_COMPLETE"}
 
         stack = CloudFormationStack('', [], 'my-stack', 'my-region')
 
         cfn = CloudFormation()
         cfn.validate_stack_is_ready_for_action(stack)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    @patch('cfn_sphere.aws.cfn.boto3.client')
-    def test_get_stack_parameters_dict_returns_proper_dict(self, _, get_stack_mock):
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_stack_parameters_dict_returns_proper_dict(self, _, get_stack_description_mock):
         cfn = CloudFormation()
 
-        stack_mock = Mock()
-        stack_mock.parameters = [{"ParameterKey": "myKey1", "ParameterValue": "myValue1"},
-                                 {"ParameterKey": "myKey2", "ParameterValue": "myValue2"}]
-        get_stack_mock.return_value = stack_mock
+        get_stack_description_mock.return_value = {
+            "StackName": "foo",
+            "Parameters": [{"ParameterKey": "myKey1", "ParameterValue": "myValue1"},
+                           {"ParameterKey": "myKey2", "ParameterValue": "myValue2"}]
+        }
 
         result = cfn.get_stack_parameters_dict('foo')
 
         self.assertDictEqual({'myKey1': 'myValue1', 'myKey2': 'myValue2'}, result)
 
-    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack')
-    @patch('cfn_sphere.aws.cfn.boto3.client')
-    def test_get_stack_parameters_dict_returns_empty_dict_for_empty_parameters(self, _, get_stack_mock):
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_stack_parameters_dict_returns_empty_dict_for_empty_parameters(self, _, get_stack_description_mock):
         cfn = CloudFormation()
 
-        stack_mock = Mock()
-        stack_mock.parameters = []
-        get_stack_mock.return_value = stack_mock
+        get_stack_description_mock.return_value = {"StackName": "foo", "Parameters": []}
 
         result = cfn.get_stack_parameters_dict('foo')
 
@@ -706,3 +780,579 @@ class CloudFormationApiTests(TestCase):
         exception = Mock(spec=ClientError)
         exception.response = {"Error": {"Message": "Stack with id foo does not exist"}}
         self.assertTrue(CloudFormation.is_boto_stack_does_not_exist_exception(exception))
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_descriptions')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_stack_snapshot_is_loaded_once_for_several_lookups(self, _, get_stack_descriptions_mock):
+        get_stack_descriptions_mock.return_value = [
+            {"StackName": "a", "StackStatus": "CREATE_COMPLETE",
+             "Parameters": [{"ParameterKey": "k", "ParameterValue": "v"}],
+             "Outputs": [{"OutputKey": "o", "OutputValue": "ov"}]}
+        ]
+
+        cfn = CloudFormation(use_stack_snapshot=True)
+
+        self.assertEqual({"a": {"o": "ov"}}, cfn.get_stacks_outputs())
+        self.assertTrue(cfn.stack_exists("a"))
+        self.assertFalse(cfn.stack_exists("b"))
+        self.assertEqual({"k": "v"}, cfn.get_stack_parameters_dict("a"))
+        self.assertEqual(["a"], cfn.get_stack_names())
+        cfn.validate_stack_is_ready_for_action(CloudFormationStack('', [], 'a', 'my-region'))
+
+        get_stack_descriptions_mock.assert_called_once_with()
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_validate_stack_is_ready_for_action_uses_stack_snapshot(self, _, get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "a", "StackStatus": "UPDATE_IN_PROGRESS"}
+
+        cfn = CloudFormation(use_stack_snapshot=True)
+        cfn.stack_exists("a")
+        with self.assertRaises(CfnStackActionFailedException):
+            cfn.validate_stack_is_ready_for_action(CloudFormationStack('', [], 'a', 'my-region'))
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_descriptions')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_refresh_stack_snapshot_updates_only_the_given_stack(self, _, get_stack_description_mock,
+                                                                 get_stack_descriptions_mock):
+        get_stack_descriptions_mock.return_value = [{"StackName": "a", "Outputs": []},
+                                                    {"StackName": "b", "Outputs": []}]
+        get_stack_description_mock.return_value = {"StackName": "a",
+                                                   "Outputs": [{"OutputKey": "o", "OutputValue": "ov"}]}
+
+        cfn = CloudFormation(use_stack_snapshot=True)
+        cfn.get_stacks_outputs()
+        cfn.refresh_stack_snapshot("a")
+
+        self.assertEqual({"a": {"o": "ov"}}, cfn.get_stacks_outputs())
+        get_stack_description_mock.assert_called_once_with("a")
+        get_stack_descriptions_mock.assert_called_once_with()
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_refresh_stack_snapshot_returns_state_of_deleted_stack(self, _, get_stack_description_mock):
+        get_stack_description_mock.side_effect = CfnSphereBotoError(
+            ClientError({"Error": {"Code": "ValidationError", "Message": "Stack with id a does not exist"}}, "Foo"))
+
+        self.assertFalse(CloudFormation().refresh_stack_snapshot("a").exists)
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_describe_stack_state_uses_single_describe_call(self, _, get_stack_description_mock):
+        get_stack_description_mock.return_value = {
+            "StackName": "a",
+            "StackStatus": "UPDATE_COMPLETE",
+            "Parameters": [{"ParameterKey": "k", "ParameterValue": "v"}],
+            "Outputs": [{"OutputKey": "o", "OutputValue": "ov"}]
+        }
+
+        state = CloudFormation().describe_stack_state("a")
+
+        self.assertTrue(state.exists)
+        self.assertEqual("UPDATE_COMPLETE", state.status)
+        self.assertEqual({"k": "v"}, state.parameters)
+        self.assertEqual([{"OutputKey": "o", "OutputValue": "ov"}], state.outputs)
+        get_stack_description_mock.assert_called_once_with("a")
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_validate_stack_is_ready_for_action_uses_given_stack_state(self, _, get_stack_description_mock):
+        stack = CloudFormationStack('', [], 'a', 'my-region')
+        state = StackState('a', {"StackName": "a", "StackStatus": "CREATE_COMPLETE"})
+
+        CloudFormation().validate_stack_is_ready_for_action(stack, state)
+
+        get_stack_description_mock.assert_not_called()
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.cfn.CloudFormation._delete_stack')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.wait_for_stack_action_to_complete')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_delete_stack_removes_stack_from_snapshot(self, _, __, ___, get_stack_description_mock):
+        get_stack_description_mock.return_value = {"StackName": "a"}
+
+        cfn = CloudFormation(use_stack_snapshot=True)
+        self.assertTrue(cfn.stack_exists("a"))
+
+        cfn.delete_stack(CloudFormationStack('', [], 'a', 'my-region'))
+        self.assertFalse(cfn.stack_exists("a"))
+        get_stack_description_mock.assert_called_once_with("a")
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_descriptions')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_stacks_outputs_describes_only_given_stacks(self, _, get_stack_description_mock,
+                                                            get_stack_descriptions_mock):
+        get_stack_description_mock.side_effect = [
+            {"StackName": "a", "Outputs": [{"OutputKey": "o", "OutputValue": "ov"}]}
+        ]
+
+        result = CloudFormation().get_stacks_outputs(["a"])
+
+        self.assertEqual({"a": {"o": "ov"}}, result)
+        get_stack_description_mock.assert_called_once_with("a")
+        get_stack_descriptions_mock.assert_not_called()
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_stack_descriptions_by_name_ignores_non_existing_stacks(self, _, get_stack_description_mock):
+        def describe(stack_name):
+            if stack_name == "b":
+                raise CfnSphereBotoError(
+                    ClientError({"Error": {"Code": "ValidationError", "Message": "Stack with id b does not exist"}},
+                                "Foo"))
+            return {"StackName": stack_name}
+
+        get_stack_description_mock.side_effect = describe
+
+        result = CloudFormation().get_stack_descriptions_by_name(["a", "b"])
+
+        self.assertEqual([{"StackName": "a"}], result)
+
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_descriptions')
+    @patch('cfn_sphere.aws.cfn.CloudFormation.get_stack_description')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_stack_descriptions_by_name_falls_back_to_pagination_for_many_stacks(self, _,
+                                                                                     get_stack_description_mock,
+                                                                                     get_stack_descriptions_mock):
+        stack_names = ["stack-{0}".format(i) for i in range(50)]
+        get_stack_descriptions_mock.return_value = [{"StackName": "stack-1"}, {"StackName": "other"}]
+
+        result = CloudFormation().get_stack_descriptions_by_name(stack_names)
+
+        self.assertEqual([{"StackName": "stack-1"}], result)
+        get_stack_description_mock.assert_not_called()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_wait_for_stack_event_returns_expected_event_from_event_stream(self, _):
+        event = {
+            'StackName': 'my-stack',
+            'LogicalResourceId': 'my-stack',
+            'ResourceType': 'AWS::CloudFormation::Stack',
+            'Timestamp': datetime.datetime(2016, 4, 1, 8, 3, 27, 548000, tzinfo=tzutc()),
+            'EventId': 'my-event-id',
+            'ResourceStatus': 'CREATE_COMPLETE'
+        }
+        event_stream = Mock()
+        event_stream.poll.return_value = iter([event])
+        valid_from_timestamp = datetime.datetime(2016, 4, 1, 8, 3, 25, 548000, tzinfo=tzutc())
+
+        result = CloudFormation().wait_for_stack_event("my-stack", "CREATE_COMPLETE", valid_from_timestamp, 10,
+                                                       event_stream=event_stream)
+
+        self.assertEqual(event, result)
+
+    @patch('cfn_sphere.aws.cfn.time.sleep')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_wait_for_stack_event_sleeps_as_told_by_poll_interval(self, _, sleep_mock):
+        event_stream = Mock()
+        event_stream.poll.side_effect = [iter([]), iter([])]
+        poll_interval = Mock()
+        poll_interval.next_interval.side_effect = [1, 0]
+        valid_from_timestamp = datetime.datetime(2016, 4, 1, 8, 3, 25, 548000, tzinfo=tzutc())
+
+        with patch('cfn_sphere.aws.cfn.datetime') as datetime_mock:
+            start = datetime.datetime(2016, 4, 1, 8, 3, 25)
+            datetime_mock.now.side_effect = [start, start, start, start, start, start + datetime.timedelta(seconds=10)]
+
+            with self.assertRaises(CfnStackActionFailedException):
+                CloudFormation().wait_for_stack_event("my-stack", "CREATE_COMPLETE", valid_from_timestamp, 10,
+                                                      event_stream=event_stream, poll_interval=poll_interval)
+
+        self.assertEqual([mock.call(False), mock.call(False)], poll_interval.next_interval.mock_calls)
+        self.assertEqual([mock.call(1), mock.call(0)], sleep_mock.mock_calls)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_init_registers_server_clock_offset_handler(self, client_mock):
+        CloudFormation()
+        client_mock.return_value.meta.events.register.assert_any_call('after-call.cloudformation',
+                                                                      record_server_clock_offset,
+                                                                      unique_id='cfn-sphere-server-clock-offset')
+
+    @patch('cfn_sphere.aws.cfn.get_cfn_api_server_time')
+    @patch('cfn_sphere.aws.cfn.StackWatcher.wait')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_wait_for_stack_action_to_complete_waits_through_stack_watcher_if_enabled(self, _, wait_mock,
+                                                                                      server_time_mock):
+        server_time_mock.return_value = datetime.datetime(2016, 4, 1, 8, 3, 35, tzinfo=tzutc())
+        start_event = {"Timestamp": datetime.datetime(2016, 4, 1, 8, 3, 40, tzinfo=tzutc())}
+        end_event = {"Timestamp": datetime.datetime(2016, 4, 1, 8, 4, 40, tzinfo=tzutc())}
+        wait_mock.return_value = start_event, end_event
+
+        cfn = CloudFormation(use_stack_watcher=True)
+        cfn.wait_for_stack_event = Mock()
+        cfn.wait_for_stack_action_to_complete("my-stack", "create", 600)
+
+        wait_mock.assert_called_once_with("my-stack", "create", 600,
+                                          datetime.datetime(2016, 4, 1, 8, 3, 25, tzinfo=tzutc()), mock.ANY)
+        cfn.wait_for_stack_event.assert_not_called()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_template_kwargs_returns_template_body_without_artifact_bucket(self, _):
+        template = Mock(spec=CloudFormationTemplate)
+        template.get_template_json.return_value = "x" * 60000
+
+        self.assertEqual({"TemplateBody": "x" * 60000}, CloudFormation().get_template_kwargs(template))
+
+    @patch('cfn_sphere.aws.cfn.S3')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_template_kwargs_returns_template_body_for_small_templates(self, _, s3_mock):
+        template = Mock(spec=CloudFormationTemplate)
+        template.get_template_json.return_value = '{"Resources": {}}'
+
+        self.assertEqual({"TemplateBody": '{"Resources": {}}'},
+                         CloudFormation().get_template_kwargs(template, "my-bucket"))
+        s3_mock.assert_not_called()
+
+    @patch('cfn_sphere.aws.cfn.S3')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_template_kwargs_stages_large_templates_in_artifact_bucket(self, _, s3_mock):
+        template = Mock(spec=CloudFormationTemplate)
+        template.get_template_json.return_value = "x" * 60000
+        s3_mock.return_value.object_exists.return_value = False
+        s3_mock.return_value.get_object_url.return_value = "https://s3.eu-west-1.amazonaws.com/my-bucket/key"
+        key = "cfn-sphere/templates/{0}.json".format(hashlib.sha256(b"x" * 60000).hexdigest())
+
+        result = CloudFormation().get_template_kwargs(template, "my-bucket")
+
+        self.assertEqual({"TemplateURL": "https://s3.eu-west-1.amazonaws.com/my-bucket/key"}, result)
+        s3_mock.return_value.get_object_url.assert_called_once_with("my-bucket", key)
+        s3_mock.return_value.put_object.assert_called_once_with("my-bucket", key, "x" * 60000)
+
+    @patch('cfn_sphere.aws.cfn.S3')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_stage_template_skips_upload_of_existing_templates_and_reuses_s3_client(self, _, s3_mock):
+        s3_mock.return_value.object_exists.return_value = True
+
+        cfn = CloudFormation(region="eu-central-1")
+        cfn.stage_template("foo", "my-bucket")
+        cfn.stage_template("bar", "my-bucket")
+
+        s3_mock.assert_called_once_with(region="eu-central-1")
+        s3_mock.return_value.put_object.assert_not_called()
+
+    @patch('cfn_sphere.aws.cfn.S3')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_validate_template_passes_template_url_for_large_templates(self, client_mock, s3_mock):
+        template = Mock(spec=CloudFormationTemplate)
+        template.get_template_json.return_value = "x" * 60000
+        s3_mock.return_value.object_exists.return_value = True
+
+        CloudFormation().validate_template(template, artifact_bucket="my-bucket")
+
+        client_mock.return_value.validate_template.assert_called_once_with(TemplateURL=mock.ANY)
+
+
+class StackDescriptionSnapshotTests(TestCase):
+    def test_get_descriptions_for_fetches_unknown_stacks_only_once(self):
+        targeted_loader = Mock(return_value=[{"StackName": "a"}])
+        snapshot = StackDescriptionSnapshot(Mock(), targeted_loader)
+
+        self.assertEqual([{"StackName": "a"}], snapshot.get_descriptions_for(["a", "b"]))
+        self.assertEqual([{"StackName": "a"}], snapshot.get_descriptions_for(["a", "b"]))
+        self.assertIsNone(snapshot.get_description("b"))
+
+        targeted_loader.assert_called_once_with(mock.ANY)
+        six.assertCountEqual(self, ["a", "b"], targeted_loader.call_args[0][0])
+
+    def test_get_descriptions_for_uses_complete_snapshot(self):
+        targeted_loader = Mock()
+        snapshot = StackDescriptionSnapshot(Mock(return_value=[{"StackName": "a"}]), targeted_loader)
+        snapshot.get_descriptions()
+
+        self.assertEqual([], snapshot.get_descriptions_for(["b"]))
+        targeted_loader.assert_not_called()
+
+    def test_update_adds_new_stack(self):
+        snapshot = StackDescriptionSnapshot(Mock(return_value=[]), Mock())
+        snapshot.get_descriptions()
+
+        snapshot.update("b", {"StackName": "b"})
+
+        self.assertEqual({"StackName": "b"}, snapshot.get_description("b"))
+
+    def test_update_removes_deleted_stack(self):
+        snapshot = StackDescriptionSnapshot(Mock(return_value=[{"StackName": "a"}]), Mock())
+        snapshot.get_descriptions()
+
+        snapshot.update("a", None)
+
+        self.assertEqual([], snapshot.get_descriptions())
+
+
+class StackEventStreamTests(TestCase):
+    @staticmethod
+    def create_event(event_id, second):
+        return {'EventId': event_id,
+                'Timestamp': datetime.datetime(2016, 4, 1, 8, 3, second, tzinfo=tzutc())}
+
+    def create_client(self, *pages_per_poll):
+        client = Mock()
+        client.get_paginator.return_value.paginate.side_effect = [
+            iter([{"StackEvents": page} for page in pages]) for pages in pages_per_poll
+        ]
+        return client
+
+    def test_poll_yields_events_oldest_first(self):
+        client = self.create_client([[self.create_event('e3', 3), self.create_event('e2', 2)],
+                                     [self.create_event('e1', 1)]])
+
+        events = list(StackEventStream(client, 'my-stack').poll())
+
+        self.assertEqual(['e1', 'e2', 'e3'], [event['EventId'] for event in events])
+        client.get_paginator.return_value.paginate.assert_called_once_with(StackName='my-stack')
+
+    def test_poll_stops_paging_at_last_seen_event(self):
+        client = self.create_client([[self.create_event('e2', 2), self.create_event('e1', 1)]],
+                                    [[self.create_event('e4', 4), self.create_event('e3', 3)],
+                                     [self.create_event('e2', 2)],
+                                     [self.create_event('e1', 1)]])
+        stream = StackEventStream(client, 'my-stack')
+
+        list(stream.poll())
+        events = list(stream.poll())
+
+        self.assertEqual(['e3', 'e4'], [event['EventId'] for event in events])
+
+    def test_poll_stops_paging_at_events_older_than_not_before(self):
+        client = self.create_client([[self.create_event('e3', 3)],
+                                     [self.create_event('e2', 2)],
+                                     [self.create_event('e1', 1)]])
+        not_before = datetime.datetime(2016, 4, 1, 8, 3, 2, tzinfo=tzutc())
+
+        events = list(StackEventStream(client, 'my-stack', not_before=not_before).poll())
+
+        self.assertEqual(['e3'], [event['EventId'] for event in events])
+
+    def test_poll_continues_after_last_consumed_event(self):
+        client = self.create_client([[self.create_event('e2', 2), self.create_event('e1', 1)]],
+                                    [[self.create_event('e2', 2), self.create_event('e1', 1)]])
+        stream = StackEventStream(client, 'my-stack')
+
+        self.assertEqual('e1', next(stream.poll())['EventId'])
+        self.assertEqual(['e2'], [event['EventId'] for event in stream.poll()])
+
+    def test_poll_keeps_a_bounded_number_of_seen_event_ids(self):
+        client = self.create_client([[self.create_event('e{0}'.format(i), 0) for i in range(5)]])
+        stream = StackEventStream(client, 'my-stack', max_seen_event_ids=2)
+
+        list(stream.poll())
+
+        self.assertEqual({'e1', 'e0'}, stream._seen_event_ids)
+
+
+class ExponentialPollIntervalTests(TestCase):
+    def test_next_interval_starts_fast_and_grows_to_maximum(self):
+        poll_interval = ExponentialPollInterval(minimum=2, maximum=5, factor=2)
+
+        intervals = [poll_interval.next_interval(False) for _ in range(4)]
+
+        self.assertEqual([2, 4, 5, 5], intervals)
+
+    def test_next_interval_snaps_back_to_minimum_on_new_events(self):
+        poll_interval = ExponentialPollInterval(minimum=2, maximum=30, factor=2)
+        poll_interval.next_interval(False)
+        poll_interval.next_interval(False)
+
+        self.assertEqual(2, poll_interval.next_interval(True))
+
+    def test_expected_duration_lowers_the_maximum_for_short_stacks(self):
+        self.assertEqual(6, ExponentialPollInterval(expected_duration=60, minimum=2, maximum=30).maximum)
+
+    def test_expected_duration_does_not_exceed_the_maximum(self):
+        self.assertEqual(30, ExponentialPollInterval(expected_duration=3600, minimum=2, maximum=30).maximum)
+
+
+class StackWatcherTests(TestCase):
+    def setUp(self):
+        self.not_before = datetime.datetime(2016, 4, 1, 8, 0, 0, tzinfo=tzutc())
+        self.cfn = Mock()
+        self.cfn.handle_stack_event.side_effect = self.handle_stack_event
+
+    @staticmethod
+    def handle_stack_event(event, valid_from_timestamp, expected_status, stack_name):
+        if event["Timestamp"] > valid_from_timestamp and event["ResourceStatus"] == expected_status:
+            return event
+        if event["ResourceStatus"].endswith("_FAILED"):
+            raise CfnStackActionFailedException("Stack is in {0} state".format(event["ResourceStatus"]))
+        return None
+
+    def create_event(self, status, minute):
+        return {"EventId": status, "ResourceStatus": status,
+                "Timestamp": datetime.datetime(2016, 4, 1, 8, minute, 0, tzinfo=tzutc())}
+
+    def create_description(self, stack_name, status):
+        return {"StackName": stack_name, "StackStatus": status, "CreationTime": self.not_before}
+
+    def create_watch(self, stack_name, events=None, interval=5, start_timeout=120):
+        event_stream = Mock()
+        event_stream.poll.side_effect = lambda: iter(events or [])
+        poll_interval = Mock()
+        poll_interval.next_interval.return_value = interval
+        return StackWatch(stack_name, "create", 600, self.not_before, event_stream, poll_interval,
+                          start_timeout=start_timeout)
+
+    def create_started_watch(self, stack_name):
+        watch = self.create_watch(stack_name)
+        watch.started(self.create_event("CREATE_IN_PROGRESS", 1))
+        return watch
+
+    def test_poll_checks_statuses_of_all_stacks_in_one_batch(self):
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS"),
+                                                                 self.create_description("b", "CREATE_IN_PROGRESS"),
+                                                                 self.create_description("c", "CREATE_COMPLETE")]
+        watches = [self.create_watch("a", interval=5), self.create_watch("b", interval=3)]
+
+        self.assertEqual(3, StackWatcher(self.cfn).poll(watches))
+        self.cfn.get_in_progress_stack_summaries.assert_called_once_with()
+        self.cfn.get_stack_description_if_exists.assert_not_called()
+
+    def test_poll_does_not_page_through_all_stacks(self):
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS")]
+        watches = [self.create_watch(name) for name in "abcde"]
+
+        StackWatcher(self.cfn).poll(watches)
+
+        self.cfn.get_in_progress_stack_summaries.assert_called_once_with()
+        self.cfn.get_stack_descriptions.assert_not_called()
+        self.cfn.get_stack_description_if_exists.assert_not_called()
+
+    def test_poll_fetches_events_of_stacks_that_left_progress(self):
+        watcher = StackWatcher(self.cfn)
+        watches = [self.create_started_watch("a"), self.create_started_watch("b")]
+
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS"),
+                                                                 self.create_description("b", "CREATE_IN_PROGRESS")]
+        watcher.poll(watches)
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS")]
+        watcher.poll(watches)
+
+        self.assertEqual(1, watches[0].event_stream.poll.call_count)
+        self.assertEqual(2, watches[1].event_stream.poll.call_count)
+
+    def test_poll_describes_a_single_stack_directly(self):
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_IN_PROGRESS")
+
+        StackWatcher(self.cfn).poll([self.create_watch("a")])
+
+        self.cfn.get_stack_description_if_exists.assert_called_once_with("a")
+        self.cfn.get_in_progress_stack_summaries.assert_not_called()
+
+    def test_poll_fetches_events_only_for_stacks_with_changed_status(self):
+        watcher = StackWatcher(self.cfn)
+        watches = [self.create_started_watch("a"), self.create_started_watch("b")]
+
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS"),
+                                                                 self.create_description("b", "CREATE_IN_PROGRESS")]
+        watcher.poll(watches)
+        self.cfn.get_in_progress_stack_summaries.return_value = [self.create_description("a", "CREATE_IN_PROGRESS"),
+                                                                 self.create_description("b", "ROLLBACK_IN_PROGRESS")]
+        watcher.poll(watches)
+
+        self.assertEqual(1, watches[0].event_stream.poll.call_count)
+        self.assertEqual(2, watches[1].event_stream.poll.call_count)
+
+    def test_poll_keeps_fetching_events_until_the_action_started(self):
+        start_event = self.create_event("CREATE_IN_PROGRESS", 1)
+        polled_events = [[], [], [start_event]]
+        watch = self.create_watch("a")
+        watch.event_stream.poll.side_effect = lambda: iter(polled_events.pop(0) if polled_events else [])
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_IN_PROGRESS")
+        watcher = StackWatcher(self.cfn)
+
+        for _ in range(5):
+            watcher.poll([watch])
+
+        self.assertEqual(start_event, watch.start_event)
+        self.assertEqual(3, watch.event_stream.poll.call_count)
+        self.assertIsNone(watch.error)
+
+    def test_poll_dispatches_completion(self):
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_COMPLETE")
+        start_event = self.create_event("CREATE_IN_PROGRESS", 1)
+        end_event = self.create_event("CREATE_COMPLETE", 2)
+        watch = self.create_watch("a", events=[start_event, end_event])
+        watcher = StackWatcher(self.cfn)
+        watcher._watches["a"] = watch
+
+        watcher.poll([watch])
+
+        self.assertTrue(watch.done.is_set())
+        self.assertEqual(start_event, watch.start_event)
+        self.assertEqual(end_event, watch.end_event)
+        self.assertEqual({}, watcher._watches)
+
+    def test_poll_dispatches_failures(self):
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_FAILED")
+        watch = self.create_watch("a", events=[self.create_event("CREATE_IN_PROGRESS", 1),
+                                               self.create_event("CREATE_FAILED", 2)])
+
+        StackWatcher(self.cfn).poll([watch])
+
+        self.assertTrue(watch.done.is_set())
+        self.assertIsInstance(watch.error, CfnStackActionFailedException)
+
+    def test_poll_dispatches_timeouts(self):
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_IN_PROGRESS")
+        watch = self.create_watch("a", start_timeout=0)
+
+        StackWatcher(self.cfn).poll([watch])
+
+        self.assertIsInstance(watch.error, CfnStackActionFailedException)
+
+    def test_poll_dispatches_repeated_status_check_errors_to_all_watches(self):
+        self.cfn.get_in_progress_stack_summaries.side_effect = CfnSphereBotoError(None)
+        watches = [self.create_watch("a"), self.create_watch("b")]
+        watcher = StackWatcher(self.cfn, max_status_check_failures=3)
+
+        watcher.poll(watches)
+        watcher.poll(watches)
+        self.assertFalse(any(watch.done.is_set() for watch in watches))
+
+        watcher.poll(watches)
+        self.assertIsInstance(watches[0].error, CfnSphereBotoError)
+        self.assertIsInstance(watches[1].error, CfnSphereBotoError)
+
+    def test_poll_survives_single_status_check_errors(self):
+        self.cfn.get_in_progress_stack_summaries.side_effect = [CfnSphereBotoError(None), [],
+                                                                CfnSphereBotoError(None), []]
+        watches = [self.create_watch("a", interval=5), self.create_watch("b", interval=3)]
+        watcher = StackWatcher(self.cfn, max_status_check_failures=2)
+
+        self.assertEqual(3, watcher.poll(watches))
+        for _ in range(3):
+            watcher.poll(watches)
+
+        self.assertFalse(any(watch.done.is_set() for watch in watches))
+
+    def test_poll_dispatches_status_check_errors_to_watches_past_their_deadline(self):
+        self.cfn.get_in_progress_stack_summaries.side_effect = CfnSphereBotoError(None)
+        watches = [self.create_watch("a", start_timeout=0), self.create_watch("b")]
+
+        StackWatcher(self.cfn).poll(watches)
+
+        self.assertIsInstance(watches[0].error, CfnSphereBotoError)
+        self.assertFalse(watches[1].done.is_set())
+
+    def test_wait_returns_start_and_end_event(self):
+        start_event = self.create_event("CREATE_IN_PROGRESS", 1)
+        end_event = self.create_event("CREATE_COMPLETE", 2)
+        self.cfn.get_stack_description_if_exists.return_value = self.create_description("a", "CREATE_COMPLETE")
+        self.cfn.client.get_paginator.return_value.paginate.return_value = [{"StackEvents": [end_event, start_event]}]
+        poll_interval = Mock()
+        poll_interval.next_interval.return_value = 0
+
+        result = StackWatcher(self.cfn).wait("a", "create", 600, self.not_before, poll_interval)
+
+        self.assertEqual((start_event, end_event), result)
+
+    def test_wait_raises_dispatched_error(self):
+        self.cfn.get_stack_description_if_exists.side_effect = CfnSphereBotoError(None)
+        poll_interval = Mock()
+        poll_interval.next_interval.return_value = 0
+
+        with self.assertRaises(CfnSphereBotoError):
+            StackWatcher(self.cfn).wait("a", "create", 600, self.not_before, poll_interval)
+
+        self.assertEqual(3, self.cfn.get_stack_description_if_exists.call_count)
@@ -0,0 +1,55 @@
+try:
+    from unittest import TestCase
+    from mock import patch, ANY
+except ImportError:
+    from unittest import TestCase
+    from mock import patch, ANY
+
+from cfn_sphere.aws.client_registry import ClientRegistry
+
+
+class ClientRegistryTests(TestCase):
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_client_creates_client_once_per_service_and_region(self, client_mock):
+        registry = ClientRegistry()
+
+        client = registry.get_client('ssm', 'eu-west-1')
+
+        self.assertIs(client, registry.get_client('ssm', 'eu-west-1'))
+        client_mock.assert_called_once_with('ssm', region_name='eu-west-1', config=ANY)
+
+        registry.get_client('ssm', 'eu-central-1')
+        registry.get_client('kms', 'eu-west-1')
+        self.assertEqual(3, client_mock.call_count)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_client_uses_configured_connection_pool_size(self, client_mock):
+        ClientRegistry(max_pool_connections=42).get_client('ssm', 'eu-west-1')
+
+        self.assertEqual(42, client_mock.call_args[1]["config"].max_pool_connections)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_client_routes_calls_through_rate_limiter(self, client_mock):
+        ClientRegistry().get_client('ssm', 'eu-west-1')
+
+        client_mock.return_value.meta.events.register.assert_any_call('before-send', ANY)
+        client_mock.return_value.meta.events.register.assert_any_call('needs-retry', ANY)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
+    def test_get_resource_creates_resource_once_per_service_and_region(self, resource_mock):
+        registry = ClientRegistry()
+
+        resource = registry.get_resource('s3')
+
+        self.assertIs(resource, registry.get_resource('s3'))
+        resource_mock.assert_called_once_with('s3', region_name=None, config=ANY)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_reset_drops_created_clients(self, client_mock):
+        registry = ClientRegistry()
+        registry.get_client('ssm', 'eu-west-1')
+
+        registry.reset()
+        registry.get_client('ssm', 'eu-west-1')
+
+        self.assertEqual(2, client_mock.call_count)
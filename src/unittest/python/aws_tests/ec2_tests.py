@@ -9,10 +9,14 @@ import datetime
 
 from cfn_sphere.aws.ec2 import Ec2Api
 from cfn_sphere.exceptions import CfnSphereException
+from cfn_sphere.aws.client_registry import reset_clients
 
 
 class Ec2ApiTests(TestCase):
-    @patch("cfn_sphere.aws.ec2.boto3.client")
+    def setUp(self):
+        reset_clients()
+
+    @patch("cfn_sphere.aws.client_registry.boto3.client")
     def test_get_images_raises_exception_on_empty_response(self, boto_client):
         boto_client.return_value.describe_images.return_value = {'Images': []}
 
@@ -36,3 +40,45 @@ class Ec2ApiTests(TestCase):
 
         result = Ec2Api.get_latest_image_id(images)
         self.assertEqual('image1', result)
+
+    @patch("cfn_sphere.aws.client_registry.boto3.client")
+    def test_get_latest_image_id_by_name_memoizes_result_per_pattern(self, boto_client):
+        boto_client.return_value.describe_images.return_value = {'Images': [
+            {'ImageId': 'image1', 'CreationDate': '2015-01-06T15:01:24.000Z'},
+            {'ImageId': 'image2', 'CreationDate': '2015-01-07T15:01:24.000Z'}]}
+        ec2 = Ec2Api()
+
+        self.assertEqual('image2', ec2.get_latest_image_id_by_name('my-ami-*'))
+        self.assertEqual('image2', ec2.get_latest_image_id_by_name('my-ami-*'))
+        ec2.get_latest_image_id_by_name('other-ami-*')
+
+        self.assertEqual(2, boto_client.return_value.describe_images.call_count)
+
+    @patch("cfn_sphere.aws.client_registry.boto3.client")
+    def test_get_latest_image_id_by_name_serves_result_from_cache(self, boto_client):
+        cache = Mock()
+        cache.get.return_value = 'cached-image'
+
+        self.assertEqual('cached-image', Ec2Api(region='eu-central-1', cache=cache).get_latest_image_id_by_name('a*'))
+        cache.get.assert_called_once_with('ami', 'eu-central-1\na*')
+        boto_client.return_value.describe_images.assert_not_called()
+
+    @patch("cfn_sphere.aws.client_registry.boto3.client")
+    def test_get_latest_image_id_by_name_stores_result_in_cache(self, boto_client):
+        boto_client.return_value.describe_images.return_value = {'Images': [
+            {'ImageId': 'image1', 'CreationDate': '2015-01-06T15:01:24.000Z'}]}
+        cache = Mock()
+        cache.get.return_value = None
+
+        Ec2Api(region='eu-central-1', cache=cache).get_latest_image_id_by_name('a*')
+
+        cache.set.assert_called_once_with('ami', 'eu-central-1\na*', 'image1')
+
+    @patch("cfn_sphere.aws.client_registry.boto3.client")
+    def test_get_latest_taupage_image_id_looks_up_taupage_images(self, boto_client):
+        boto_client.return_value.describe_images.return_value = {'Images': [
+            {'ImageId': 'image1', 'CreationDate': '2015-01-06T15:01:24.000Z'}]}
+
+        self.assertEqual('image1', Ec2Api().get_latest_taupage_image_id())
+        filters = boto_client.return_value.describe_images.call_args[1]['Filters']
+        self.assertIn({'Name': 'name', 'Values': ['Taupage-AMI-*']}, filters)
@@ -1,24 +1,28 @@
 try:
     from unittest import TestCase
-    from mock import patch
+    from mock import patch, Mock
 except ImportError:
     from unittest import TestCase
-    from mock import patch
+    from mock import patch, Mock
 
 import base64
 
 from cfn_sphere.aws.kms import KMS
+from cfn_sphere.aws.client_registry import reset_clients
 
 
 class KMSTests(TestCase):
-    @patch('cfn_sphere.aws.kms.boto3.client')
+    def setUp(self):
+        reset_clients()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_decrypt_value(self, boto_mock):
         boto_mock.return_value.decrypt.return_value = {'Plaintext': b'decryptedValue'}
 
         self.assertEqual('decryptedValue', KMS().decrypt("ZW5jcnlwdGVkVmFsdWU="))
         boto_mock.return_value.decrypt.assert_called_once_with(CiphertextBlob=b'encryptedValue', EncryptionContext={})
 
-    @patch('cfn_sphere.aws.kms.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_decrypt_value_with_execution_context(self, boto_mock):
         boto_mock.return_value.decrypt.return_value = {'Plaintext': b'decryptedValue'}
 
@@ -26,7 +30,7 @@ class KMSTests(TestCase):
         boto_mock.return_value.decrypt.assert_called_once_with(CiphertextBlob=b'encryptedValue',
                                                                EncryptionContext={'k2': 'v2', 'k1': 'v1'})
 
-    @patch('cfn_sphere.aws.kms.boto3.client')
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_decrypt_value_with_unicode_char(self, boto_mock):
         boto_mock.return_value.decrypt.return_value = {
             'Plaintext': b'(\xe2\x95\xaf\xc2\xb0\xe2\x96\xa1\xc2\xb0\xef\xbc\x89\xe2\x95\xaf\xef\xb8\xb5 \xe2\x94\xbb\xe2\x94\x81\xe2\x94\xbb'}
@@ -36,3 +40,43 @@ class KMSTests(TestCase):
 
         boto_mock.return_value.decrypt.assert_called_once_with(
             CiphertextBlob=base64.b64decode("KOKVr8Kw4pahwrDvvInila/vuLUg4pS74pSB4pS7".encode()), EncryptionContext={})
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_decrypt_memoizes_values_by_ciphertext_and_encryption_context(self, boto_mock):
+        boto_mock.return_value.decrypt.return_value = {'Plaintext': b'decryptedValue'}
+        kms = KMS()
+
+        kms.decrypt("ZW5jcnlwdGVkVmFsdWU=")
+        kms.decrypt("ZW5jcnlwdGVkVmFsdWU=")
+        kms.decrypt("ZW5jcnlwdGVkVmFsdWU=", {"k1": "v1"})
+        kms.decrypt("ZW5jcnlwdGVkVmFsdWU=", {"k1": "v1"})
+
+        self.assertEqual(2, boto_mock.return_value.decrypt.call_count)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_decrypt_many_decrypts_distinct_values_once(self, boto_mock):
+        boto_mock.return_value.decrypt.side_effect = lambda CiphertextBlob, EncryptionContext: {
+            'Plaintext': CiphertextBlob.upper()}
+
+        result = KMS().decrypt_many([("Zm9v", None), ("YmFy", {}), ("Zm9v", {})])
+
+        self.assertEqual(["FOO", "BAR", "FOO"], result)
+        self.assertEqual(2, boto_mock.return_value.decrypt.call_count)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_decrypt_serves_values_from_cache(self, boto_mock):
+        cache = Mock()
+        cache.get.return_value = "cachedValue"
+
+        self.assertEqual("cachedValue", KMS(cache=cache).decrypt("ZW5jcnlwdGVkVmFsdWU="))
+        boto_mock.return_value.decrypt.assert_not_called()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_decrypt_stores_values_in_cache(self, boto_mock):
+        boto_mock.return_value.decrypt.return_value = {'Plaintext': b'decryptedValue'}
+        cache = Mock()
+        cache.get.return_value = None
+
+        KMS(cache=cache).decrypt("ZW5jcnlwdGVkVmFsdWU=", {"k1": "v1"})
+
+        cache.set.assert_called_once_with("kms", '["ZW5jcnlwdGVkVmFsdWU=", [["k1", "v1"]]]', "decryptedValue")
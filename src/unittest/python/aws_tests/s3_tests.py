@@ -9,17 +9,24 @@ except ImportError:
     from unittest import TestCase
     from mock import Mock, patch
 
+from botocore.exceptions import ClientError
+
 from cfn_sphere.aws.s3 import S3
+from cfn_sphere.exceptions import CfnSphereBotoError
+from cfn_sphere.aws.client_registry import reset_clients
 
 
 class S3Tests(unittest.TestCase):
+    def setUp(self):
+        reset_clients()
+
     def test_parse_url_properly_parses_s3_url(self):
         (protocol, bucket_name, key_name) = S3._parse_url('s3://my-bucket/my/key/file.json')
         self.assertEqual('s3', protocol)
         self.assertEqual('my-bucket', bucket_name)
         self.assertEqual('my/key/file.json', key_name)
 
-    @patch('cfn_sphere.aws.s3.boto3.resource')
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
     def test_get_contents_from_url_returns_string_content(self, resource_mock):
         body_mock = Mock(spec=StreamingBody)
         body_mock.read.return_value = b'Foo'
@@ -28,3 +35,35 @@ class S3Tests(unittest.TestCase):
 
         result = S3().get_contents_from_url('s3://my-bucket/my/key/file.json')
         self.assertEqual("Foo", result)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
+    def test_object_exists_returns_true_for_existing_object(self, resource_mock):
+        self.assertTrue(S3().object_exists('my-bucket', 'my/key'))
+        resource_mock.return_value.meta.client.head_object.assert_called_once_with(Bucket='my-bucket', Key='my/key')
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
+    def test_object_exists_returns_false_for_missing_object(self, resource_mock):
+        resource_mock.return_value.meta.client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        self.assertFalse(S3().object_exists('my-bucket', 'my/key'))
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
+    def test_object_exists_raises_exception_on_other_errors(self, resource_mock):
+        resource_mock.return_value.meta.client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+        with self.assertRaises(CfnSphereBotoError):
+            S3().object_exists('my-bucket', 'my/key')
+
+    @patch('cfn_sphere.aws.client_registry.boto3.resource')
+    def test_put_object_uploads_encoded_body(self, resource_mock):
+        S3().put_object('my-bucket', 'my/key', '{"foo": "bar"}')
+        resource_mock.return_value.meta.client.put_object.assert_called_once_with(Bucket='my-bucket', Key='my/key',
+                                                                                  Body=b'{"foo": "bar"}')
+
+    def test_get_object_url_is_path_style_on_regional_endpoint(self):
+        url = S3(region='eu-west-1').get_object_url('my.dotted.bucket', 'cfn-sphere/templates/abc.json')
+        self.assertEqual('https://s3.eu-west-1.amazonaws.com/my.dotted.bucket/cfn-sphere/templates/abc.json', url)
+
+    def test_get_object_url_uses_endpoint_of_the_partition(self):
+        url = S3(region='cn-north-1').get_object_url('my-bucket', 'key.json')
+        self.assertEqual('https://s3.cn-north-1.amazonaws.com.cn/my-bucket/key.json', url)
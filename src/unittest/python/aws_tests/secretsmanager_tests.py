@@ -0,0 +1,77 @@
+try:
+    from unittest import TestCase
+    from mock import patch
+except ImportError:
+    from unittest import TestCase
+    from mock import patch
+
+from botocore.exceptions import ClientError
+
+from cfn_sphere.aws.secretsmanager import SecretsManager
+from cfn_sphere.aws.client_registry import reset_clients
+from cfn_sphere.exceptions import CfnSphereBotoError
+
+
+class SecretsManagerTests(TestCase):
+    def setUp(self):
+        reset_clients()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_value_returns_secret_string(self, boto_mock):
+        boto_mock.return_value.get_secret_value.return_value = {'Name': 'my-secret', 'SecretString': 'value'}
+
+        self.assertEqual('value', SecretsManager().get_secret_value('my-secret'))
+        boto_mock.return_value.get_secret_value.assert_called_once_with(SecretId='my-secret')
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_value_returns_base64_encoded_binary_secret(self, boto_mock):
+        boto_mock.return_value.get_secret_value.return_value = {'Name': 'my-secret', 'SecretBinary': b'value'}
+
+        self.assertEqual('dmFsdWU=', SecretsManager().get_secret_value('my-secret'))
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_values_fetches_secrets_in_batches_of_twenty(self, boto_mock):
+        boto_mock.return_value.batch_get_secret_value.side_effect = lambda SecretIdList: {
+            'SecretValues': [{'Name': name, 'ARN': 'arn:' + name, 'SecretString': name.upper()}
+                             for name in SecretIdList], 'Errors': []}
+        names = ['s{0:02d}'.format(i) for i in range(45)]
+
+        result = SecretsManager().get_secret_values(names + ['arn:s00'])
+
+        expected = dict((name, name.upper()) for name in names)
+        expected['arn:s00'] = 'S00'
+        self.assertEqual(expected, result)
+        self.assertEqual(3, boto_mock.return_value.batch_get_secret_value.call_count)
+        for call_args in boto_mock.return_value.batch_get_secret_value.call_args_list:
+            self.assertLessEqual(len(call_args[1]['SecretIdList']), 20)
+        boto_mock.return_value.get_secret_value.assert_not_called()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_values_follows_next_token(self, boto_mock):
+        boto_mock.return_value.batch_get_secret_value.side_effect = [
+            {'SecretValues': [{'Name': 'a', 'SecretString': 'A'}], 'NextToken': 'token'},
+            {'SecretValues': [{'Name': 'b', 'SecretString': 'B'}]}]
+
+        self.assertEqual({'a': 'A', 'b': 'B'}, SecretsManager().get_secret_values(['a', 'b']))
+        boto_mock.return_value.batch_get_secret_value.assert_called_with(SecretIdList=['a', 'b'], NextToken='token')
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_values_gets_secrets_one_by_one_if_batch_is_denied(self, boto_mock):
+        boto_mock.return_value.batch_get_secret_value.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'BatchGetSecretValue')
+        boto_mock.return_value.get_secret_value.side_effect = lambda SecretId: {'SecretString': SecretId.upper()}
+
+        self.assertEqual({'a': 'A', 'b': 'B'}, SecretsManager().get_secret_values(['a', 'b']))
+        self.assertEqual(2, boto_mock.return_value.get_secret_value.call_count)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_secret_values_gets_secrets_missing_in_batch_one_by_one(self, boto_mock):
+        boto_mock.return_value.batch_get_secret_value.return_value = {
+            'SecretValues': [{'Name': 'a', 'SecretString': 'A'}],
+            'Errors': [{'SecretId': 'b', 'ErrorCode': 'ResourceNotFoundException'}]}
+        boto_mock.return_value.get_secret_value.side_effect = ClientError(
+            {'Error': {'Code': 'ResourceNotFoundException', 'Message': 'not found'}}, 'GetSecretValue')
+
+        with self.assertRaises(CfnSphereBotoError):
+            SecretsManager().get_secret_values(['a', 'b'])
+        boto_mock.return_value.get_secret_value.assert_called_once_with(SecretId='b')
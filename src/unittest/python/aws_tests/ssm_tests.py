@@ -6,12 +6,54 @@ except ImportError:
     from mock import patch
 
 from cfn_sphere.aws.ssm import SSM
+from cfn_sphere.aws.client_registry import reset_clients
 
 
 class SSMTests(TestCase):
-    @patch('cfn_sphere.aws.ssm.boto3.client')
+    def setUp(self):
+        reset_clients()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
     def test_decrypt_value(self, boto_mock):
         boto_mock.return_value.get_parameter.return_value = {'Parameter': { 'Value': 'decryptedValue'} }
 
         self.assertEqual('decryptedValue', SSM().get_parameter('/test'))
         boto_mock.return_value.get_parameter.assert_called_once_with(Name='/test', WithDecryption=True)
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_parameters_fetches_parameters_in_batches_of_ten(self, boto_mock):
+        boto_mock.return_value.get_parameters.side_effect = lambda Names, WithDecryption: {
+            'Parameters': [{'Name': name, 'Value': name.upper()} for name in Names], 'InvalidParameters': []}
+        names = ['/p{0:02d}'.format(i) for i in range(25)]
+
+        result = SSM().get_parameters(names + ['/p00'])
+
+        self.assertEqual({name: name.upper() for name in names}, result)
+        self.assertEqual(3, boto_mock.return_value.get_parameters.call_count)
+        for call_args in boto_mock.return_value.get_parameters.call_args_list:
+            self.assertLessEqual(len(call_args[1]['Names']), 10)
+            self.assertTrue(call_args[1]['WithDecryption'])
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_parameters_omits_invalid_parameters(self, boto_mock):
+        boto_mock.return_value.get_parameters.return_value = {
+            'Parameters': [{'Name': '/a', 'Value': 'a'}, {'Name': '/b', 'Selector': ':2', 'Value': 'b'}],
+            'InvalidParameters': ['/c']}
+
+        self.assertEqual({'/a': 'a', '/b:2': 'b'}, SSM().get_parameters(['/a', '/b:2', '/c']))
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_parameters_does_not_call_api_without_names(self, boto_mock):
+        self.assertEqual({}, SSM().get_parameters([]))
+        boto_mock.return_value.get_parameters.assert_not_called()
+
+    @patch('cfn_sphere.aws.client_registry.boto3.client')
+    def test_get_parameters_by_path_returns_values_of_all_pages(self, boto_mock):
+        boto_mock.return_value.get_paginator.return_value.paginate.return_value = [
+            {'Parameters': [{'Name': '/app/a', 'Value': 'a'}]},
+            {'Parameters': [{'Name': '/app/sub/b', 'Value': 'b'}]}]
+
+        self.assertEqual({'/app/a': 'a', '/app/sub/b': 'b'}, SSM().get_parameters_by_path('/app/'))
+        boto_mock.return_value.get_paginator.assert_called_once_with('get_parameters_by_path')
+        boto_mock.return_value.get_paginator.return_value.paginate.assert_called_once_with(
+            Path='/app/', Recursive=True, WithDecryption=True)
@@ -0,0 +1,193 @@
+try:
+    from unittest import TestCase
+    from mock import Mock, patch
+except ImportError:
+    from unittest import TestCase
+    from mock import Mock, patch
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import boto3
+
+from cfn_sphere.aws.throttling import AdaptiveTokenBucket, RateLimiter
+
+
+class AdaptiveTokenBucketTests(TestCase):
+    @patch('cfn_sphere.aws.throttling.time')
+    def test_acquire_does_not_wait_while_tokens_are_available(self, time_mock):
+        time_mock.monotonic.return_value = 100.0
+        bucket = AdaptiveTokenBucket(rate=2, maximum_rate=2)
+
+        self.assertEqual(0, bucket.acquire())
+        self.assertEqual(0, bucket.acquire())
+        time_mock.sleep.assert_not_called()
+
+    @patch('cfn_sphere.aws.throttling.time')
+    def test_acquire_waits_for_the_next_token_if_bucket_is_empty(self, time_mock):
+        time_mock.monotonic.return_value = 100.0
+        bucket = AdaptiveTokenBucket(rate=2, maximum_rate=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        self.assertEqual(0.5, bucket.acquire())
+        self.assertEqual(1.0, bucket.acquire())
+        self.assertEqual(2, time_mock.sleep.call_count)
+
+    @patch('cfn_sphere.aws.throttling.time')
+    def test_acquire_refills_tokens_over_time(self, time_mock):
+        time_mock.monotonic.return_value = 100.0
+        bucket = AdaptiveTokenBucket(rate=2, maximum_rate=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        time_mock.monotonic.return_value = 101.0
+        self.assertEqual(0, bucket.acquire())
+
+    def test_on_throttle_shrinks_rate_down_to_minimum(self):
+        bucket = AdaptiveTokenBucket(rate=4, minimum_rate=1, maximum_rate=4)
+
+        bucket.on_throttle()
+        self.assertEqual(2, bucket.rate)
+
+        bucket.on_throttle()
+        bucket.on_throttle()
+        self.assertEqual(1, bucket.rate)
+
+    def test_on_success_recovers_rate_up_to_maximum(self):
+        bucket = AdaptiveTokenBucket(rate=4, maximum_rate=4, recovery_step=0.5)
+        bucket.on_throttle()
+
+        bucket.on_success()
+        self.assertEqual(2.5, bucket.rate)
+
+        for _ in range(10):
+            bucket.on_success()
+        self.assertEqual(4, bucket.rate)
+
+
+class RateLimiterTests(TestCase):
+    def test_get_bucket_returns_one_bucket_per_service_and_operation(self):
+        limiter = RateLimiter()
+
+        bucket = limiter.get_bucket("cloudformation", "DescribeStacks")
+
+        self.assertIs(bucket, limiter.get_bucket("cloudformation", "DescribeStacks"))
+        self.assertIsNot(bucket, limiter.get_bucket("cloudformation", "DescribeStackEvents"))
+        self.assertIsNot(bucket, limiter.get_bucket("ssm", "DescribeStacks"))
+
+    def test_before_send_acquires_token_of_the_operation(self):
+        bucket = Mock()
+        bucket.acquire.return_value = 0
+        limiter = RateLimiter(bucket_factory=lambda: bucket)
+
+        self.assertIsNone(limiter.before_send(event_name="before-send.ssm.GetParameter", request=Mock()))
+
+        bucket.acquire.assert_called_once_with()
+        self.assertIs(bucket, limiter.get_bucket("ssm", "GetParameter"))
+
+    def test_needs_retry_shrinks_rate_on_throttling(self):
+        bucket = Mock()
+        limiter = RateLimiter(bucket_factory=lambda: bucket)
+
+        response = (Mock(), {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}})
+        self.assertIsNone(limiter.needs_retry(event_name="needs-retry.ssm.GetParameter", response=response,
+                                              attempts=1, caught_exception=None))
+
+        bucket.on_throttle.assert_called_once_with()
+        bucket.on_success.assert_not_called()
+
+    def test_needs_retry_recovers_rate_on_success(self):
+        bucket = Mock()
+        limiter = RateLimiter(bucket_factory=lambda: bucket)
+
+        limiter.needs_retry(event_name="needs-retry.ssm.GetParameter", response=(Mock(), {"Parameter": {}}),
+                            attempts=1, caught_exception=None)
+
+        bucket.on_success.assert_called_once_with()
+        bucket.on_throttle.assert_not_called()
+
+    def test_needs_retry_ignores_attempts_without_response(self):
+        bucket = Mock()
+        limiter = RateLimiter(bucket_factory=lambda: bucket)
+
+        limiter.needs_retry(event_name="needs-retry.ssm.GetParameter", response=None, attempts=1,
+                            caught_exception=Exception("connection reset"))
+
+        bucket.on_success.assert_not_called()
+        bucket.on_throttle.assert_not_called()
+
+    def test_register_hooks_into_client_events(self):
+        client = Mock()
+        limiter = RateLimiter()
+
+        limiter.register(client)
+
+        client.meta.events.register.assert_any_call('before-send', limiter.before_send)
+        client.meta.events.register.assert_any_call('needs-retry', limiter.needs_retry)
+
+    @patch('botocore.endpoint.time')
+    def test_rate_limits_and_shrinks_rate_on_each_attempt_of_botocore_retries(self, _):
+        server = ThrottlingCloudFormationServer(throttled_requests=2)
+        self.addCleanup(server.stop)
+        server.start()
+
+        client = boto3.client('cloudformation', region_name='eu-west-1', endpoint_url=server.url,
+                              aws_access_key_id='key', aws_secret_access_key='secret')
+        bucket = AdaptiveTokenBucket(rate=20, maximum_rate=20)
+        limiter = RateLimiter(bucket_factory=Mock(return_value=bucket))
+        limiter.register(client)
+
+        client.describe_stacks()
+
+        self.assertEqual(3, server.requests)
+        self.assertEqual(5.5, bucket.rate)
+        limiter.bucket_factory.assert_called_once_with()
+
+
+class ThrottlingCloudFormationServer(object):
+    """
+    Local CloudFormation endpoint answering the first requests with a throttling error
+    """
+
+    THROTTLING_RESPONSE = (b'<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code>'
+                           b'<Message>Rate exceeded</Message></Error><RequestId>1</RequestId></ErrorResponse>')
+    SUCCESS_RESPONSE = (b'<DescribeStacksResponse><DescribeStacksResult><Stacks/></DescribeStacksResult>'
+                        b'<ResponseMetadata><RequestId>2</RequestId></ResponseMetadata></DescribeStacksResponse>')
+
+    def __init__(self, throttled_requests):
+        self.throttled_requests = throttled_requests
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                server.requests += 1
+
+                if server.requests <= server.throttled_requests:
+                    status, body = 400, server.THROTTLING_RESPONSE
+                else:
+                    status, body = 200, server.SUCCESS_RESPONSE
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}'.format(self.httpd.server_port)
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
@@ -0,0 +1,67 @@
+try:
+    from unittest import TestCase
+    from mock import patch
+except ImportError:
+    from unittest import TestCase
+    from mock import patch
+
+import os
+import shutil
+import stat
+import tempfile
+import time
+
+from cfn_sphere.cache import DiskCache
+from cfn_sphere.exceptions import CfnSphereException
+
+
+class DiskCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_returns_value_set_before(self):
+        cache = DiskCache(60, directory=self.directory)
+        cache.set("kms", "key", {"foo": "bar"})
+
+        self.assertEqual({"foo": "bar"}, cache.get("kms", "key"))
+
+    def test_get_returns_value_set_by_another_instance(self):
+        DiskCache(60, directory=self.directory).set("kms", "key", "value")
+
+        self.assertEqual("value", DiskCache(60, directory=self.directory).get("kms", "key"))
+
+    def test_get_returns_none_for_unknown_keys(self):
+        cache = DiskCache(60, directory=self.directory)
+        cache.set("kms", "key", "value")
+
+        self.assertIsNone(cache.get("kms", "other-key"))
+        self.assertIsNone(cache.get("ami", "key"))
+
+    def test_get_returns_none_for_expired_values(self):
+        cache = DiskCache(60, directory=self.directory)
+        cache.set("kms", "key", "value")
+
+        with patch('cryptography.fernet.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get("kms", "key"))
+
+    def test_set_stores_values_encrypted(self):
+        cache = DiskCache(60, directory=self.directory)
+        cache.set("kms", "key", "my-secret-value")
+
+        for file_name in os.listdir(self.directory):
+            with open(os.path.join(self.directory, file_name), "rb") as f:
+                self.assertNotIn(b"my-secret-value", f.read())
+
+    def test_key_file_is_only_readable_by_owner(self):
+        DiskCache(60, directory=self.directory)
+
+        mode = os.stat(os.path.join(self.directory, "cache.key")).st_mode
+        self.assertEqual(0, mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+    @patch('cfn_sphere.cache.Fernet', None)
+    def test_init_raises_exception_without_cryptography_package(self):
+        with self.assertRaises(CfnSphereException):
+            DiskCache(60, directory=self.directory)
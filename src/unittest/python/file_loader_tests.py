@@ -10,7 +10,7 @@ except ImportError:
 from yaml.scanner import ScannerError
 
 from cfn_sphere.exceptions import TemplateErrorException, CfnSphereException, CfnSphereBotoError
-from cfn_sphere.file_loader import FileLoader
+from cfn_sphere.file_loader import FileLoader, CfnYamlLoader
 
 
 class FileLoaderTests(TestCase):
@@ -78,12 +78,7 @@ class FileLoaderTests(TestCase):
         get_file_mock.return_value = get_file_return_value
 
         FileLoader.get_yaml_or_json_file('foo.yaml', 'baa')
-        if hasattr(yaml_mock, 'FullLoader'):
-            loader = yaml_mock.FullLoader
-        else:
-            loader = yaml_mock.Loader
-
-        yaml_mock.load.assert_called_once_with(get_file_return_value, Loader=loader)
+        yaml_mock.load.assert_called_once_with(get_file_return_value, Loader=CfnYamlLoader)
 
     @patch("cfn_sphere.file_loader.yaml")
     @patch("cfn_sphere.file_loader.FileLoader.get_file")
@@ -92,12 +87,7 @@ class FileLoaderTests(TestCase):
         get_file_mock.return_value = get_file_return_value
 
         FileLoader.get_yaml_or_json_file('foo.yml', 'baa')
-        if hasattr(yaml_mock, 'FullLoader'):
-            loader = yaml_mock.FullLoader
-        else:
-            loader = yaml_mock.Loader
-
-        yaml_mock.load.assert_called_once_with(get_file_return_value, Loader=loader)
+        yaml_mock.load.assert_called_once_with(get_file_return_value, Loader=CfnYamlLoader)
 
     @patch("cfn_sphere.file_loader.FileLoader.get_file")
     def test_get_yaml_or_json_file_raises_exception_invalid_file_extension(self, _):
@@ -144,6 +134,34 @@ class FileLoaderTests(TestCase):
         result = FileLoader.get_yaml_or_json_file("my-template.yaml", None)
         self.assertEqual({"myKey": {"Fn::Join": ["b", [{"Ref": "a"}, {"Ref": "b"}]]}}, result)
 
+    @patch("cfn_sphere.file_loader.yaml.add_multi_constructor")
+    @patch("cfn_sphere.file_loader.FileLoader.get_file")
+    def test_get_yaml_or_json_file_does_not_register_constructors_per_load(self, get_file_mock,
+                                                                           add_multi_constructor_mock):
+        get_file_mock.return_value = "myKey: !Ref myResource"
+
+        FileLoader.get_yaml_or_json_file("my-template.yaml", None)
+        FileLoader.get_yaml_or_json_file("my-template.yaml", None)
+
+        add_multi_constructor_mock.assert_not_called()
+
+    @patch("cfn_sphere.file_loader.FileLoader.get_file")
+    def test_get_yaml_or_json_file_does_not_construct_python_objects(self, get_file_mock):
+        get_file_mock.return_value = "myKey: !!python/object/apply:os.getcwd []"
+
+        with self.assertRaises(CfnSphereException):
+            FileLoader.get_yaml_or_json_file("my-template.yaml", None)
+
+    def test_cfn_yaml_loader_is_based_on_libyaml_if_available(self):
+        if hasattr(yaml, 'CSafeLoader'):
+            self.assertTrue(issubclass(CfnYamlLoader, yaml.CSafeLoader))
+        else:
+            self.assertTrue(issubclass(CfnYamlLoader, yaml.SafeLoader))
+
+    def test_cfn_yaml_loader_does_not_register_constructors_on_default_loaders(self):
+        for loader in (yaml.SafeLoader, yaml.Loader):
+            self.assertNotIn(u"", loader.yaml_multi_constructors)
+
     @patch("cfn_sphere.file_loader.FileLoader._s3_get_file")
     def test_get_file_calls_correct_handler_for_s3_prefix(self, s3_get_file_mock):
         FileLoader.get_file("s3://foo/foo.yml", None)
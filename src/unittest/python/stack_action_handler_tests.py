@@ -5,10 +5,12 @@ except ImportError:
     from unittest import TestCase
     from mock import patch, Mock, call
 
+import networkx
 import six
 
 from cfn_sphere import StackActionHandler
 from cfn_sphere.aws.cfn import CloudFormationStack
+from cfn_sphere.exceptions import CfnStackActionFailedException
 
 
 class StackActionHandlerTests(TestCase):
@@ -76,3 +78,123 @@ class StackActionHandlerTests(TestCase):
 
         expected_calls = [call(stack_c), call(stack_a)]
         six.assertCountEqual(self, expected_calls, cfn_mock.return_value.delete_stack.mock_calls)
+
+    @patch('cfn_sphere.CloudFormation')
+    @patch('cfn_sphere.ParameterResolver')
+    @patch('cfn_sphere.DependencyResolver')
+    @patch('cfn_sphere.StackExecutor')
+    def test_create_or_update_stacks_uses_stack_executor_with_parallelism(self,
+                                                                          stack_executor_mock,
+                                                                          dependency_resolver_mock,
+                                                                          parameter_resolver_mock,
+                                                                          cfn_mock):
+        dependency_resolver_mock.return_value.get_stack_order.return_value = ['a', 'c']
+        graph = dependency_resolver_mock.return_value.create_stacks_directed_graph.return_value
+
+        handler = StackActionHandler(Mock(), parallelism=3)
+        handler.create_or_update_stacks()
+
+        stack_executor_mock.assert_called_once_with(graph, 3)
+        stack_executor_mock.return_value.run.assert_called_once_with(['a', 'c'], handler.create_or_update_stack)
+        stack_executor_mock.return_value.run.return_value.raise_on_failure.assert_called_once_with("sync")
+        cfn_mock.assert_called_once_with(region=handler.config.region, use_stack_snapshot=True,
+                                         use_stack_watcher=True)
+
+    @patch('cfn_sphere.CloudFormation')
+    @patch('cfn_sphere.ParameterResolver')
+    @patch('cfn_sphere.DependencyResolver')
+    @patch('cfn_sphere.StackExecutor')
+    def test_create_or_update_stacks_processes_stacks_serially_by_default(self,
+                                                                          stack_executor_mock,
+                                                                          dependency_resolver_mock,
+                                                                          parameter_resolver_mock,
+                                                                          cfn_mock):
+        dependency_resolver_mock.return_value.get_stack_order.return_value = ['a', 'c']
+
+        handler = StackActionHandler(Mock())
+        with patch.object(handler, 'create_or_update_stack') as create_or_update_stack_mock:
+            handler.create_or_update_stacks()
+
+        stack_executor_mock.assert_not_called()
+        self.assertEqual([call('a'), call('c')], create_or_update_stack_mock.mock_calls)
+        parameter_resolver_mock.return_value.prefetch.assert_called_once_with(handler.config.stacks)
+
+    @patch('cfn_sphere.CloudFormation')
+    @patch('cfn_sphere.ParameterResolver')
+    @patch('cfn_sphere.DependencyResolver')
+    def test_delete_stacks_with_parallelism_deletes_referenced_stacks_last(self,
+                                                                           dependency_resolver_mock,
+                                                                           parameter_resolver_mock,
+                                                                           cfn_mock):
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(['a', 'b', 'c'])
+        graph.add_edge('a', 'c')
+        graph.add_edge('b', 'c')
+
+        dependency_resolver_mock.return_value.get_stack_order.return_value = ['a', 'b', 'c']
+        dependency_resolver_mock.return_value.create_stacks_directed_graph.return_value = graph
+        cfn_mock.return_value.get_stack_names.return_value = ['a', 'b', 'c']
+
+        handler = StackActionHandler(Mock(), parallelism=3)
+        handler.delete_stacks()
+
+        deleted_stack_names = [c[1][0].name for c in cfn_mock.return_value.delete_stack.mock_calls]
+        self.assertEqual('c', deleted_stack_names[0])
+        six.assertCountEqual(self, ['a', 'b', 'c'], deleted_stack_names)
+
+    @patch('cfn_sphere.CloudFormation')
+    @patch('cfn_sphere.ParameterResolver')
+    @patch('cfn_sphere.DependencyResolver')
+    def test_delete_stacks_with_parallelism_continues_with_independent_stacks_on_failure(self,
+                                                                                         dependency_resolver_mock,
+                                                                                         parameter_resolver_mock,
+                                                                                         cfn_mock):
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(['a', 'b', 'c'])
+        graph.add_edge('a', 'c')
+
+        dependency_resolver_mock.return_value.get_stack_order.return_value = ['a', 'b', 'c']
+        dependency_resolver_mock.return_value.create_stacks_directed_graph.return_value = graph
+        cfn_mock.return_value.get_stack_names.return_value = ['a', 'b', 'c']
+
+        def delete_side_effect(stack):
+            if stack.name == 'c':
+                raise CfnStackActionFailedException("failed")
+
+        cfn_mock.return_value.delete_stack.side_effect = delete_side_effect
+
+        handler = StackActionHandler(Mock(), parallelism=2)
+        with self.assertRaises(CfnStackActionFailedException):
+            handler.delete_stacks()
+
+        deleted_stack_names = [c[1][0].name for c in cfn_mock.return_value.delete_stack.mock_calls]
+        six.assertCountEqual(self, ['b', 'c'], deleted_stack_names)
+
+    @patch('cfn_sphere.CloudFormation')
+    @patch('cfn_sphere.ParameterResolver')
+    @patch('cfn_sphere.TemplateHandler')
+    @patch('cfn_sphere.CloudFormationStack')
+    def test_create_or_update_stack_describes_stack_state_once(self,
+                                                               stack_mock,
+                                                               template_handler_mock,
+                                                               parameter_resolver_mock,
+                                                               cfn_mock):
+        stack_state = Mock()
+        stack_state.exists = True
+        cfn_mock.return_value.describe_stack_state.return_value = stack_state
+
+        config = Mock()
+        config.stacks.get.return_value.stack_policy_url = None
+        config.cli_tags = {}
+        config.stacks.get.return_value.tags = {}
+
+        handler = StackActionHandler(config)
+        handler.create_or_update_stack('a')
+
+        cfn_mock.return_value.describe_stack_state.assert_called_once_with('a')
+        parameter_resolver_mock.return_value.resolve_parameter_values.assert_called_once_with(
+            'a', config.stacks.get.return_value, config.cli_params, stack_state=stack_state)
+        cfn_mock.return_value.validate_stack_is_ready_for_action.assert_called_once_with(stack_mock.return_value,
+                                                                                         stack_state)
+        cfn_mock.return_value.update_stack.assert_called_once_with(stack_mock.return_value)
+        cfn_mock.return_value.create_stack.assert_not_called()
@@ -165,6 +165,25 @@ class ConfigTests(TestCase):
         )
         self.assertTrue(isinstance(config.stacks["any-stack"].timeout, int))
 
+    def test_default_artifact_bucket_is_overwritten_by_stack_config(self):
+        config = Config(config_dict={'region': 'eu-west-1',
+                                     'artifact-bucket': 'default-bucket',
+                                     'stacks': {'any-stack': {'template-url': 'foo.json'},
+                                                'other-stack': {'template-url': 'foo.json',
+                                                                'artifact-bucket': 'other-bucket'}}})
+        self.assertEqual('default-bucket', config.stacks["any-stack"].artifact_bucket)
+        self.assertEqual('other-bucket', config.stacks["other-stack"].artifact_bucket)
+
+    def test_a_stacks_expected_duration_is_parsed(self):
+        config = Config(config_dict={'region': 'eu-west-1',
+                                     'stacks': {'any-stack': {'template-url': 'foo.json', 'expected-duration': 900}}})
+        self.assertEqual(900, config.stacks["any-stack"].expected_duration)
+
+    def test_a_stacks_expected_duration_must_be_an_int(self):
+        with self.assertRaises(InvalidConfigException):
+            Config(config_dict={'region': 'eu-west-1',
+                                'stacks': {'any-stack': {'template-url': 'foo.json', 'expected-duration': '15m'}}})
+
     def test_validate_raises_exception_on_invalid_service_role_value(self):
         with self.assertRaises(InvalidConfigException):
             Config._validate(config_dict={'region': 'eu-west-1',
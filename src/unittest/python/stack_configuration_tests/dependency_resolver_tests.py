@@ -30,6 +30,17 @@ class DependencyResolverTests(TestCase):
     def test_is_parameter_reference_returns_true_on_empty_reference(self):
         self.assertTrue(DependencyResolver.is_parameter_reference('|ref|'))
 
+    def test_is_parameter_reference_returns_false_for_region_qualified_reference(self):
+        self.assertFalse(DependencyResolver.is_parameter_reference('|ref|us-east-1:vpc.id'))
+        self.assertTrue(DependencyResolver.is_cross_region_reference('|ref|us-east-1:vpc.id'))
+        self.assertFalse(DependencyResolver.is_cross_region_reference('|ref|vpc.id'))
+
+    def test_get_stack_order_ignores_region_qualified_references(self):
+        stacks = {'app': StackConfig({'template-url': 'horst.yml', 'parameters': {'a': '|Ref|us-east-1:vpc.id'}}),
+                  'vpc': StackConfig({'template-url': 'horst.yml', 'parameters': {'a': '|Ref|app.id'}})}
+
+        self.assertEqual(['app', 'vpc'], list(DependencyResolver.get_stack_order(stacks)))
+
     def test_get_stack_order_returns_a_valid_order(self):
         stacks = {'default-sg': StackConfig({'template-url': 'horst.yml', 'parameters': {'a': '|Ref|vpc.id'}}),
                   'app1': StackConfig(
@@ -121,6 +132,15 @@ class DependencyResolverTests(TestCase):
     def test_parse_stack_reference_value_returns_stack_and_output_name_tuple(self):
         self.assertEqual(('stack', 'output'), DependencyResolver.parse_stack_reference_value('|ref|stack.output'))
 
+    def test_parse_stack_reference_returns_region_of_qualified_reference(self):
+        self.assertEqual(('stack', 'output', 'us-east-1'),
+                         DependencyResolver.parse_stack_reference('|ref|us-east-1:stack.output'))
+        self.assertEqual(('stack', 'output', None), DependencyResolver.parse_stack_reference('|ref|stack.output'))
+
+    def test_parse_stack_reference_raises_exception_on_empty_region(self):
+        with self.assertRaises(CfnSphereException):
+            DependencyResolver.parse_stack_reference('|ref|:stack.output')
+
     def test_parse_stack_reference_raises_exception_on_missing_dot(self):
         with self.assertRaises(CfnSphereException):
             DependencyResolver.parse_stack_reference_value('|ref|foo')
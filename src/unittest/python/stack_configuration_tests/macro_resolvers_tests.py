@@ -0,0 +1,222 @@
+try:
+    from unittest import TestCase
+    from mock import Mock, patch
+except ImportError:
+    from unittest import TestCase
+    from mock import Mock, patch
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import jmespath
+
+from cfn_sphere.exceptions import CfnSphereException, CfnSphereBotoError
+from cfn_sphere.stack_configuration.macro_resolvers import SsmResolver, KmsResolver, ImageResolver, FileResolver, \
+    SecretResolver, ImportResolver
+from cfn_sphere.stack_configuration.resolution_plan import Macro
+from cfn_sphere.file_loader import FileLoader
+
+
+class SsmResolverTests(TestCase):
+    def test_resolve_many_fetches_paths_before_batching_remaining_names(self):
+        backends = Mock()
+        backends.ssm.get_parameters_by_path.return_value = {'/app/a': 'a'}
+        backends.ssm.get_parameters.return_value = {'/b': 'b', '/c': 'c'}
+        macros = [Macro.parse(value) for value in ['|ssm|/app/a', '|ssm|/b', '|ssm|/c', '|ssmpath|/app']]
+
+        result = SsmResolver(backends).resolve_many(macros)
+
+        self.assertEqual({('ssm', ('/app/a',)): 'a', ('ssm', ('/b',)): 'b', ('ssm', ('/c',)): 'c',
+                          ('ssmpath', ('/app',)): 'a'}, result)
+        backends.ssm.get_parameters.assert_called_once_with({'/b', '/c'})
+        backends.ssm.get_parameter.assert_not_called()
+
+    def test_resolve_many_gets_names_one_by_one_if_batch_fails(self):
+        backends = Mock()
+        backends.ssm.get_parameters.side_effect = CfnSphereBotoError(Exception("AccessDenied"))
+        backends.ssm.get_parameter.side_effect = lambda name: name.upper()
+
+        result = SsmResolver(backends).resolve_many([Macro.parse('|ssm|/a'), Macro.parse('|ssm|/b')])
+
+        self.assertEqual({('ssm', ('/a',)): '/A', ('ssm', ('/b',)): '/B'}, result)
+
+    def test_resolve_raises_exception_for_missing_parameter_below_fetched_path(self):
+        backends = Mock()
+        backends.ssm.get_parameters_by_path.return_value = {}
+        resolver = SsmResolver(backends)
+        resolver.fetch_path('/app')
+
+        with self.assertRaises(CfnSphereException):
+            resolver.resolve(Macro.parse('|ssm|/app/a'))
+
+    def test_resolve_many_is_safe_to_use_concurrently(self):
+        backends = Mock()
+        backends.ssm.get_parameters_by_path.side_effect = lambda path: {path + 'a': path}
+        backends.ssm.get_parameter.side_effect = lambda name: name.upper()
+        resolver = SsmResolver(backends)
+        macros = [[Macro.parse('|ssmpath|/path{0}'.format(i)), Macro.parse('|ssm|/path{0}/a'.format(i)),
+                   Macro.parse('|ssm|/other{0}'.format(i))] for i in range(50)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(resolver.resolve_many, macros))
+
+        for i, result in enumerate(results):
+            self.assertEqual({('ssmpath', ('/path{0}'.format(i),)): '/path{0}/'.format(i),
+                              ('ssm', ('/path{0}/a'.format(i),)): '/path{0}/'.format(i),
+                              ('ssm', ('/other{0}'.format(i),)): '/OTHER{0}'.format(i)}, result)
+
+    def test_resolve_gets_parameter_with_selector_below_fetched_path(self):
+        backends = Mock()
+        backends.ssm.get_parameters_by_path.return_value = {'/app/db/password': 'current'}
+        backends.ssm.get_parameter.return_value = 'second'
+
+        result = SsmResolver(backends).resolve_many([Macro.parse('|ssmpath|/app'),
+                                                     Macro.parse('|ssm|/app/db/password:2')])
+
+        self.assertEqual('second', result[('ssm', ('/app/db/password:2',))])
+        backends.ssm.get_parameter.assert_called_once_with('/app/db/password:2')
+
+    def test_resolve_many_batches_parameters_with_selector_below_fetched_path(self):
+        backends = Mock()
+        backends.ssm.get_parameters_by_path.return_value = {'/app/a': 'a'}
+        backends.ssm.get_parameters.return_value = {'/app/a:1': 'a1', '/app/a:prod': 'a-prod'}
+        macros = [Macro.parse(value) for value in ['|ssmpath|/app', '|ssm|/app/a', '|ssm|/app/a:1',
+                                                   '|ssm|/app/a:prod']]
+
+        result = SsmResolver(backends).resolve_many(macros)
+
+        self.assertEqual('a', result[('ssm', ('/app/a',))])
+        self.assertEqual('a1', result[('ssm', ('/app/a:1',))])
+        self.assertEqual('a-prod', result[('ssm', ('/app/a:prod',))])
+        self.assertEqual('a', result[('ssmpath', ('/app',))])
+        backends.ssm.get_parameters.assert_called_once_with({'/app/a:1', '/app/a:prod'})
+
+
+class KmsResolverTests(TestCase):
+    def test_resolve_many_decrypts_values_concurrently(self):
+        backends = Mock()
+        backends.kms.decrypt.side_effect = lambda ciphertext, encryption_context=None: ciphertext.upper()
+
+        result = KmsResolver(backends).resolve_many([Macro.parse('|kms|a'), Macro.parse('|kms|k=v|b')])
+
+        self.assertEqual({('kms', ('a', None)): 'A', ('kms', ('b', (('k', 'v'),))): 'B'}, result)
+        self.assertEqual([('a', {}), ('b', {'k': 'v'})], list(backends.kms.decrypt_many.call_args[0][0]))
+
+
+class ImageResolverTests(TestCase):
+    def test_resolve_many_looks_up_latest_images(self):
+        backends = Mock()
+        backends.ec2.get_latest_taupage_image_id.return_value = 'ami-1'
+        backends.ec2.get_latest_image_id_by_name.return_value = 'ami-2'
+
+        result = ImageResolver(backends).resolve_many([Macro.parse('|latesttaupageami|'),
+                                                       Macro.parse('|latestami|my-*')])
+
+        self.assertEqual({('latesttaupageami', ()): 'ami-1', ('latestami', ('my-*',)): 'ami-2'}, result)
+        backends.ec2.get_latest_image_id_by_name.assert_called_once_with('my-*')
+
+
+class ImportResolverTests(TestCase):
+    def test_resolve_many_returns_export_values(self):
+        backends = Mock()
+        backends.cfn.get_exports.return_value = {'vpc-id': 'vpc-1', 'subnet-id': 'subnet-1'}
+
+        result = ImportResolver(backends).resolve_many([Macro.parse('|import|vpc-id'),
+                                                        Macro.parse('|Import|subnet-id')])
+
+        self.assertEqual({('import', ('vpc-id',)): 'vpc-1', ('import', ('subnet-id',)): 'subnet-1'}, result)
+        backends.cfn.get_exports.assert_called_once_with()
+
+    def test_resolve_raises_exception_for_missing_export(self):
+        backends = Mock()
+        backends.cfn.get_exports.return_value = {}
+
+        with self.assertRaises(CfnSphereException):
+            ImportResolver(backends).resolve(Macro.parse('|import|vpc-id'))
+
+
+class SecretResolverTests(TestCase):
+    def test_resolve_many_fetches_distinct_secrets_once(self):
+        backends = Mock()
+        backends.secretsmanager.get_secret_values.return_value = {'db': '{"user": "u", "port": 5432}', 'token': 't'}
+        macros = [Macro.parse(value) for value in ['|secret|db|user', '|secret|db|port', '|secret|token']]
+        resolver = SecretResolver(backends)
+
+        result = resolver.resolve_many(macros)
+
+        self.assertEqual({('secret', ('db', 'user')): 'u', ('secret', ('db', 'port')): '5432',
+                          ('secret', ('token',)): 't'}, result)
+        backends.secretsmanager.get_secret_values.assert_called_once_with({'db', 'token'})
+
+        self.assertEqual('t', resolver.resolve(Macro.parse('|secret|token')))
+        backends.secretsmanager.get_secret_value.assert_not_called()
+
+    def test_resolve_gets_single_secret(self):
+        backends = Mock()
+        backends.secretsmanager.get_secret_value.return_value = 'value'
+
+        self.assertEqual('value', SecretResolver(backends).resolve(Macro.parse('|secret|my-secret')))
+        backends.secretsmanager.get_secret_value.assert_called_once_with('my-secret')
+
+    def test_resolve_raises_exception_for_missing_json_key(self):
+        backends = Mock()
+        backends.secretsmanager.get_secret_value.return_value = 'no json'
+
+        with self.assertRaises(CfnSphereException):
+            SecretResolver(backends).resolve(Macro.parse('|secret|my-secret|key'))
+
+
+class FileResolverTests(TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.working_dir, 'env.json'), 'w') as f:
+            f.write('{"a": 1, "b": {"c": 2}}')
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.jmespath.compile', wraps=jmespath.compile)
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file',
+           wraps=FileLoader.get_yaml_or_json_file)
+    def test_resolve_many_parses_file_once_for_many_patterns(self, get_yaml_or_json_file_mock, compile_mock):
+        macros = [Macro.parse(value, self.working_dir)
+                  for value in ['|file|env.json|a', '|file|env.json|b.c', '|File|env.json|a']]
+
+        result = FileResolver().resolve_many(macros)
+
+        self.assertEqual({('file', (self.working_dir, 'env.json', 'a')): 1,
+                          ('file', (self.working_dir, 'env.json', 'b.c')): 2}, result)
+        get_yaml_or_json_file_mock.assert_called_once_with('env.json', self.working_dir)
+        self.assertEqual(2, compile_mock.call_count)
+
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file',
+           wraps=FileLoader.get_yaml_or_json_file)
+    def test_resolve_parses_file_again_once_modified(self, get_yaml_or_json_file_mock):
+        resolver = FileResolver()
+        macro = Macro.parse('|file|env.json|a', self.working_dir)
+        resolver.resolve(macro)
+
+        path = os.path.join(self.working_dir, 'env.json')
+        with open(path, 'w') as f:
+            f.write('{"a": 3}')
+        os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10))
+
+        self.assertEqual(3, resolver.resolve(macro))
+        self.assertEqual(2, get_yaml_or_json_file_mock.call_count)
+
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_file')
+    def test_resolve_loads_each_file_once(self, get_file_mock):
+        get_file_mock.return_value = 'content'
+        resolver = FileResolver()
+
+        self.assertEqual('content', resolver.resolve(Macro.parse('|file|a.txt', 'dir')))
+        self.assertEqual('content', resolver.resolve(Macro.parse('|File|a.txt', 'dir')))
+        get_file_mock.assert_called_once_with('a.txt', 'dir')
+
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file')
+    def test_resolve_applies_pattern(self, get_yaml_or_json_file_mock):
+        get_yaml_or_json_file_mock.return_value = {'a': [1, 2]}
+
+        self.assertEqual([1, 2], FileResolver().resolve(Macro.parse('|file|a.json|a', 'dir')))
@@ -5,8 +5,12 @@ except ImportError:
     from unittest import TestCase
     from mock import patch, Mock
 
+import six
+
 from cfn_sphere.exceptions import CfnSphereException, CfnSphereBotoError
 from cfn_sphere.stack_configuration.parameter_resolver import ParameterResolver
+from cfn_sphere.stack_configuration.resolution_plan import Macro
+from cfn_sphere.aws.cfn import StackState
 
 
 class ParameterResolverTests(TestCase):
@@ -26,6 +30,13 @@ class ParameterResolverTests(TestCase):
         self.kms_patcher.stop()
         self.ssm_patcher.stop()
 
+    @staticmethod
+    def resolve_value(value, resolver=None):
+        stack_config = Mock()
+        stack_config.parameters = {'foo': value}
+        stack_config.working_dir = None
+        return (resolver or ParameterResolver()).resolve_parameter_values('my-stack', stack_config)['foo']
+
     def test_convert_list_to_string_returns_valid_string(self):
         list = ['a', 'b', 'c']
         self.assertEqual("a,b,c", ParameterResolver.convert_list_to_string(list))
@@ -106,46 +117,165 @@ class ParameterResolverTests(TestCase):
         result = ParameterResolver().resolve_parameter_values('foo', stack_config)
         self.assertEqual({'foo': '5.555'}, result)
 
+    def test_resolve_parameter_values_uses_given_cloudformation_instance(self):
+        cfn = Mock()
+        cfn.get_stacks_outputs.return_value = {'stack': {'output': 'bar'}}
+
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|Ref|stack.output'}
+
+        result = ParameterResolver(cfn=cfn).resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'bar'}, result)
+        self.cfn_mock.assert_not_called()
+
+    def test_resolve_parameter_values_gets_outputs_of_referenced_stacks_only(self):
+        self.cfn_mock.return_value.get_stacks_outputs.return_value = {'stack1': {'o': '1'}, 'stack2': {'o': '2'}}
+
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|Ref|stack1.o', 'bar': ['|ref|stack2.o', '|ref|stack1.o'], 'baz': 'x'}
+
+        result = ParameterResolver().resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': '1', 'bar': '2,1', 'baz': 'x'}, result)
+        self.cfn_mock.return_value.get_stacks_outputs.assert_called_once_with({'stack1', 'stack2'})
+
+    def test_resolve_parameter_values_does_not_get_outputs_without_references(self):
+        stack_config = Mock()
+        stack_config.parameters = {'foo': 'bar'}
+
+        ParameterResolver().resolve_parameter_values('foo', stack_config)
+
+        self.cfn_mock.return_value.get_stacks_outputs.assert_not_called()
+
+    def test_resolve_parameter_values_returns_cross_region_ref_value(self):
+        local_cfn, regional_cfn = Mock(), Mock()
+        self.cfn_mock.side_effect = lambda region, **kwargs: regional_cfn
+        local_cfn.get_stacks_outputs.return_value = {'vpc': {'id': 'local-vpc'}}
+        regional_cfn.get_stacks_outputs.return_value = {'vpc': {'id': 'remote-vpc'}}
+
+        stack_config = Mock()
+        stack_config.parameters = {'local': '|ref|vpc.id', 'remote': '|ref|us-east-1:vpc.id'}
+
+        result = ParameterResolver(cfn=local_cfn).resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'local': 'local-vpc', 'remote': 'remote-vpc'}, result)
+        self.cfn_mock.assert_called_once_with(region='us-east-1', use_stack_snapshot=True)
+        local_cfn.get_stacks_outputs.assert_called_once_with({'vpc'})
+
+    def test_resolve_parameter_values_uses_main_cloudformation_for_own_region(self):
+        local_cfn = Mock()
+        local_cfn.get_stacks_outputs.return_value = {'vpc': {'id': 'local-vpc'}}
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ref|eu-west-1:vpc.id'}
+
+        result = ParameterResolver(region='eu-west-1', cfn=local_cfn).resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'local-vpc'}, result)
+        self.cfn_mock.assert_not_called()
+
+    def test_prefetch_fetches_cross_region_outputs_once_per_region(self):
+        regional_cfn = {}
+        self.cfn_mock.side_effect = lambda region, **kwargs: regional_cfn.setdefault(region, Mock())
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|ref|us-east-1:vpc.id', 'bar': '|ref|us-east-1:db.host'}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|ref|us-east-1:vpc.id', 'bar': '|ref|eu-central-1:vpc.id'}
+
+        resolver = ParameterResolver(cfn=Mock())
+        resolver.prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        regional_cfn['us-east-1'].get_stacks_outputs.assert_called_once_with({'vpc', 'db'})
+        regional_cfn['eu-central-1'].get_stacks_outputs.assert_called_once_with({'vpc'})
+        self.assertEqual(2, self.cfn_mock.call_count)
+
+    def test_resolve_parameter_values_returns_import_value(self):
+        cfn = Mock()
+        cfn.get_exports.return_value = {'vpc-id': 'vpc-1'}
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|import|vpc-id', 'bar': ['|import|vpc-id']}
+
+        result = ParameterResolver(cfn=cfn).resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'vpc-1', 'bar': 'vpc-1'}, result)
+
     def test_get_latest_value_returns_stacks_actual_value(self):
-        self.cfn_mock.return_value.get_stack_parameters_dict.return_value = {'my-key': 'my-actual-value'}
+        self.cfn_mock.return_value.describe_stack_state.return_value = StackState(
+            'my-stack', {'Parameters': [{'ParameterKey': 'my-key', 'ParameterValue': 'my-actual-value'}]})
 
         pr = ParameterResolver()
         result = pr.get_latest_value('my-key', '|keepOrUse|default-value', 'my-stack')
 
-        self.cfn_mock.return_value.get_stack_parameters_dict.assert_called_once_with('my-stack')
+        self.cfn_mock.return_value.describe_stack_state.assert_called_once_with('my-stack')
         self.assertEqual('my-actual-value', result)
 
     def test_get_latest_value_returns_default_value_called_once_with_stack(self):
-        self.cfn_mock.return_value.get_stack_parameters_dict.return_value = {'not-my-key': 'my-actual-value'}
+        self.cfn_mock.return_value.describe_stack_state.return_value = StackState(
+            'my-stack', {'Parameters': [{'ParameterKey': 'not-my-key', 'ParameterValue': 'my-actual-value'}]})
 
         pr = ParameterResolver()
         result = pr.get_latest_value('my-key', '|keepOrUse|default-value', 'my-stack')
 
-        self.cfn_mock.return_value.get_stack_parameters_dict.assert_called_once_with('my-stack')
+        self.cfn_mock.return_value.describe_stack_state.assert_called_once_with('my-stack')
         self.assertEqual('default-value', result)
 
+    def test_get_latest_value_returns_default_value_for_missing_stack(self):
+        result = ParameterResolver().get_latest_value('my-key', '|keepOrUse|default-value', 'my-stack',
+                                                      StackState('my-stack'))
+
+        self.assertEqual('default-value', result)
+        self.cfn_mock.return_value.describe_stack_state.assert_not_called()
+
+    def test_resolve_parameter_values_describes_stack_once_for_all_keep_values(self):
+        self.cfn_mock.return_value.describe_stack_state.return_value = StackState(
+            'my-stack', {'Parameters': [{'ParameterKey': 'a', 'ParameterValue': 'actual-a'}]})
+
+        stack_config = Mock()
+        stack_config.parameters = {'a': '|keepOrUse|default-a', 'b': '|keepOrUse|default-b',
+                                   'c': ['|keepOrUse|default-c']}
+
+        result = ParameterResolver().resolve_parameter_values('my-stack', stack_config)
+
+        self.assertEqual({'a': 'actual-a', 'b': 'default-b', 'c': 'default-c'}, result)
+        self.cfn_mock.return_value.describe_stack_state.assert_called_once_with('my-stack')
+
+    def test_resolve_parameter_values_uses_given_stack_state_for_keep_values(self):
+        stack_state = StackState('my-stack', {'Parameters': [{'ParameterKey': 'a', 'ParameterValue': 'actual-a'}]})
+
+        stack_config = Mock()
+        stack_config.parameters = {'a': '|keepOrUse|default-a'}
+
+        result = ParameterResolver().resolve_parameter_values('my-stack', stack_config, stack_state=stack_state)
+
+        self.assertEqual({'a': 'actual-a'}, result)
+        self.cfn_mock.return_value.describe_stack_state.assert_not_called()
+
+    def test_resolve_parameter_values_does_not_describe_stack_without_keep_values(self):
+        stack_config = Mock()
+        stack_config.parameters = {'a': 'foo'}
+
+        ParameterResolver().resolve_parameter_values('my-stack', stack_config)
+
+        self.cfn_mock.return_value.describe_stack_state.assert_not_called()
+
     def test_get_latest_value_raises_exception_on_error(self):
-        self.cfn_mock.return_value.get_stack_parameters_dict.side_effect = CfnSphereBotoError(Exception("foo"))
+        self.cfn_mock.return_value.describe_stack_state.side_effect = CfnSphereBotoError(Exception("foo"))
 
         resolver = ParameterResolver()
         with self.assertRaises(CfnSphereException):
             resolver.get_latest_value('my-key', '|keepOrUse|default-value', 'my-stack')
 
-    def test_is_keep_value_returns_true_for_keep_keyword(self):
-        result = ParameterResolver.is_keep_value('|keeporuse|')
-        self.assertTrue(result)
+    def test_keep_keyword_is_parsed_as_keep_macro(self):
+        self.assertEqual(Macro.KEEP, Macro.parse('|keeporuse|').kind)
 
-    def test_is_keep_value_returns_true_for_uppercase_keep_keyword(self):
-        result = ParameterResolver.is_keep_value('|KEEPORUSE|')
-        self.assertTrue(result)
+    def test_uppercase_keep_keyword_is_parsed_as_keep_macro(self):
+        self.assertEqual(Macro.KEEP, Macro.parse('|KEEPORUSE|').kind)
 
-    def test_is_keep_value_returns_true_for_mixed_case_keep_keyword(self):
-        result = ParameterResolver.is_keep_value('|keepOrUse|')
-        self.assertTrue(result)
+    def test_mixed_case_keep_keyword_is_parsed_as_keep_macro(self):
+        self.assertEqual(Macro.KEEP, Macro.parse('|keepOrUse|').kind)
 
-    def test_is_keep_value_returns_false_for_empty_value(self):
-        result = ParameterResolver.is_keep_value('')
-        self.assertFalse(result)
+    def test_empty_value_is_not_parsed_as_keep_macro(self):
+        self.assertEqual(Macro.LITERAL, Macro.parse('').kind)
 
     def test_get_default_from_keep_value_returns_proper_string(self):
         result = ParameterResolver.get_default_from_keep_value('|keepOrUse|foo')
@@ -159,9 +289,9 @@ class ParameterResolverTests(TestCase):
         result = ParameterResolver.get_default_from_keep_value('|keepOrUse|')
         self.assertEqual('', result)
 
-    def test_handle_ssm_value_raises_exception_on_invalid_value_format(self):
+    def test_resolve_parameter_values_raises_exception_on_invalid_ssm_value_format(self):
         with self.assertRaises(CfnSphereException):
-            ParameterResolver().handle_ssm_value('|ssm|/test/|invalid')
+            self.resolve_value('|ssm|/test/|invalid')
 
     def test_resolve_parameter_values_returns_ssm_value(self):
         self.ssm_mock.return_value.get_parameter.return_value = "decryptedValue"
@@ -181,23 +311,284 @@ class ParameterResolverTests(TestCase):
         result = ParameterResolver().resolve_parameter_values('foo', stack_config)
         self.assertEqual(result, {'foo': 'decryptedValue'})
 
-    def test_handle_kms_value_handles_encryption_context_if_set(self):
+    def test_init_does_not_create_aws_backends(self):
+        ParameterResolver()
+
+        self.cfn_mock.assert_not_called()
+        self.ec2api_mock.assert_not_called()
+        self.kms_mock.assert_not_called()
+        self.ssm_mock.assert_not_called()
+
+    def test_resolve_parameter_values_creates_only_used_backends_once(self):
+        self.ssm_mock.return_value.get_parameter.return_value = "decryptedValue"
+
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ssm|/path/to/my/key', 'bar': '|ssm|/path/to/other/key', 'baz': 'plain'}
+
+        ParameterResolver(region='eu-central-1').resolve_parameter_values('foo', stack_config)
+
+        self.ssm_mock.assert_called_once_with('eu-central-1')
+        self.ec2api_mock.assert_not_called()
+        self.kms_mock.assert_not_called()
+
+    def test_resolve_parameter_values_returns_ssm_path_values_ordered_by_name(self):
+        self.ssm_mock.return_value.get_parameters_by_path.return_value = {'/app/b': 'valueB', '/app/a': 'valueA',
+                                                                          '/app/sub/c': 'valueC'}
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ssmpath|/app/'}
+
+        result = ParameterResolver().resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'valueA,valueB,valueC'}, result)
+        self.ssm_mock.return_value.get_parameters_by_path.assert_called_once_with('/app/')
+
+    def test_resolve_parameter_values_answers_ssm_values_below_fetched_path_locally(self):
+        self.ssm_mock.return_value.get_parameters_by_path.return_value = {'/app/a': 'valueA'}
+        stack_config = Mock()
+        stack_config.parameters = {'all': '|ssmpath|/app', 'foo': '|ssm|/app/a'}
+
+        result = ParameterResolver().resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'all': 'valueA', 'foo': 'valueA'}, result)
+        self.ssm_mock.return_value.get_parameter.assert_not_called()
+
+    def test_ssm_resolver_raises_exception_for_missing_parameter_below_fetched_path(self):
+        self.ssm_mock.return_value.get_parameters_by_path.return_value = {'/app/a': 'valueA'}
+        resolver = ParameterResolver()
+        resolver.resolvers[Macro.SSM_PATH].fetch_path('/app')
+
+        with self.assertRaises(CfnSphereException):
+            resolver.resolvers[Macro.SSM].resolve(Macro.parse('|ssm|/app/b'))
+        self.ssm_mock.return_value.get_parameter.assert_not_called()
+
+    def test_ssm_path_resolver_fetches_each_path_once(self):
+        self.ssm_mock.return_value.get_parameters_by_path.return_value = {}
+        ssm_path_resolver = ParameterResolver().resolvers[Macro.SSM_PATH]
+
+        ssm_path_resolver.fetch_path('/app')
+        ssm_path_resolver.fetch_path('/app/')
+        ssm_path_resolver.fetch_path('/app/sub')
+
+        self.ssm_mock.return_value.get_parameters_by_path.assert_called_once_with('/app/')
+
+    def test_prefetch_only_batches_names_not_below_prefetched_paths(self):
+        self.ssm_mock.return_value.get_parameters_by_path.return_value = {'/app/a': 'valueA'}
+        self.ssm_mock.return_value.get_parameters.return_value = {'/other': 'valueB', '/more': 'valueC'}
+        stack_config = Mock()
+        stack_config.parameters = {'all': '|ssmpath|/app', 'foo': '|ssm|/app/a', 'bar': '|ssm|/other',
+                                   'baz': '|ssm|/more'}
+
+        ParameterResolver().prefetch({'foo': stack_config})
+
+        self.ssm_mock.return_value.get_parameters.assert_called_once_with({'/other', '/more'})
+        self.ssm_mock.return_value.get_parameter.assert_not_called()
+
+    def test_resolve_parameter_values_raises_exception_on_invalid_ssm_path_value_format(self):
+        with self.assertRaises(CfnSphereException):
+            self.resolve_value('|ssmpath|/test/|invalid')
+
+    def test_resolve_parameter_values_serves_ssm_values_from_prefetched_parameters(self):
+        self.ssm_mock.return_value.get_parameters.return_value = {'/a': 'valueA', '/b': 'valueB'}
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ssm|/a', 'bar': '|ssm|/b'}
+
+        resolver = ParameterResolver()
+        resolver.prefetch({'foo': stack_config})
+        result = resolver.resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'valueA', 'bar': 'valueB'}, result)
+        self.ssm_mock.return_value.get_parameters.assert_called_once_with({'/a', '/b'})
+        self.ssm_mock.return_value.get_parameter.assert_not_called()
+
+    def test_resolve_parameter_values_gets_ssm_values_missing_in_prefetched_parameters(self):
+        self.ssm_mock.return_value.get_parameters.return_value = {'/a': 'valueA'}
+        self.ssm_mock.return_value.get_parameter.return_value = 'valueB'
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ssm|/a', 'bar': '|ssm|/b'}
+
+        resolver = ParameterResolver()
+        resolver.prefetch({'foo': stack_config})
+        result = resolver.resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'valueA', 'bar': 'valueB'}, result)
+        self.ssm_mock.return_value.get_parameter.assert_called_once_with('/b')
+
+    def test_prefetch_falls_back_to_single_lookups_on_error(self):
+        self.ssm_mock.return_value.get_parameters.side_effect = CfnSphereBotoError(Exception("AccessDenied"))
+        self.ssm_mock.return_value.get_parameter.return_value = 'valueA'
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|ssm|/a'}
+
+        resolver = ParameterResolver()
+        resolver.prefetch({'foo': stack_config})
+
+        self.assertEqual({'foo': 'valueA'}, resolver.resolve_parameter_values('foo', stack_config))
+
+    def test_prefetch_does_not_create_ssm_client_without_ssm_values(self):
+        stack_config = Mock()
+        stack_config.parameters = {'foo': 'bar'}
+
+        ParameterResolver().prefetch({'foo': stack_config})
+
+        self.ssm_mock.assert_not_called()
+
+    def test_prefetch_decrypts_distinct_kms_values_of_all_stacks(self):
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|kms|a', 'bar': ['|kms|k=v|b', 'plain']}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|kms|a'}
+
+        ParameterResolver().prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        values = list(self.kms_mock.return_value.decrypt_many.call_args[0][0])
+        six.assertCountEqual(self, [('a', {}), ('b', {'k': 'v'})], values)
+
+    def test_prefetch_does_not_create_kms_client_without_kms_values(self):
+        stack_config = Mock()
+        stack_config.parameters = {'foo': 'bar'}
+
+        ParameterResolver().prefetch({'foo': stack_config})
+
+        self.kms_mock.assert_not_called()
+
+    def test_prefetch_ignores_kms_decryption_errors(self):
+        self.kms_mock.return_value.decrypt_many.side_effect = CfnSphereException("AccessDenied")
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|kms|a'}
+
+        ParameterResolver().prefetch({'foo': stack_config})
+
+    def test_prefetch_raises_exception_on_invalid_macro_of_any_stack(self):
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': 'bar'}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'invalid': '|kms|a|b|c'}
+
+        with self.assertRaises(CfnSphereException):
+            ParameterResolver().prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+    def test_prefetch_looks_up_each_ami_name_pattern_once(self):
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|latestami|my-image-*', 'bar': '|latesttaupageami|'}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|latestAmi|my-image-*'}
+
+        ParameterResolver().prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        self.ec2api_mock.return_value.get_latest_image_id_by_name.assert_called_once_with('my-image-*')
+        self.ec2api_mock.return_value.get_latest_taupage_image_id.assert_called_once_with()
+
+    @patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_file')
+    def test_prefetch_loads_each_file_once_for_all_stacks(self, get_file_mock):
+        get_file_mock.return_value = 'content'
+        stack_config_a = Mock(working_dir='dir')
+        stack_config_a.parameters = {'foo': '|file|a.txt'}
+        stack_config_b = Mock(working_dir='dir')
+        stack_config_b.parameters = {'foo': '|file|a.txt', 'bar': ['|file|a.txt']}
+
+        resolver = ParameterResolver()
+        resolver.prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        self.assertEqual({'foo': 'content', 'bar': 'content'}, resolver.resolve_parameter_values('b', stack_config_b))
+        get_file_mock.assert_called_once_with('a.txt', 'dir')
+
+    def test_prefetch_does_not_create_aws_backends_without_macros(self):
+        stack_config = Mock()
+        stack_config.parameters = {'foo': 'bar', 'ref': '|ref|a.b', 'keep': '|keeporuse|x'}
+
+        ParameterResolver().prefetch({'foo': stack_config})
+
+        self.cfn_mock.assert_not_called()
+        self.ssm_mock.assert_not_called()
+        self.kms_mock.assert_not_called()
+        self.ec2api_mock.assert_not_called()
+
+    def test_register_resolver_resolves_further_macro_kinds(self):
+        resolver = Mock()
+        resolver.resolve.return_value = 'resolved'
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|Custom|a|b', 'bar': 'plain'}
+
+        parameter_resolver = ParameterResolver()
+        parameter_resolver.register_resolver('CUSTOM', resolver)
+        result = parameter_resolver.resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'resolved', 'bar': 'plain'}, result)
+        resolver.resolve.assert_called_once_with(Macro('custom', ('a|b',), '|Custom|a|b'))
+
+    def test_prefetch_passes_distinct_macros_of_all_stacks_to_each_resolver_once(self):
+        resolver = Mock()
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|custom|a', 'bar': '|custom|b'}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|custom|a'}
+
+        parameter_resolver = ParameterResolver()
+        parameter_resolver.register_resolver('custom', resolver)
+        parameter_resolver.register_resolver('other', resolver)
+        parameter_resolver.prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        resolver.resolve_many.assert_called_once()
+        six.assertCountEqual(self, [('custom', ('a',)), ('custom', ('b',))],
+                             [macro.key for macro in resolver.resolve_many.call_args[0][0]])
+
+    def test_prefetch_ignores_resolver_errors(self):
+        resolver = Mock()
+        resolver.resolve_many.side_effect = CfnSphereException("foo")
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|custom|a'}
+
+        parameter_resolver = ParameterResolver()
+        parameter_resolver.register_resolver('custom', resolver)
+        parameter_resolver.prefetch({'a': stack_config})
+
+    @patch('cfn_sphere.stack_configuration.parameter_resolver.SecretsManager')
+    def test_prefetch_fetches_secrets_of_all_stacks_in_one_call(self, secretsmanager_mock):
+        secretsmanager_mock.return_value.get_secret_values.return_value = {'a': '{"k": "v"}', 'b': 'valueB'}
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|secret|a|k', 'bar': '|secret|b'}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|secret|b'}
+
+        resolver = ParameterResolver()
+        resolver.prefetch({'a': stack_config_a, 'b': stack_config_b})
+
+        self.assertEqual({'foo': 'v', 'bar': 'valueB'}, resolver.resolve_parameter_values('a', stack_config_a))
+        secretsmanager_mock.return_value.get_secret_values.assert_called_once_with({'a', 'b'})
+        secretsmanager_mock.return_value.get_secret_value.assert_not_called()
+
+    def test_resolve_parameter_values_returns_latest_ami_for_name_pattern(self):
+        self.ec2api_mock.return_value.get_latest_image_id_by_name.return_value = "ami-123"
+
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|latestAmi|my-image-*|v2'}
+
+        result = ParameterResolver().resolve_parameter_values('foo', stack_config)
+
+        self.assertEqual({'foo': 'ami-123'}, result)
+        self.ec2api_mock.return_value.get_latest_image_id_by_name.assert_called_once_with('my-image-*|v2')
+
+    def test_resolve_parameter_values_raises_exception_on_missing_latest_ami_pattern(self):
+        with self.assertRaises(CfnSphereException):
+            self.resolve_value('|latestami|')
+
+    def test_resolve_parameter_values_handles_kms_encryption_context_if_set(self):
         self.kms_mock.return_value.decrypt.return_value = "decryptedValue"
-        result = ParameterResolver().handle_kms_value('|kms|k=v|encryptedValue')
+        result = self.resolve_value('|kms|k=v|encryptedValue')
 
         self.kms_mock.return_value.decrypt.assert_called_once_with('encryptedValue', encryption_context={'k': 'v'})
         self.assertEqual(result, 'decryptedValue')
 
-    def test_handle_kms_value_ignores_encryption_context_if_not_set(self):
+    def test_resolve_parameter_values_ignores_kms_encryption_context_if_not_set(self):
         self.kms_mock.return_value.decrypt.return_value = "decryptedValue"
-        result = ParameterResolver().handle_kms_value('|kms|encryptedValue')
+        result = self.resolve_value('|kms|encryptedValue')
 
         self.kms_mock.return_value.decrypt.assert_called_once_with('encryptedValue')
         self.assertEqual(result, 'decryptedValue')
 
-    def test_handle_kms_value_raises_exception_on_invalid_value_format(self):
+    def test_resolve_parameter_values_raises_exception_on_invalid_kms_value_format(self):
         with self.assertRaises(CfnSphereException):
-            ParameterResolver().handle_kms_value('|kms|k=v|encryptedValue|something')
+            self.resolve_value('|kms|k=v|encryptedValue|something')
 
     def test_update_parameters_with_cli_parameters_with_string_param_value(self):
         result = ParameterResolver().update_parameters_with_cli_parameters(
@@ -227,40 +618,56 @@ class ParameterResolverTests(TestCase):
 
         self.assertEqual({'foo': 'foobar'}, result)
 
-    @patch("cfn_sphere.stack_configuration.parameter_resolver.FileLoader.get_file")
-    def test_handle_file_value_loads_file_for_simple_file_reference(self, get_file_mock):
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_file")
+    def test_resolve_parameter_values_loads_file_for_simple_file_reference(self, get_file_mock):
         get_file_mock.return_value = "myValue"
 
-        result = ParameterResolver.handle_file_value("|file|s3://myBucket/myParameter.txt", None)
+        result = self.resolve_value("|file|s3://myBucket/myParameter.txt")
 
         get_file_mock.assert_called_once_with("s3://myBucket/myParameter.txt", None)
         self.assertEqual("myValue", result)
 
-    @patch("cfn_sphere.stack_configuration.parameter_resolver.FileLoader.get_yaml_or_json_file")
-    def test_handle_file_value_loads_file_for_reference_with_pattern(self, get_yaml_or_json_file_mock):
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file")
+    def test_file_resolver_loads_file_for_reference_with_pattern(self, get_yaml_or_json_file_mock):
         get_yaml_or_json_file_mock.return_value = {"accounts": [{"id": 1}, {"id": 2}, {"id": 3}]}
 
-        result = ParameterResolver.handle_file_value("|file|s3://myBucket/myAwsAccounts.json|accounts[*].id", None)
+        result = ParameterResolver().resolvers[Macro.FILE].resolve(
+            Macro.parse("|file|s3://myBucket/myAwsAccounts.json|accounts[*].id"))
 
         get_yaml_or_json_file_mock.assert_called_once_with("s3://myBucket/myAwsAccounts.json", None)
         self.assertEqual([1, 2, 3], result)
 
-    @patch("cfn_sphere.stack_configuration.parameter_resolver.jmespath.search")
-    @patch("cfn_sphere.stack_configuration.parameter_resolver.FileLoader.get_yaml_or_json_file")
-    def test_handle_file_value_loads_file_for_reference_with_pattern_containing_pipe(self, f, jmespath_search_mock):
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file")
+    def test_resolve_parameter_values_parses_file_once_for_all_parameters(self, get_yaml_or_json_file_mock):
+        get_yaml_or_json_file_mock.return_value = {"a": "1", "b": "2"}
+        stack_config = Mock()
+        stack_config.parameters = {'foo': '|file|s3://myBucket/my.json|a', 'bar': '|file|s3://myBucket/my.json|b'}
+        stack_config.working_dir = None
+        resolver = ParameterResolver()
+
+        result = resolver.resolve_parameter_values('my-stack', stack_config)
+        resolver.resolve_parameter_values('my-stack', stack_config)
+
+        self.assertEqual({'foo': '1', 'bar': '2'}, result)
+        get_yaml_or_json_file_mock.assert_called_once_with("s3://myBucket/my.json", None)
+
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.jmespath.compile")
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file")
+    def test_resolve_parameter_values_loads_file_for_reference_with_pattern_containing_pipe(self, f,
+                                                                                            jmespath_compile_mock):
         f.return_value = {"a": "b"}
 
-        ParameterResolver.handle_file_value("|file|s3://myBucket/myAwsAccounts.json|a|b", None)
-        jmespath_search_mock.assert_called_once_with("a|b", {'a': 'b'})
+        self.resolve_value("|file|s3://myBucket/myAwsAccounts.json|a|b")
+        jmespath_compile_mock.assert_called_once_with("a|b")
+        jmespath_compile_mock.return_value.search.assert_called_once_with({'a': 'b'})
 
-    @patch("cfn_sphere.stack_configuration.parameter_resolver.FileLoader.get_yaml_or_json_file")
-    def test_handle_file_value_raises_exception_on_invalid_jmespath_pattern_syntax(self, _):
+    @patch("cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_yaml_or_json_file")
+    def test_resolve_parameter_values_raises_exception_on_invalid_jmespath_pattern_syntax(self, _):
         with self.assertRaises(CfnSphereException):
-            ParameterResolver.handle_file_value("|file|path|broken_pattern{}}", None)
+            self.resolve_value("|file|path|broken_pattern{}}")
 
-    def test_handle_file_value_raises_exception_on_invalid_macro_syntax(self):
-        with self.assertRaises(CfnSphereException):
-            ParameterResolver.handle_file_value("|file", None)
+    def test_resolve_parameter_values_keeps_file_keyword_without_path_as_literal(self):
+        self.assertEqual("|file", self.resolve_value("|file"))
 
 
 def test_update_parameters_with_cli_parameters_does_not_affect_other_stacks(self):
@@ -269,7 +676,7 @@ def test_update_parameters_with_cli_parameters_does_not_affect_other_stacks(self
     self.assertEqual({'foo': 'foo'}, result)
 
 
-@patch('cfn_sphere.stack_configuration.parameter_resolver.FileLoader.get_file')
+@patch('cfn_sphere.stack_configuration.macro_resolvers.FileLoader.get_file')
 def test_resolve_value_from_file(self, get_file_mock):
     get_file_mock.return_value = "line1\nline2"
 
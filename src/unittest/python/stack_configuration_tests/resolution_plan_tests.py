@@ -0,0 +1,99 @@
+try:
+    from unittest import TestCase
+    from mock import Mock
+except ImportError:
+    from unittest import TestCase
+    from mock import Mock
+
+from cfn_sphere.exceptions import CfnSphereException
+from cfn_sphere.stack_configuration.resolution_plan import Macro, ResolutionPlan
+
+
+class MacroTests(TestCase):
+    def test_parse_returns_literal_for_plain_values(self):
+        self.assertEqual(Macro(Macro.LITERAL, value='foo'), Macro.parse('foo'))
+        self.assertEqual(Macro(Macro.LITERAL, value=42), Macro.parse(42))
+        self.assertEqual(Macro(Macro.LITERAL, value='|file'), Macro.parse('|file'))
+        self.assertEqual(Macro(Macro.LITERAL, value='|unknown|foo'), Macro.parse('|unknown|foo'))
+        self.assertEqual(Macro(Macro.LITERAL, value='|latesttaupageami|foo'), Macro.parse('|latesttaupageami|foo'))
+
+    def test_parse_ignores_case_of_macro_name(self):
+        macro = Macro.parse('|SSM|/path/to/key')
+
+        self.assertEqual(Macro.SSM, macro.kind)
+        self.assertEqual(('/path/to/key',), macro.args)
+
+    def test_parse_ref(self):
+        self.assertEqual(('stack', 'output', None), Macro.parse('|Ref|stack.output').args)
+        self.assertEqual(('stack', 'output', 'us-east-1'), Macro.parse('|ref|us-east-1:stack.output').args)
+
+    def test_parse_keep_value_keeps_separators_in_default(self):
+        self.assertEqual(('foo|foo.de',), Macro.parse('|keepOrUse|foo|foo.de').args)
+
+    def test_parse_kms_with_and_without_encryption_context(self):
+        self.assertEqual(('cipher', None), Macro.parse('|kms|cipher').args)
+        self.assertEqual(('cipher', (('a', 'b'), ('k', 'v'))), Macro.parse('|kms|k=v,a=b|cipher').args)
+
+    def test_parse_file_with_pattern_containing_pipe(self):
+        self.assertEqual(('dir', 'path.json', 'a|b'), Macro.parse('|file|path.json|a|b', 'dir').args)
+        self.assertEqual((None, 'path.txt'), Macro.parse('|file|path.txt').args)
+
+    def test_parse_further_kinds_with_rest_of_value_as_argument(self):
+        self.assertEqual(Macro('custom', ('a|b',), '|Custom|a|b'), Macro.parse('|Custom|a|b', kinds=['custom']))
+        self.assertEqual(Macro.LITERAL, Macro.parse('|custom|a|b').kind)
+
+    def test_parse_secret_with_and_without_json_key(self):
+        self.assertEqual(('arn:aws:secretsmanager:eu-west-1:123:secret:db',),
+                         Macro.parse('|Secret|arn:aws:secretsmanager:eu-west-1:123:secret:db').args)
+        self.assertEqual(('db', 'password'), Macro.parse('|secret|db|password').args)
+
+    def test_parse_raises_exception_on_invalid_format(self):
+        for value in ['|import|', '|import|a|b', '|secret|', '|secret|db|', '|kms|a|b|c', '|ssm|/a|b', '|ssmpath|/a|b',
+                      '|latestami|', '|ref|stack']:
+            with self.assertRaises(CfnSphereException):
+                Macro.parse(value)
+
+    def test_equal_macros_have_equal_hashes(self):
+        self.assertEqual(hash(Macro.parse('|ssm|/a')), hash(Macro.parse('|SSM|/a')))
+
+
+class ResolutionPlanTests(TestCase):
+    def test_compile_parameters_compiles_list_items(self):
+        parameters = ResolutionPlan.compile_parameters({'foo': ['|ssm|/a', 'plain'], 'bar': True})
+
+        self.assertEqual([Macro.parse('|ssm|/a'), Macro.parse('plain')], parameters['foo'])
+        self.assertEqual(Macro.parse(True), parameters['bar'])
+
+    def test_get_arguments_returns_distinct_arguments_of_all_stacks(self):
+        stack_config_a = Mock()
+        stack_config_a.parameters = {'foo': '|ssm|/a', 'bar': ['|ssm|/b', 'plain'], 'baz': 42}
+        stack_config_b = Mock()
+        stack_config_b.parameters = {'foo': '|SSM|/a', 'bar': '|ssm|/c', 'p': '|ssmpath|/app'}
+
+        plan = ResolutionPlan({'a': stack_config_a, 'b': stack_config_b})
+
+        self.assertEqual({('/a',), ('/b',), ('/c',)}, plan.get_arguments(Macro.SSM))
+        self.assertEqual({('/app',)}, plan.get_arguments(Macro.SSM_PATH))
+        self.assertEqual({('/a',), ('/b',)}, plan.get_arguments(Macro.SSM, 'a'))
+
+    def test_get_distinct_macros_dedupes_by_key_over_all_stacks(self):
+        stack_config_a = Mock(working_dir='dir-a')
+        stack_config_a.parameters = {'foo': '|file|x.txt', 'bar': '|ssm|/a'}
+        stack_config_b = Mock(working_dir='dir-b')
+        stack_config_b.parameters = {'foo': '|file|x.txt', 'bar': '|SSM|/a'}
+        stack_config_c = Mock(working_dir='dir-b')
+        stack_config_c.parameters = {'foo': ['|File|x.txt']}
+
+        plan = ResolutionPlan({'a': stack_config_a, 'b': stack_config_b, 'c': stack_config_c})
+
+        self.assertEqual({('dir-a', 'x.txt'), ('dir-b', 'x.txt')},
+                         set(macro.args for macro in plan.get_distinct_macros(Macro.FILE)))
+        self.assertEqual(1, len(plan.get_distinct_macros(Macro.SSM)))
+
+    def test_contains_checks_stack_config_identity(self):
+        stack_config = Mock(parameters={})
+        plan = ResolutionPlan({'a': stack_config})
+
+        self.assertTrue(plan.contains('a', stack_config))
+        self.assertFalse(plan.contains('a', Mock()))
+        self.assertFalse(plan.contains('b', stack_config))
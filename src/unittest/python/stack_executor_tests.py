@@ -0,0 +1,120 @@
+try:
+    from unittest import TestCase
+    from mock import Mock
+except ImportError:
+    from unittest import TestCase
+    from mock import Mock
+
+import threading
+
+import networkx
+
+from cfn_sphere.exceptions import CfnSphereException, CfnStackActionFailedException
+from cfn_sphere.stack_executor import StackExecutor, StackExecutionResult
+
+
+class StackExecutorTests(TestCase):
+    def setUp(self):
+        self.graph = networkx.DiGraph()
+        self.graph.add_nodes_from(['a', 'b', 'c', 'd'])
+        self.graph.add_edge('a', 'c')
+        self.graph.add_edge('b', 'c')
+        self.graph.add_edge('c', 'd')
+
+    def test_run_processes_stacks_after_their_predecessors(self):
+        processed = []
+        lock = threading.Lock()
+
+        def action(stack_name):
+            with lock:
+                processed.append(stack_name)
+
+        result = StackExecutor(self.graph, 4).run(['a', 'b', 'c', 'd'], action)
+
+        self.assertEqual({'a', 'b', 'c', 'd'}, set(result.succeeded))
+        self.assertLess(processed.index('a'), processed.index('c'))
+        self.assertLess(processed.index('b'), processed.index('c'))
+        self.assertLess(processed.index('c'), processed.index('d'))
+
+    def test_run_starts_independent_stacks_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def action(stack_name):
+            if stack_name in ['a', 'b']:
+                barrier.wait()
+
+        result = StackExecutor(self.graph, 2).run(['a', 'b', 'c', 'd'], action)
+        self.assertEqual({'a', 'b', 'c', 'd'}, set(result.succeeded))
+
+    def test_run_ignores_predecessors_outside_of_given_stacks(self):
+        self.graph.add_edge('unmanaged', 'a')
+        action = Mock()
+
+        result = StackExecutor(self.graph, 2).run(['a'], action)
+
+        action.assert_called_once_with('a')
+        self.assertEqual(['a'], list(result.succeeded))
+
+    def test_run_does_not_start_new_stacks_after_failure(self):
+        def action(stack_name):
+            if stack_name == 'a':
+                raise CfnSphereException("failed")
+
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(['a', 'b'])
+
+        result = StackExecutor(graph, 1).run(['a', 'b'], action)
+
+        self.assertEqual(['a'], list(result.failed))
+        self.assertEqual(['b'], result.skipped)
+
+    def test_run_finishes_in_flight_stacks_after_failure(self):
+        b_started = threading.Event()
+
+        def action(stack_name):
+            if stack_name == 'a':
+                b_started.wait(5)
+                raise CfnSphereException("failed")
+            b_started.set()
+
+        result = StackExecutor(self.graph, 2).run(['a', 'b', 'c', 'd'], action)
+
+        self.assertEqual(['a'], list(result.failed))
+        self.assertEqual(['b'], list(result.succeeded))
+        self.assertEqual(['c', 'd'], result.skipped)
+
+    def test_run_continues_with_independent_stacks_without_fail_fast(self):
+        def action(stack_name):
+            if stack_name == 'a':
+                raise CfnSphereException("failed")
+
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(['a', 'b', 'c'])
+        graph.add_edge('a', 'c')
+
+        result = StackExecutor(graph, 1).run(['a', 'b', 'c'], action, fail_fast=False)
+
+        self.assertEqual(['a'], list(result.failed))
+        self.assertEqual(['b'], list(result.succeeded))
+        self.assertEqual(['c'], result.skipped)
+
+    def test_raise_on_failure_raises_original_exception_for_single_failure(self):
+        exception = CfnSphereException("failed")
+        result = StackExecutionResult()
+        result.failed['a'] = exception
+
+        with self.assertRaises(CfnSphereException) as context:
+            result.raise_on_failure("sync")
+
+        self.assertIs(exception, context.exception)
+
+    def test_raise_on_failure_raises_summary_for_multiple_failures(self):
+        result = StackExecutionResult()
+        result.failed['a'] = CfnSphereException("failed")
+        result.failed['b'] = CfnSphereException("failed")
+
+        with self.assertRaises(CfnStackActionFailedException):
+            result.raise_on_failure("sync")
+
+    def test_raise_on_failure_passes_without_failures(self):
+        StackExecutionResult().raise_on_failure("sync")
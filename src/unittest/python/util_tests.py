@@ -4,10 +4,10 @@ from git import InvalidGitRepositoryError
 
 try:
     from unittest import TestCase
-    from mock import patch, Mock
+    from mock import patch, Mock, call
 except ImportError:
     from unittest import TestCase
-    from mock import patch, Mock
+    from mock import patch, Mock, call
 
 import textwrap
 from datetime import datetime
@@ -21,6 +21,9 @@ from cfn_sphere.template import CloudFormationTemplate
 
 
 class UtilTests(TestCase):
+    def tearDown(self):
+        util.reset_server_clock_offset()
+
     def test_convert_yaml_to_json_string_returns_valid_json_string(self):
         data = textwrap.dedent("""
         foo:
@@ -48,17 +51,37 @@ class UtilTests(TestCase):
         data = {}
         self.assertEqual('', util.convert_json_to_yaml_string(data))
 
-    @patch("cfn_sphere.util.urllib2.urlopen")
-    def test_get_cfn_api_server_time_returns_gmt_datetime(self, urlopen_mock):
-        urlopen_mock.return_value.info.return_value.get.return_value = "Mon, 21 Sep 2015 17:17:26 GMT"
-        expected_timestamp = datetime(year=2015, month=9, day=21, hour=17, minute=17, second=26, tzinfo=tzutc())
+    @patch("cfn_sphere.util.datetime")
+    def test_get_cfn_api_server_time_applies_offset_from_response_date_header(self, datetime_mock):
+        datetime_mock.now.return_value = datetime(2015, 9, 21, 17, 17, 20, tzinfo=tzutc())
+        util.record_server_clock_offset(
+            parsed={"ResponseMetadata": {"HTTPHeaders": {"date": "Mon, 21 Sep 2015 17:17:26 GMT"}}})
+
+        datetime_mock.now.return_value = datetime(2015, 9, 21, 17, 20, 0, tzinfo=tzutc())
+        expected_timestamp = datetime(year=2015, month=9, day=21, hour=17, minute=20, second=6, tzinfo=tzutc())
         self.assertEqual(expected_timestamp, util.get_cfn_api_server_time())
 
+    @patch("cfn_sphere.util.datetime")
+    def test_get_cfn_api_server_time_computes_offset_only_once(self, datetime_mock):
+        datetime_mock.now.return_value = datetime(2015, 9, 21, 17, 17, 26, tzinfo=tzutc())
+        util.record_server_clock_offset(
+            parsed={"ResponseMetadata": {"HTTPHeaders": {"date": "Mon, 21 Sep 2015 17:17:26 GMT"}}})
+        util.record_server_clock_offset(
+            parsed={"ResponseMetadata": {"HTTPHeaders": {"date": "Mon, 21 Sep 2015 18:00:00 GMT"}}})
+
+        self.assertEqual(datetime(2015, 9, 21, 17, 17, 26, tzinfo=tzutc()), util.get_cfn_api_server_time())
+
+    @patch("cfn_sphere.util.datetime")
+    def test_get_cfn_api_server_time_ignores_responses_without_date_header(self, datetime_mock):
+        datetime_mock.now.return_value = datetime(2015, 9, 21, 17, 17, 26, tzinfo=tzutc())
+        util.record_server_clock_offset(parsed={"ResponseMetadata": {"HTTPHeaders": {}}})
+
+        self.assertEqual(datetime(2015, 9, 21, 17, 17, 26, tzinfo=tzutc()), util.get_cfn_api_server_time())
+
     @patch("cfn_sphere.util.urllib2.urlopen")
-    def test_get_cfn_api_server_time_raises_exception_on_empty_date_header(self, urlopen_mock):
-        urlopen_mock.return_value.info.return_value.get.return_value = ""
-        with self.assertRaises(CfnSphereException):
-            util.get_cfn_api_server_time()
+    def test_get_cfn_api_server_time_does_not_make_http_requests(self, urlopen_mock):
+        util.get_cfn_api_server_time()
+        urlopen_mock.assert_not_called()
 
     def test_with_boto_retry_retries_method_call_for_throttling_exception(self):
         count_func = Mock()
@@ -76,6 +99,23 @@ class UtilTests(TestCase):
 
         self.assertEqual(2, count_func.call_count)
 
+    @patch("cfn_sphere.util.time.sleep")
+    @patch("cfn_sphere.util.random.uniform")
+    def test_with_boto_retry_backs_off_with_full_jitter(self, uniform_mock, sleep_mock):
+        uniform_mock.return_value = 0.3
+
+        @util.with_boto_retry(max_retries=3, pause_time_multiplier=2, max_pause_time=5)
+        def my_retried_method():
+            raise CfnSphereBotoError(
+                ClientError(error_response={"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+                            operation_name="GetParameter"))
+
+        with self.assertRaises(CfnSphereBotoError):
+            my_retried_method()
+
+        self.assertEqual([call(0, 2), call(0, 4), call(0, 5)], uniform_mock.mock_calls)
+        self.assertEqual([call(0.3)] * 3, sleep_mock.mock_calls)
+
     def test_with_boto_retry_does_not_retry_for_simple_exception(self):
         count_func = Mock()
 